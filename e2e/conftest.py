@@ -1,3 +1,5 @@
+import os
+import tempfile
 import threading
 import time
 from typing import Generator
@@ -6,13 +8,19 @@ import pytest
 from flask import Flask
 from werkzeug.serving import make_server
 
-from flaskr.constants import OFFICES
-from flaskr.main import app, db
-from flaskr.planning.planning_aggregate import (
-    EXPENSES,
-    EXPENSES_CLOSED,
-    PlanningStatus,
-)
+# The app opens its stores when imported; keep them out of the working tree
+_STORES = tempfile.mkdtemp(prefix="e2e-stores-")
+for _name, _file in [
+    ("EVENTS_FILE", "events.jsonl"),
+    ("SNAPSHOTS_FILE", "snapshots.db"),
+    ("PROJECTIONS_FILE", "projections.db"),
+    ("KURRENTDB_FILE", "kurrent.db"),
+]:
+    os.environ.setdefault(f"FLASK_{_name}", os.path.join(_STORES, _file))
+
+from flaskr.main import app, db  # noqa: E402
+from flaskr.planning.expenses.projection import expenses_projection  # noqa: E402
+from flaskr.planning.planning_aggregate import PlanningStatus  # noqa: E402
 
 
 class ServerThread(threading.Thread):
@@ -69,8 +77,6 @@ def reset_state() -> Generator[None, None, None]:
     planning_aggregate.planning_year = 2025
 
     # Reset expenses
-    for office in OFFICES:
-        EXPENSES[office] = []
-        EXPENSES_CLOSED[office] = False
+    expenses_projection().reset()
 
     yield
@@ -1,3 +1,4 @@
+import inspect
 from functools import wraps
 from typing import Any, Callable, TypeVar, cast
 
@@ -21,11 +22,25 @@ def authenticate() -> Response:
     )
 
 
+def _authorized() -> bool:
+    auth = request.authorization
+    return auth is not None and check_auth(auth.username or "", auth.password or "")
+
+
 def auth_required(f: F) -> F:
+    if inspect.iscoroutinefunction(f):
+        # Flask only awaits views that are coroutine functions themselves
+        @wraps(f)
+        async def decorated_async(*args: Any, **kwargs: Any) -> Any:
+            if not _authorized():
+                return authenticate()
+            return await f(*args, **kwargs)
+
+        return cast(F, decorated_async)
+
     @wraps(f)
     def decorated(*args: Any, **kwargs: Any) -> Any:
-        auth = request.authorization
-        if not auth or not check_auth(auth.username or "", auth.password or ""):
+        if not _authorized():
             return authenticate()
         return f(*args, **kwargs)
 
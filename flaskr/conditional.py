@@ -0,0 +1,67 @@
+import hashlib
+from functools import wraps
+from typing import Any, Callable, TypeVar, cast
+from uuid import uuid4
+
+from flask import Response, make_response, request, session
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Templates may change between runs, so tags from an earlier process are stale
+_PROCESS_TAG = uuid4().hex
+
+
+def etag_cached(version: Callable[[], str | None]) -> Callable[[F], F]:
+    """
+    Answer GET requests whose If-None-Match holds the current ETag with
+    304 Not Modified, without calling the view. The ETag is derived from
+    `version()`, which must change whenever what the view renders could;
+    None means the version is not known and the view always runs.
+    """
+
+    def decorator(f: F) -> F:
+        @wraps(f)
+        def decorated(*args: Any, **kwargs: Any) -> Any:
+            # Flashed messages are rendered once, so such pages never repeat
+            if request.method != "GET" or "_flashes" in session:
+                return f(*args, **kwargs)
+            current = version()
+            if current is None:
+                return f(*args, **kwargs)
+            etag = hashlib.sha1(f"{_PROCESS_TAG}:{current}".encode()).hexdigest()
+            if request.if_none_match.contains_weak(etag):
+                not_modified = Response(status=304)
+                not_modified.set_etag(etag, weak=True)
+                return not_modified
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag, weak=True)
+                # Revalidate on every use rather than trust a cached copy
+                response.cache_control.private = True
+                response.cache_control.no_cache = True
+            return response
+
+        return cast(F, decorated)
+
+    return decorator
+
+
+def precompressed_response(
+    body: bytes, gzipped_body: bytes, etag: str, mimetype: str = "application/json"
+) -> Response:
+    """
+    Serve a body that never changes while the process runs, prepared up
+    front in plain and gzipped form. Each encoding gets its own strong
+    ETag, and If-None-Match is answered with 304.
+    """
+    gzipped = request.accept_encodings["gzip"] > 0
+    response = Response(gzipped_body if gzipped else body, mimetype=mimetype)
+    if gzipped:
+        response.content_encoding = "gzip"
+    response.set_etag(f"{etag}-gzip" if gzipped else etag)
+    response.vary.add("Accept-Encoding")
+    response.cache_control.private = True
+    response.cache_control.max_age = 3600
+    response.make_conditional(request)
+    return response
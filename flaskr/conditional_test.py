@@ -0,0 +1,85 @@
+from flask import Flask, Response, flash
+
+from .conditional import etag_cached, precompressed_response
+
+
+def make_app(versions: list[str | None]) -> tuple[Flask, list[int]]:
+    app = Flask(__name__)
+    app.secret_key = "test"
+    renders: list[int] = []
+
+    @app.route("/", methods=["GET", "POST"])
+    @etag_cached(lambda: versions[-1])
+    def index() -> str:
+        renders.append(1)
+        return "page"
+
+    @app.route("/flash")
+    def flash_message() -> str:
+        flash("hello")
+        return "flashed"
+
+    return app, renders
+
+
+def test_matching_etag_skips_the_view() -> None:
+    versions: list[str | None] = ["1"]
+    app, renders = make_app(versions)
+    client = app.test_client()
+
+    first = client.get("/")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+    assert "no-cache" in first.headers["Cache-Control"]
+
+    cached = client.get("/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert len(renders) == 1
+
+    versions.append("2")
+    changed = client.get("/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_unknown_version_or_flashes_always_render() -> None:
+    versions: list[str | None] = ["1"]
+    app, renders = make_app(versions)
+    client = app.test_client()
+    etag = client.get("/").headers["ETag"]
+
+    client.get("/flash")
+    assert client.get("/", headers={"If-None-Match": etag}).status_code == 200
+
+    versions.append(None)
+    unknown = client.get("/", headers={"If-None-Match": etag})
+    assert unknown.status_code == 200
+    assert "ETag" not in unknown.headers
+    assert client.post("/", headers={"If-None-Match": etag}).status_code == 200
+    assert len(renders) == 4
+
+
+def test_precompressed_response() -> None:
+    app = Flask(__name__)
+
+    @app.route("/data")
+    def data() -> Response:
+        return precompressed_response(b"plain", b"gzipped", "abc")
+
+    client = app.test_client()
+    plain = client.get("/data")
+    assert plain.data == b"plain"
+    assert plain.headers["ETag"] == '"abc"'
+    assert "Accept-Encoding" in plain.headers["Vary"]
+
+    gzipped = client.get("/data", headers={"Accept-Encoding": "gzip"})
+    assert gzipped.data == b"gzipped"
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+
+    cached = client.get(
+        "/data",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": gzipped.headers["ETag"]},
+    )
+    assert cached.status_code == 304
+    assert client.get("/data", headers={"If-None-Match": '"abc"'}).status_code == 304
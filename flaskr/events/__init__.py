@@ -1,41 +1,185 @@
 import atexit
+import threading
 from logging import getLogger
 
 from flask import Flask, current_app
-from kurrentdbclient import KurrentDBClient
+from kurrentdbclient import AsyncKurrentDBClient, KurrentDBClient
 
-from .event_repository import FileEventRepository
+from .async_dispatch import AsyncDispatcher, BackpressurePolicy
+from .async_kurrent import AsyncEmbeddedKurrentDB, AsyncKurrentLoop
+from .embedded_kurrentdb import EmbeddedKurrentDB
+from .event_repository import Durability, EventRepository, FileEventRepository
 from .event_store import DefaultEventStore, EventStore
+from .kurrent_client import KurrentClient
+from .projections import (
+    ProjectionRunner,
+    SqliteProjectionStore,
+    TProjection,
+)
+from .snapshots import SnapshotStore, SqliteSnapshotStore
+from .sqlite_event_repository import SqliteEventRepository
 
 logger = getLogger(__name__)
 
 __all__ = ["init_event_extension", "events", "EventStore"]
 
+KURRENTDB_URI = "kurrentdb://localhost:2113?Tls=false"
+# KurrentDB server, or EmbeddedKurrentDB in a local SQLite file
+KURRENTDB_BACKENDS = ("kurrentdb", "embedded")
+EVENTS_BACKENDS = ("file", "sqlite")
+
 
 def init_kurrentdb(app: Flask) -> None:
     assert app is not None
     if "kurrent-db" in app.extensions:
         raise ValueError("Kurrent Db already initialised")
-    logger.info("Registering kurrentdb")
-    app.extensions["kurrent-db"] = KurrentDBClient(
-        uri="kurrentdb://localhost:2113?Tls=false"
-    )
+    backend = str(app.config.get("KURRENTDB_BACKEND", "kurrentdb"))  # type: ignore[misc]
+    if backend not in KURRENTDB_BACKENDS:
+        raise ValueError(
+            f"Unknown KurrentDB backend {backend}, expected one of {KURRENTDB_BACKENDS}"
+        )
+    logger.info(f"Registering kurrentdb ({backend})")
+    if backend == "embedded":
+        client: KurrentClient = EmbeddedKurrentDB(
+            str(app.config.get("KURRENTDB_FILE", "kurrent.db"))  # type: ignore[misc]
+        )
+        atexit.register(client.close)
+    else:
+        uri = str(app.config.get("KURRENTDB_URI", KURRENTDB_URI))  # type: ignore[misc]
+        client = KurrentDBClient(uri=uri)
+    app.extensions["kurrent-db"] = client
 
 
-def get_kurrent_client() -> KurrentDBClient:
+def get_kurrent_client() -> KurrentClient:
     if "kurrent-db" not in current_app.extensions:
         raise ValueError("kurrent-db client not initialised")
     return current_app.extensions["kurrent-db"]
 
 
+_async_kurrent_lock = threading.Lock()
+
+
+def get_async_kurrent() -> AsyncKurrentLoop:
+    """
+    The async client, started on first use. Async clients are bound to the
+    event loop they were connected in, and Flask async views run each
+    request in a new one, so a single client lives on its own loop thread.
+    """
+    with _async_kurrent_lock:
+        if "kurrent-db-async" not in current_app.extensions:
+            client = get_kurrent_client()
+            if isinstance(client, EmbeddedKurrentDB):
+                embedded = client
+                async_kurrent = AsyncKurrentLoop(
+                    lambda: AsyncEmbeddedKurrentDB(embedded)
+                )
+            else:
+                uri = str(current_app.config.get("KURRENTDB_URI", KURRENTDB_URI))  # type: ignore[misc]
+                async_kurrent = AsyncKurrentLoop(lambda: AsyncKurrentDBClient(uri=uri))
+            current_app.extensions["kurrent-db-async"] = async_kurrent
+            atexit.register(async_kurrent.close)
+        return current_app.extensions["kurrent-db-async"]
+
+
+def init_snapshot_store(app: Flask) -> None:
+    assert app is not None
+    if "snapshot-store" in app.extensions:
+        raise ValueError("Snapshot store already initialised")
+    snapshots_file: str = str(app.config.get("SNAPSHOTS_FILE", "snapshots.db"))  # type: ignore[misc]
+    snapshot_store = SqliteSnapshotStore(snapshots_file)
+    app.extensions["snapshot-store"] = snapshot_store
+    atexit.register(snapshot_store.destroy)
+
+
+def get_snapshot_store() -> SnapshotStore:
+    if "snapshot-store" not in current_app.extensions:
+        raise ValueError("Snapshot store not initialised")
+    return current_app.extensions["snapshot-store"]
+
+
+def init_projections(app: Flask) -> None:
+    assert app is not None
+    if "projections" in app.extensions:
+        raise ValueError("Projections already initialised")
+    projections_file = str(app.config.get("PROJECTIONS_FILE", "projections.db"))  # type: ignore[misc]
+    store = SqliteProjectionStore(projections_file)
+    runner = ProjectionRunner(
+        store,
+        # Seconds a live event may wait for its state to be committed
+        commit_interval=float(app.config.get("PROJECTIONS_COMMIT_INTERVAL", 0.5)),  # type: ignore[misc]
+        # Seconds between commits while catching up with the log
+        catch_up_commit_interval=float(app.config.get("PROJECTIONS_CATCH_UP_COMMIT_INTERVAL", 10.0)),  # type: ignore[misc]
+        # Replay the whole log instead of resuming from the checkpoints
+        rebuild=bool(app.config.get("PROJECTIONS_REBUILD", False)),  # type: ignore[misc]
+    )
+    app.extensions["projections"] = runner
+    # Run last to first: stop writing before closing the store
+    atexit.register(store.destroy)
+    atexit.register(runner.stop)
+
+
+def get_projections() -> ProjectionRunner:
+    if "projections" not in current_app.extensions:
+        raise ValueError("Projections not initialised")
+    return current_app.extensions["projections"]
+
+
+def get_projection(
+    projection_type: type[TProjection], commit_position: int | None = None
+) -> TProjection:
+    """
+    A registered projection, once it has caught up with the log, or with the
+    given commit position to read our own writes.
+    """
+    runner = get_projections()
+    runner.ensure_running(get_kurrent_client())
+    if commit_position is None:
+        caught_up = runner.wait_until_live()
+    else:
+        caught_up = runner.wait_for(commit_position)
+    if not caught_up:
+        logger.warning(
+            f"{projection_type.__name__} is behind the log at {runner.position}, "
+            "reading stale state"
+        )
+    return runner.get(projection_type)
+
+
 def init_event_extension(app: Flask) -> None:
     assert app is not None, "Flask app is required"
     if "event-extension" in app.extensions:
         raise ValueError("EventExtension is already registered")
     logger.info("EventExtension is registered")
-    # Allow configuration of events file path, default to events.jsonl
-    events_file: str = str(app.config.get("EVENTS_FILE", "events.jsonl"))  # type: ignore[misc]
-    event_store = DefaultEventStore(FileEventRepository(events_file))
+    # JSON lines file, or a SQLite database
+    backend = str(app.config.get("EVENTS_BACKEND", "file"))  # type: ignore[misc]
+    if backend not in EVENTS_BACKENDS:
+        raise ValueError(
+            f"Unknown events backend {backend}, expected one of {EVENTS_BACKENDS}"
+        )
+    # Allow configuration of events file path, default to events.jsonl/.db
+    default_file = "events.db" if backend == "sqlite" else "events.jsonl"
+    events_file: str = str(app.config.get("EVENTS_FILE", default_file))  # type: ignore[misc]
+    # Group commit coalesces concurrent appends into one write/fsync per batch
+    group_commit = bool(app.config.get("EVENTS_GROUP_COMMIT", False))  # type: ignore[misc]
+    durability = Durability(app.config.get("EVENTS_DURABILITY", Durability.FLUSH.value))  # type: ignore[misc]
+    event_repository: EventRepository
+    if backend == "sqlite":
+        event_repository = SqliteEventRepository(events_file, durability=durability)
+    else:
+        event_repository = FileEventRepository(
+            events_file, durability=durability, group_commit=group_commit
+        )
+    # Async dispatch runs subscribers off the request thread
+    dispatcher = None
+    if app.config.get("EVENTS_ASYNC_DISPATCH", False):  # type: ignore[misc]
+        dispatcher = AsyncDispatcher(
+            workers=int(app.config.get("EVENTS_DISPATCH_WORKERS", 4)),  # type: ignore[misc]
+            max_queue_size=int(app.config.get("EVENTS_DISPATCH_QUEUE_SIZE", 1000)),  # type: ignore[misc]
+            policy=BackpressurePolicy(
+                app.config.get("EVENTS_DISPATCH_POLICY", BackpressurePolicy.BLOCK.value)  # type: ignore[misc]
+            ),
+        )
+    event_store = DefaultEventStore(event_repository, dispatcher)
     app.extensions["event-extension"] = event_store
     atexit.register(event_store.destroy)
 
@@ -0,0 +1,222 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from logging import getLogger
+from typing import Any, Callable, Iterable
+
+logger = getLogger(__name__)
+
+__all__ = [
+    "AsyncDispatcher",
+    "BackpressurePolicy",
+    "SubscriberMetrics",
+    "SubscriberQueueFull",
+]
+
+# How many events a worker delivers to one subscriber before yielding the
+# thread to other subscribers
+_DRAIN_BURST = 100
+
+
+class BackpressurePolicy(Enum):
+    # Wait until the subscriber's queue has room. Do not use with handlers that
+    # emit back into a queue they are draining themselves.
+    BLOCK = "block"
+    # Discard the oldest queued event to make room
+    DROP_OLDEST = "drop_oldest"
+    # Refuse the emit with SubscriberQueueFull before anything is persisted
+    # (see check_capacity). Events that still find a full queue, because
+    # concurrent emits filled it after the check, are dropped and counted.
+    FAIL = "fail"
+
+
+class SubscriberQueueFull(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class SubscriberMetrics:
+    depth: int
+    delivered: int
+    dropped: int
+    # Seconds the oldest queued event has been waiting
+    lag: float
+
+
+def _handler_name(handler: Callable[[Any], None]) -> str:
+    return handler.__name__ if hasattr(handler, "__name__") else str(handler)
+
+
+def _handler_key(handler: Callable[[Any], None]) -> str:
+    """
+    Unique name of a subscriber for metrics. Bound methods of different
+    objects share their name, so the owner's id is part of the key.
+    """
+    name = getattr(handler, "__qualname__", None) or _handler_name(handler)
+    return f"{name}@{id(getattr(handler, '__self__', handler)):x}"
+
+
+class _SubscriberQueue:
+    def __init__(self, handler: Callable[[Any], None]) -> None:
+        self.handler = handler
+        # How many subscriptions deliver to this queue
+        self.subscriptions = 0
+        self.removed = False
+        self.items: deque[tuple[float, Any]] = deque()
+        self.scheduled = False
+        self.delivered = 0
+        self.dropped = 0
+
+
+class AsyncDispatcher:
+    """
+    Delivers events to subscribers on a thread pool. Every subscriber has its
+    own bounded queue and at most one worker draining it at a time, so each
+    subscriber still sees its events in emit order. Handlers get a queue
+    with `add_subscriber`; events for handlers without one are discarded.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_queue_size: int = 1000,
+        policy: BackpressurePolicy = BackpressurePolicy.BLOCK,
+    ) -> None:
+        self._max_queue_size = max_queue_size
+        self._policy = policy
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="event-dispatch"
+        )
+        self._queues: dict[Callable[[Any], None], _SubscriberQueue] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def add_subscriber(self, handler: Callable[[Any], None]) -> None:
+        with self._lock:
+            queue = self._queues.get(handler)
+            if queue is None:
+                queue = self._queues[handler] = _SubscriberQueue(handler)
+            queue.subscriptions += 1
+
+    def remove_subscriber(self, handler: Callable[[Any], None]) -> None:
+        """
+        Drop one subscription of the handler. With the last one its queue
+        goes, together with the events still waiting in it.
+        """
+        with self._lock:
+            queue = self._queues.get(handler)
+            if queue is None:
+                return
+            queue.subscriptions -= 1
+            if queue.subscriptions > 0:
+                return
+            del self._queues[handler]
+            queue.removed = True
+            queue.items.clear()
+            self._changed.notify_all()
+
+    def check_capacity(self, handlers: Iterable[Callable[[Any], None]]) -> None:
+        """
+        With the FAIL policy, raise SubscriberQueueFull if delivering one event
+        per listed handler (a handler may be listed several times) would not
+        fit in its queue. Meant to be called before events are persisted.
+        """
+        if self._policy is not BackpressurePolicy.FAIL:
+            return
+        needed: dict[Callable[[Any], None], int] = {}
+        for handler in handlers:
+            needed[handler] = needed.get(handler, 0) + 1
+        with self._lock:
+            for handler, count in needed.items():
+                queue = self._queues.get(handler)
+                if (
+                    queue is not None
+                    and len(queue.items) + count > self._max_queue_size
+                ):
+                    raise SubscriberQueueFull(
+                        f"Queue of {_handler_name(handler)} is full "
+                        f"({self._max_queue_size} events)"
+                    )
+
+    def deliver(self, handler: Callable[[Any], None], event: Any) -> None:
+        with self._lock:
+            queue = self._queues.get(handler)
+            if queue is None:
+                logger.debug(f"No queue for {_handler_name(handler)}, event discarded")
+                return
+            while len(queue.items) >= self._max_queue_size and not queue.removed:
+                match self._policy:
+                    case BackpressurePolicy.BLOCK:
+                        self._changed.wait()
+                    case BackpressurePolicy.DROP_OLDEST:
+                        queue.items.popleft()
+                        queue.dropped += 1
+                    case BackpressurePolicy.FAIL:
+                        queue.dropped += 1
+                        logger.error(
+                            f"Queue of {_handler_name(handler)} is full, "
+                            f"dropped an event of {event.stream_id}"
+                        )
+                        return
+            if queue.removed:
+                return
+            queue.items.append((time.monotonic(), event))
+            if not queue.scheduled:
+                queue.scheduled = True
+                self._pool.submit(self._drain, queue)
+
+    def metrics(self) -> dict[str, SubscriberMetrics]:
+        """
+        Per subscriber, keyed by its qualified name and owner id.
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                _handler_key(handler): SubscriberMetrics(
+                    depth=len(queue.items),
+                    delivered=queue.delivered,
+                    dropped=queue.dropped,
+                    lag=now - queue.items[0][0] if queue.items else 0.0,
+                )
+                for handler, queue in self._queues.items()
+            }
+
+    def wait_idle(self, timeout: float | None = None) -> bool:
+        """
+        Wait until every queued event has been delivered.
+        Returns False if the timeout expired first.
+        """
+        with self._lock:
+            return self._changed.wait_for(
+                lambda: not any(q.scheduled for q in self._queues.values()),
+                timeout,
+            )
+
+    def shutdown(self) -> None:
+        self.wait_idle()
+        self._pool.shutdown()
+
+    def _drain(self, queue: _SubscriberQueue) -> None:
+        for _ in range(_DRAIN_BURST):
+            with self._lock:
+                if not queue.items or queue.removed:
+                    queue.scheduled = False
+                    self._changed.notify_all()
+                    return
+                _, event = queue.items.popleft()
+                self._changed.notify_all()
+            try:
+                queue.handler(event)
+            except Exception as e:
+                logger.error(
+                    f"Handler {_handler_name(queue.handler)} "
+                    f"failed for {event.stream_id}: {e}",
+                    exc_info=True,
+                )
+            with self._lock:
+                queue.delivered += 1
+        # Let other subscribers' queues get a worker before continuing
+        self._pool.submit(self._drain, queue)
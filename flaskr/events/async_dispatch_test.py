@@ -0,0 +1,139 @@
+import threading
+from dataclasses import dataclass
+from typing import Generator
+
+import pytest
+
+from .async_dispatch import AsyncDispatcher, BackpressurePolicy, SubscriberQueueFull
+from .event_store import DefaultEventStore
+from .replay_wrapper import NoopEventRepository
+from .types import Event
+
+
+@dataclass
+class MockEvent(Event):
+    id: int
+
+
+class BlockingSubscriber:
+    def __init__(self) -> None:
+        self.handled_events: list[MockEvent] = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def apply(self, event: MockEvent) -> None:
+        self.started.set()
+        self.release.wait()
+        self.handled_events.append(event)
+
+
+@pytest.fixture
+def subscriber() -> Generator[BlockingSubscriber, None, None]:
+    subscriber = BlockingSubscriber()
+    yield subscriber
+    subscriber.release.set()
+
+
+def test_emit_does_not_wait_for_subscribers(subscriber: BlockingSubscriber) -> None:
+    dispatcher = AsyncDispatcher(workers=2)
+    event_store = DefaultEventStore(NoopEventRepository(), dispatcher)
+    event_store.add_subscriber(subscriber.apply, "s")
+
+    event_store.emit([MockEvent("s", i) for i in range(5)])
+    assert subscriber.handled_events == []
+
+    subscriber.release.set()
+    assert dispatcher.wait_idle(timeout=5)
+    assert [e.id for e in subscriber.handled_events] == [0, 1, 2, 3, 4]
+    event_store.destroy()
+
+
+def test_drop_oldest_keeps_newest_events(subscriber: BlockingSubscriber) -> None:
+    dispatcher = AsyncDispatcher(
+        workers=1, max_queue_size=2, policy=BackpressurePolicy.DROP_OLDEST
+    )
+    dispatcher.add_subscriber(subscriber.apply)
+
+    dispatcher.deliver(subscriber.apply, MockEvent("s", 0))
+    assert subscriber.started.wait(timeout=5)
+    for i in range(1, 5):
+        dispatcher.deliver(subscriber.apply, MockEvent("s", i))
+    (metrics,) = dispatcher.metrics().values()
+    subscriber.release.set()
+    dispatcher.shutdown()
+
+    # The first event was already taken by the worker when the queue filled up
+    assert metrics.dropped == 2
+    assert [e.id for e in subscriber.handled_events] == [0, 3, 4]
+
+
+class RecordingRepository(NoopEventRepository):
+    def __init__(self) -> None:
+        self.stored: list[MockEvent] = []
+
+    def store_all(self, events: list[MockEvent]) -> None:
+        self.stored += events
+
+
+def test_fail_policy_refuses_emit_before_persisting(
+    subscriber: BlockingSubscriber,
+) -> None:
+    dispatcher = AsyncDispatcher(
+        workers=1, max_queue_size=1, policy=BackpressurePolicy.FAIL
+    )
+    repository = RecordingRepository()
+    event_store = DefaultEventStore(repository, dispatcher)
+    event_store.add_subscriber(subscriber.apply, "s")
+    event_store.emit([MockEvent("s", 0)])
+    assert subscriber.started.wait(timeout=5)
+    event_store.emit([MockEvent("s", 1)])
+
+    with pytest.raises(SubscriberQueueFull):
+        event_store.emit([MockEvent("s", 2)])
+    assert [e.id for e in repository.stored] == [0, 1]
+
+    # Concurrent emits that fill the queue after the check drop the event
+    dispatcher.deliver(subscriber.apply, MockEvent("s", 3))
+    (metrics,) = dispatcher.metrics().values()
+    assert metrics.depth == 1
+    assert metrics.dropped == 1
+    assert metrics.lag > 0
+    subscriber.release.set()
+    event_store.destroy()
+    assert [e.id for e in subscriber.handled_events] == [0, 1]
+
+
+def test_metrics_per_subscriber_object() -> None:
+    dispatcher = AsyncDispatcher(workers=1)
+    first, second = BlockingSubscriber(), BlockingSubscriber()
+    first.release.set()
+    second.release.set()
+    dispatcher.add_subscriber(first.apply)
+    dispatcher.add_subscriber(second.apply)
+    dispatcher.deliver(first.apply, MockEvent("s", 0))
+    assert dispatcher.wait_idle(timeout=5)
+
+    metrics = dispatcher.metrics()
+    assert len(metrics) == 2
+    assert sorted(m.delivered for m in metrics.values()) == [0, 1]
+    assert all(key.startswith("BlockingSubscriber.apply@") for key in metrics)
+    dispatcher.shutdown()
+
+
+def test_removed_subscriber_stops_receiving(subscriber: BlockingSubscriber) -> None:
+    subscriber.release.set()
+    dispatcher = AsyncDispatcher(workers=1)
+    event_store = DefaultEventStore(NoopEventRepository(), dispatcher)
+    event_store.add_subscriber(subscriber.apply, "s")
+    event_store.add_subscriber(subscriber.apply, "t")
+
+    assert event_store.remove_subscriber(subscriber.apply, "s")
+    event_store.emit([MockEvent("t", 0)])
+    assert dispatcher.wait_idle(timeout=5)
+    assert event_store.remove_subscriber(subscriber.apply, "t")
+    event_store.emit([MockEvent("t", 1)])
+    assert dispatcher.wait_idle(timeout=5)
+
+    assert [e.id for e in subscriber.handled_events] == [0]
+    assert dispatcher.metrics() == {}
+    event_store.destroy()
@@ -0,0 +1,93 @@
+import asyncio
+from logging import getLogger
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    List,
+    Protocol,
+    Type,
+    runtime_checkable,
+)
+
+from .event_repository import EventRepository
+from .event_store import ALL_STREAMS, SubscriptionTable, TEvent
+from .types import Event
+
+logger = getLogger(__name__)
+
+__all__ = ["AsyncEventStore", "DefaultAsyncEventStore", "AsyncHandler"]
+
+AsyncHandler = Callable[[Any], Awaitable[None]]
+
+
+@runtime_checkable
+class AsyncEventStore(Protocol):
+    def add_subscriber(
+        self,
+        handler: Callable[[TEvent], Awaitable[None]],
+        stream_id: str = ALL_STREAMS,
+        event_type: Type[Any] = object,
+    ) -> None: ...
+    def remove_subscriber(
+        self,
+        handler: Callable[[TEvent], Awaitable[None]],
+        stream_id: str = ALL_STREAMS,
+        event_type: Type[Any] = object,
+    ) -> bool: ...
+    async def emit(self, events: List[TEvent]) -> None: ...
+    async def destroy(self) -> None: ...
+
+
+class DefaultAsyncEventStore(AsyncEventStore):
+    """
+    asyncio counterpart of DefaultEventStore. The (blocking) repository write
+    runs in a worker thread, then the async handlers of each event are
+    awaited concurrently before moving on to the next event.
+    """
+
+    def __init__(self, event_repository: EventRepository) -> None:
+        self._routing: SubscriptionTable[AsyncHandler] = SubscriptionTable({})
+        self._event_repository = event_repository
+
+    def add_subscriber(
+        self,
+        handler: Callable[[TEvent], Awaitable[None]],
+        stream_id: str = ALL_STREAMS,
+        event_type: Type[Any] = object,
+    ) -> None:
+        # Single-threaded within the loop, no lock needed
+        self._routing = self._routing.with_subscriber(handler, stream_id, event_type)
+
+    def remove_subscriber(
+        self,
+        handler: Callable[[TEvent], Awaitable[None]],
+        stream_id: str = ALL_STREAMS,
+        event_type: Type[Any] = object,
+    ) -> bool:
+        routing = self._routing.without_subscriber(handler, stream_id, event_type)
+        if routing is None:
+            return False
+        self._routing = routing
+        return True
+
+    async def emit(self, events: List[TEvent]) -> None:
+        await asyncio.to_thread(self._event_repository.store_all, list(events))
+        for event in events:
+            await self._notify_subscribers(event)
+
+    async def _notify_subscribers(self, event: Event) -> None:
+        handlers = self._routing.handlers_for(event.stream_id, type(event))
+        results = await asyncio.gather(
+            *(handler(event) for handler in handlers), return_exceptions=True
+        )
+        for handler, result in zip(handlers, results):
+            if isinstance(result, BaseException):
+                logger.error(
+                    f"Handler {handler.__name__ if hasattr(handler, '__name__') else handler} "
+                    f"failed for {event.stream_id}: {result}",
+                    exc_info=result,
+                )
+
+    async def destroy(self) -> None:
+        await asyncio.to_thread(self._event_repository.destroy)
@@ -0,0 +1,57 @@
+import asyncio
+from dataclasses import dataclass
+
+from .async_event_store import DefaultAsyncEventStore
+from .replay_wrapper import NoopEventRepository
+from .types import Event
+
+
+@dataclass
+class MockEvent(Event):
+    id: int
+
+
+@dataclass
+class OtherEvent(Event):
+    id: int
+
+
+class AsyncSubscriber:
+    def __init__(self) -> None:
+        self.handled_events: list[Event] = []
+
+    async def apply(self, event: Event) -> None:
+        await asyncio.sleep(0)
+        self.handled_events.append(event)
+
+
+def test_emit_awaits_matching_subscribers() -> None:
+    event_store = DefaultAsyncEventStore(NoopEventRepository())
+    subscriber1 = AsyncSubscriber()
+    subscriber2 = AsyncSubscriber()
+    event_store.add_subscriber(subscriber1.apply, "s")
+    event_store.add_subscriber(subscriber2.apply, event_type=OtherEvent)
+
+    asyncio.run(
+        event_store.emit([MockEvent("s", 1), OtherEvent("s", 2), MockEvent("t", 3)])
+    )
+
+    assert subscriber1.handled_events == [MockEvent("s", 1), OtherEvent("s", 2)]
+    assert subscriber2.handled_events == [OtherEvent("s", 2)]
+
+
+def test_failing_subscriber_does_not_stop_others() -> None:
+    event_store = DefaultAsyncEventStore(NoopEventRepository())
+    subscriber = AsyncSubscriber()
+
+    async def fail(event: Event) -> None:
+        raise RuntimeError("boom")
+
+    event_store.add_subscriber(fail)
+    event_store.add_subscriber(subscriber.apply)
+
+    asyncio.run(event_store.emit([MockEvent("s", 1)]))
+
+    assert subscriber.handled_events == [MockEvent("s", 1)]
+    assert event_store.remove_subscriber(fail) is True
+    assert event_store.remove_subscriber(fail) is False
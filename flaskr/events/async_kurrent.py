@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Protocol, TypeVar
+
+from kurrentdbclient import NewEvents, RecordedEvent
+
+from .embedded_kurrentdb import EmbeddedKurrentDB
+
+__all__ = ["AsyncKurrentLoop", "AsyncEmbeddedKurrentDB"]
+
+T = TypeVar("T")
+
+
+class _AsyncClient(Protocol):
+    async def connect(self) -> None: ...
+    async def close(self) -> None: ...
+
+
+class AsyncKurrentLoop:
+    """
+    One long-lived event loop on a daemon thread, owning a single async
+    KurrentDB client. gRPC aio channels are bound to the loop they were
+    connected in, so operations run on this loop and callers in any other
+    loop (Flask async views get a new one per request) await their result.
+    `close` closes the client and stops the loop.
+    """
+
+    def __init__(self, client_factory: Callable[[], Any]) -> None:
+        self._client_factory = client_factory
+        self._client: Any = None
+        self._closed = False
+        self._loop = asyncio.new_event_loop()
+        self._connecting = asyncio.Lock()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="kurrent-async", daemon=True
+        )
+        self._thread.start()
+
+    async def call(self, operation: Callable[[Any], Awaitable[T]]) -> T:
+        """
+        Run operation(client) on the client's loop and return its result.
+        Async iterators returned by the client must be consumed inside the
+        operation.
+        """
+        if self._closed:
+            raise ValueError("Async KurrentDB client is closed")
+        future = asyncio.run_coroutine_threadsafe(self._run(operation), self._loop)
+        return await asyncio.wrap_future(future)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        asyncio.run_coroutine_threadsafe(self._close_client(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _run(self, operation: Callable[[Any], Awaitable[T]]) -> T:
+        async with self._connecting:
+            if self._client is None:
+                client: _AsyncClient = self._client_factory()
+                await client.connect()
+                self._client = client
+        return await operation(self._client)
+
+    async def _close_client(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+class AsyncEmbeddedKurrentDB:
+    """
+    The part of AsyncKurrentDBClient the async repositories use, on top of
+    EmbeddedKurrentDB. Its SQLite calls are short, so they run on the loop
+    directly.
+    """
+
+    def __init__(self, db: EmbeddedKurrentDB) -> None:
+        self._db = db
+
+    async def connect(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        # The database itself is closed with the app
+        pass
+
+    async def read_stream(
+        self, stream_name: str, *, stream_position: int | None = None
+    ) -> AsyncIterator[RecordedEvent]:
+        return _iterate(
+            list(self._db.read_stream(stream_name, stream_position=stream_position))
+        )
+
+    async def multi_append_to_stream(
+        self, events: NewEvents | Iterable[NewEvents]
+    ) -> int:
+        return self._db.multi_append_to_stream(events)
+
+
+async def _iterate(items: list[T]) -> AsyncIterator[T]:
+    for item in items:
+        yield item
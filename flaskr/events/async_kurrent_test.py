@@ -0,0 +1,56 @@
+import asyncio
+import threading
+
+import pytest
+
+from .async_kurrent import AsyncKurrentLoop
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.connected = 0
+        self.closed = 0
+        self.threads: set[int] = set()
+
+    async def connect(self) -> None:
+        self.connected += 1
+
+    async def close(self) -> None:
+        self.closed += 1
+
+    async def read(self, value: int) -> int:
+        self.threads.add(threading.get_ident())
+        await asyncio.sleep(0)
+        return value
+
+
+def test_calls_from_many_loops_share_one_client() -> None:
+    clients: list[FakeClient] = []
+
+    def factory() -> FakeClient:
+        clients.append(FakeClient())
+        return clients[-1]
+
+    kurrent = AsyncKurrentLoop(factory)
+
+    async def request(value: int) -> list[int]:
+        return await asyncio.gather(
+            *(
+                kurrent.call(lambda client, v=v: client.read(v))
+                for v in range(value, value + 3)
+            )
+        )
+
+    # Every asyncio.run is a new loop, like a Flask async view per request
+    assert asyncio.run(request(0)) == [0, 1, 2]
+    assert asyncio.run(request(10)) == [10, 11, 12]
+
+    (client,) = clients
+    assert client.connected == 1
+    assert len(client.threads) == 1
+    assert threading.get_ident() not in client.threads
+
+    kurrent.close()
+    assert client.closed == 1
+    with pytest.raises(ValueError):
+        asyncio.run(request(0))
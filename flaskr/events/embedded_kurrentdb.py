@@ -0,0 +1,401 @@
+import re
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Iterator, Sequence
+from uuid import UUID
+
+from kurrentdbclient import CaughtUp, NewEvent, NewEvents, RecordedEvent, StreamState
+from kurrentdbclient.exceptions import NotFoundError, WrongCurrentVersionError
+
+from .kurrent_client import DEFAULT_FILTER_EXCLUDE, CatchupSubscription, KurrentClient
+
+__all__ = ["EmbeddedKurrentDB"]
+
+EventFilter = Callable[[RecordedEvent], bool]
+
+_COLUMNS = (
+    "commit_position, stream_name, stream_position, id, type, data, metadata, "
+    "content_type, recorded_at"
+)
+# Rows fetched per query while iterating a read or a subscription
+_PAGE_SIZE = 500
+
+
+class EmbeddedKurrentDB(KurrentClient):
+    """
+    In-process stand-in for KurrentDB on top of SQLite, for running the app,
+    the e2e tests and benchmarks without a database server. Supports what
+    the app uses: stream and $all reads (forwards and backwards, filtered by
+    event type or stream name), appends with expected version checks, atomic
+    multi-stream appends and catch-up subscriptions to $all.
+
+    Commit positions are a plain sequence starting at 1.
+    """
+
+    def __init__(self, db_path: str = "kurrent.db") -> None:
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        # Notified after every append, wakes up live subscriptions
+        self._appended = threading.Condition(self._lock)
+        self._last_position = 0
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS events (
+                    commit_position INTEGER PRIMARY KEY AUTOINCREMENT,
+                    stream_name TEXT NOT NULL,
+                    stream_position INTEGER NOT NULL,
+                    id TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    metadata BLOB NOT NULL,
+                    content_type TEXT NOT NULL,
+                    recorded_at TEXT NOT NULL,
+                    UNIQUE (stream_name, stream_position)
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS events_type ON events (type, commit_position)"
+            )
+            (position,) = self._connection.execute(
+                "SELECT MAX(commit_position) FROM events"
+            ).fetchone()
+            self._last_position = position or 0
+
+    def read_stream(
+        self,
+        stream_name: str,
+        *,
+        stream_position: int | None = None,
+        backwards: bool = False,
+        limit: int = sys.maxsize,
+    ) -> Iterator[RecordedEvent]:
+        if self.get_current_version(stream_name) == StreamState.NO_STREAM:
+            raise NotFoundError(f"Stream {stream_name!r} not found")
+        if stream_position is None:
+            stream_position = sys.maxsize if backwards else 0
+        return self._paged(
+            "stream_name = ?",
+            [stream_name],
+            "stream_position",
+            stream_position,
+            backwards,
+            limit,
+        )
+
+    def read_all(
+        self,
+        *,
+        commit_position: int | None = None,
+        backwards: bool = False,
+        filter_exclude: Sequence[str] = DEFAULT_FILTER_EXCLUDE,
+        filter_include: Sequence[str] = (),
+        filter_by_stream_name: bool = False,
+        filter_by_prefix: bool = False,
+        limit: int = sys.maxsize,
+    ) -> Iterator[RecordedEvent]:
+        if commit_position is None:
+            commit_position = sys.maxsize if backwards else 0
+        if isinstance(filter_include, str):
+            filter_include = [filter_include]
+        if (
+            filter_include
+            and not filter_by_stream_name
+            and not filter_by_prefix
+            and all(re.escape(name) == name for name in filter_include)
+        ):
+            # Plain event type names: let the type index do the filtering
+            placeholders = ", ".join("?" for _ in filter_include)
+            return self._paged(
+                f"type IN ({placeholders})",
+                list(filter_include),
+                "commit_position",
+                commit_position,
+                backwards,
+                limit,
+            )
+        matches = _event_filter(
+            filter_exclude, filter_include, filter_by_stream_name, filter_by_prefix
+        )
+        events = self._paged(
+            "1", [], "commit_position", commit_position, backwards, sys.maxsize
+        )
+        return _take((event for event in events if matches(event)), limit)
+
+    def get_current_version(self, stream_name: str) -> int | StreamState:
+        with self._lock:
+            revision = self._revision(stream_name)
+        return StreamState.NO_STREAM if revision == -1 else revision
+
+    def append_event(
+        self,
+        stream_name: str,
+        *,
+        event: NewEvent,
+        current_version: int | StreamState,
+    ) -> int:
+        return self.append_to_stream(
+            stream_name, events=event, current_version=current_version
+        )
+
+    def append_to_stream(
+        self,
+        stream_name: str,
+        *,
+        events: NewEvent | Iterable[NewEvent],
+        current_version: int | StreamState,
+    ) -> int:
+        if isinstance(events, NewEvent):
+            events = [events]
+        return self.multi_append_to_stream(
+            NewEvents(stream_name, events, current_version)
+        )
+
+    def multi_append_to_stream(self, events: NewEvents | Iterable[NewEvents]) -> int:
+        """
+        Append to several streams in one transaction: either every stream's
+        expected version matches and all events are written, or nothing is.
+        """
+        batches = [events] if isinstance(events, NewEvents) else list(events)
+        recorded_at = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            with self._connection:
+                commit_position = 0
+                for batch in batches:
+                    commit_position = self._append(batch, recorded_at)
+            self._last_position = commit_position or self._last_position
+            self._appended.notify_all()
+        return commit_position
+
+    def subscribe_to_all(
+        self,
+        *,
+        commit_position: int | None = None,
+        filter_exclude: Sequence[str] = DEFAULT_FILTER_EXCLUDE,
+        filter_include: Sequence[str] = (),
+        filter_by_stream_name: bool = False,
+        filter_by_prefix: bool = False,
+        include_caught_up: bool = False,
+    ) -> CatchupSubscription:
+        return _Subscription(
+            self,
+            commit_position or 0,
+            _event_filter(
+                filter_exclude, filter_include, filter_by_stream_name, filter_by_prefix
+            ),
+            include_caught_up,
+        )
+
+    def wait_for_append(
+        self, after: int, stopped: Callable[[], bool], timeout: float | None = None
+    ) -> bool:
+        """
+        Block until an event past the given commit position is appended, or
+        stopped() returns True. Returns False if the timeout expired first.
+        """
+        with self._lock:
+            return self._appended.wait_for(
+                lambda: stopped() or self._last_position > after, timeout
+            )
+
+    def wake_up(self) -> None:
+        with self._lock:
+            self._appended.notify_all()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _revision(self, stream_name: str) -> int:
+        (revision,) = self._connection.execute(
+            "SELECT MAX(stream_position) FROM events WHERE stream_name = ?",
+            (stream_name,),
+        ).fetchone()
+        return -1 if revision is None else revision
+
+    def _append(self, batch: NewEvents, recorded_at: str) -> int:
+        revision = self._revision(batch.stream_name)
+        _check_version(batch.stream_name, revision, batch.current_version)
+        commit_position = 0
+        for new_event in batch.events:
+            revision += 1
+            cursor = self._connection.execute(
+                f"INSERT INTO events ({_COLUMNS}) VALUES (NULL, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    batch.stream_name,
+                    revision,
+                    str(new_event.id),
+                    new_event.type,
+                    new_event.data,
+                    new_event.metadata,
+                    new_event.content_type,
+                    recorded_at,
+                ),
+            )
+            assert cursor.lastrowid is not None
+            commit_position = cursor.lastrowid
+        return commit_position
+
+    def _paged(
+        self,
+        where: str,
+        params: list[Any],
+        position_column: str,
+        start: int,
+        backwards: bool,
+        limit: int,
+    ) -> Iterator[RecordedEvent]:
+        """
+        Yield matching events a page at a time from `start` (inclusive), so
+        long reads neither load everything up front nor hold the lock while
+        the caller works.
+        """
+        comparison = "<=" if backwards else ">="
+        order = "DESC" if backwards else "ASC"
+        query = (
+            f"SELECT {_COLUMNS} FROM events WHERE {where} "
+            f"AND {position_column} {comparison} ? "
+            f"ORDER BY {position_column} {order} LIMIT ?"
+        )
+        column = 0 if position_column == "commit_position" else 2
+        while limit > 0:
+            with self._lock:
+                rows = self._connection.execute(
+                    query, [*params, start, min(limit, _PAGE_SIZE)]
+                ).fetchall()
+            for row in rows:
+                yield _recorded(row)
+            if len(rows) < _PAGE_SIZE:
+                return
+            limit -= len(rows)
+            start = rows[-1][column] + (-1 if backwards else 1)
+
+
+class _Subscription(CatchupSubscription):
+    def __init__(
+        self,
+        db: EmbeddedKurrentDB,
+        commit_position: int,
+        matches: EventFilter,
+        include_caught_up: bool,
+    ) -> None:
+        self._db = db
+        # Like KurrentDB, start after the given position
+        self._position = commit_position
+        self._matches = matches
+        self._include_caught_up = include_caught_up
+        self._stopped = threading.Event()
+
+    def __iter__(self) -> Iterator[RecordedEvent]:
+        caught_up = False
+        while not self._stopped.is_set():
+            page = list(
+                self._db.read_all(
+                    commit_position=self._position + 1,
+                    filter_exclude=(),
+                    limit=_PAGE_SIZE,
+                )
+            )
+            for event in page:
+                self._position = event.commit_position
+                if self._matches(event):
+                    yield event
+                if self._stopped.is_set():
+                    return
+            if page:
+                continue
+            if self._include_caught_up and not caught_up:
+                caught_up = True
+                yield CaughtUp(0, self._position, self._position, None)
+            self._db.wait_for_append(self._position, self._stopped.is_set)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._db.wake_up()
+
+
+def _check_version(
+    stream_name: str, revision: int, expected: int | StreamState
+) -> None:
+    if expected == StreamState.ANY:
+        return
+    if expected == StreamState.NO_STREAM:
+        ok = revision == -1
+    elif expected == StreamState.EXISTS:
+        ok = revision >= 0
+    else:
+        ok = revision == expected
+    if not ok:
+        raise WrongCurrentVersionError(
+            f"Stream {stream_name!r} is at version {revision}, expected {expected}",
+            stream_name=stream_name,
+            actual_version=revision,
+            expected_version=expected,
+        )
+
+
+def _event_filter(
+    filter_exclude: Sequence[str],
+    filter_include: Sequence[str],
+    filter_by_stream_name: bool,
+    filter_by_prefix: bool,
+) -> EventFilter:
+    """
+    Predicate with the same meaning as KurrentDB's server-side filters: a
+    regex over the whole event type (or stream name), or a set of prefixes.
+    """
+    if isinstance(filter_include, str):
+        filter_include = [filter_include]
+    if isinstance(filter_exclude, str):
+        filter_exclude = [filter_exclude]
+
+    def field(event: RecordedEvent) -> str:
+        return event.stream_name if filter_by_stream_name else event.type
+
+    if filter_by_prefix:
+        prefixes = tuple(filter_include)
+        return lambda event: not prefixes or field(event).startswith(prefixes)
+    if filter_include:
+        include = re.compile("|".join(filter_include))
+        return lambda event: include.fullmatch(field(event)) is not None
+    if filter_exclude:
+        exclude = re.compile("|".join(filter_exclude))
+        return lambda event: exclude.fullmatch(field(event)) is None
+    return lambda event: True
+
+
+def _take(events: Iterator[RecordedEvent], limit: int) -> Iterator[RecordedEvent]:
+    for i, event in enumerate(events):
+        if i >= limit:
+            return
+        yield event
+
+
+def _recorded(row: Any) -> RecordedEvent:
+    (
+        commit_position,
+        stream_name,
+        stream_position,
+        id,
+        type,
+        data,
+        metadata,
+        content_type,
+        recorded_at,
+    ) = row
+    return RecordedEvent(
+        type=type,
+        data=data,
+        metadata=metadata,
+        content_type=content_type,
+        id=UUID(id),
+        stream_name=stream_name,
+        stream_position=stream_position,
+        commit_position=commit_position,
+        prepare_position=commit_position,
+        recorded_at=datetime.fromisoformat(recorded_at),
+    )
@@ -0,0 +1,128 @@
+import threading
+from pathlib import Path
+from typing import Generator
+
+import pytest
+from kurrentdbclient import CaughtUp, NewEvent, NewEvents, RecordedEvent, StreamState
+from kurrentdbclient.exceptions import NotFoundError, WrongCurrentVersionError
+
+from .embedded_kurrentdb import EmbeddedKurrentDB
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> Generator[EmbeddedKurrentDB, None, None]:
+    db = EmbeddedKurrentDB(str(tmp_path / "kurrent.db"))
+    yield db
+    db.close()
+
+
+def new_event(type: str) -> NewEvent:
+    return NewEvent(type, data=b"{}")
+
+
+def test_append_and_read_stream(db: EmbeddedKurrentDB) -> None:
+    first = db.append_to_stream(
+        "a", events=[new_event("A1"), new_event("A2")], current_version=StreamState.ANY
+    )
+    db.append_to_stream("b", events=new_event("B1"), current_version=StreamState.ANY)
+    db.append_to_stream("a", events=new_event("A3"), current_version=1)
+
+    assert [e.type for e in db.read_stream("a")] == ["A1", "A2", "A3"]
+    assert [e.stream_position for e in db.read_stream("a")] == [0, 1, 2]
+    assert [e.type for e in db.read_stream("a", stream_position=1)] == ["A2", "A3"]
+    assert [e.type for e in db.read_stream("a", backwards=True, limit=2)] == [
+        "A3",
+        "A2",
+    ]
+    assert first == 2
+    assert db.get_current_version("a") == 2
+    assert db.get_current_version("missing") == StreamState.NO_STREAM
+    with pytest.raises(NotFoundError):
+        list(db.read_stream("missing"))
+
+
+def test_expected_version_checks(db: EmbeddedKurrentDB) -> None:
+    db.append_to_stream(
+        "a", events=new_event("A1"), current_version=StreamState.NO_STREAM
+    )
+
+    with pytest.raises(WrongCurrentVersionError) as conflict:
+        db.append_to_stream("a", events=new_event("A2"), current_version=5)
+    assert conflict.value.stream_name == "a"
+    with pytest.raises(WrongCurrentVersionError):
+        db.append_to_stream(
+            "a", events=new_event("A2"), current_version=StreamState.NO_STREAM
+        )
+    with pytest.raises(WrongCurrentVersionError):
+        db.append_to_stream(
+            "b", events=new_event("B1"), current_version=StreamState.EXISTS
+        )
+
+
+def test_multi_append_is_atomic(db: EmbeddedKurrentDB) -> None:
+    db.append_to_stream("a", events=new_event("A1"), current_version=StreamState.ANY)
+
+    with pytest.raises(WrongCurrentVersionError):
+        db.multi_append_to_stream(
+            [
+                NewEvents("b", [new_event("B1")], StreamState.NO_STREAM),
+                NewEvents("a", [new_event("A2")], StreamState.NO_STREAM),
+            ]
+        )
+
+    assert db.get_current_version("b") == StreamState.NO_STREAM
+    assert [e.type for e in db.read_all()] == ["A1"]
+
+
+def test_filtered_reads_of_all(db: EmbeddedKurrentDB) -> None:
+    for i in range(1200):
+        db.append_to_stream(
+            f"Planning:{i % 3}",
+            events=new_event("Scheduled" if i % 100 == 0 else "Other"),
+            current_version=StreamState.ANY,
+        )
+
+    latest = next(db.read_all(filter_include=("Scheduled",), backwards=True, limit=1))
+    assert latest.commit_position == 1101
+    assert len(list(db.read_all(filter_include=("Sched.*",)))) == 12
+    assert len(list(db.read_all(commit_position=1001))) == 200
+    by_stream = db.read_all(
+        filter_include=("Planning:1",),
+        filter_by_stream_name=True,
+        filter_by_prefix=True,
+    )
+    assert {e.stream_name for e in by_stream} == {"Planning:1"}
+
+
+def test_catch_up_subscription(db: EmbeddedKurrentDB) -> None:
+    db.append_to_stream("a", events=new_event("A1"), current_version=StreamState.ANY)
+    db.append_to_stream("b", events=new_event("B1"), current_version=StreamState.ANY)
+    subscription = db.subscribe_to_all(
+        commit_position=1,
+        filter_include=("a", "b"),
+        filter_by_stream_name=True,
+        filter_by_prefix=True,
+        include_caught_up=True,
+    )
+    received: list[RecordedEvent] = []
+    caught_up = threading.Event()
+
+    def follow() -> None:
+        for event in subscription:
+            if isinstance(event, CaughtUp):
+                caught_up.set()
+            else:
+                received.append(event)
+
+    thread = threading.Thread(target=follow)
+    thread.start()
+    assert caught_up.wait(5)
+    db.append_to_stream("c", events=new_event("C1"), current_version=StreamState.ANY)
+    db.append_to_stream("a", events=new_event("A2"), current_version=StreamState.ANY)
+    subscription.stop()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    # The live event may or may not have been delivered before stop()
+    assert [e.type for e in received][:1] == ["B1"]
+    assert "C1" not in [e.type for e in received]
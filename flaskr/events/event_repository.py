@@ -1,42 +1,389 @@
+import importlib
 import json
-from typing import Any, Protocol
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Iterator, Protocol, TextIO
+
+from .serialisation import event_record
+
+INDEX_SUFFIX = ".idx"
+
+
+class Durability(Enum):
+    # Hand the data to the OS (write + flush), never fsync
+    FLUSH = "flush"
+    # fsync after every single event
+    EVENT = "event"
+    # fsync once per written batch
+    BATCH = "batch"
+    # Like BATCH, but the group-commit writer waits up to `commit_interval`
+    # for more appends to join the batch before syncing it
+    INTERVAL = "interval"
 
 
 class EventRepository(Protocol):
     def store(self, event: Any) -> None: ...
+
+    def store_all(self, events: list[Any]) -> None:
+        for event in events:
+            self.store(event)
+
     def destroy(self) -> None: ...
 
 
+def record_stream_id(record: dict[str, Any]) -> str:
+    """
+    Stream of a log record. Records written before the index existed only
+    carry it inside the payload.
+    """
+    stream_id = record.get("stream_id")
+    if stream_id is None:
+        stream_id = record["payload"]["stream_id"]
+    return stream_id
+
+
+def decode_record(record: dict[str, Any]) -> Any:
+    """
+    Rebuild an event from a record written by FileEventRepository.
+    """
+    event_class = getattr(importlib.import_module(record["module"]), record["type"])
+    return event_class(**{"stream_id": record_stream_id(record), **record["payload"]})
+
+
+@dataclass
+class _PendingWrite:
+    # (stream_id, encoded line including the trailing newline)
+    lines: list[tuple[str, bytes]]
+    done: threading.Event = field(default_factory=threading.Event)
+    error: BaseException | None = None
+
+
 class FileEventRepository(EventRepository):
-    def __init__(self, file_path: str = "events.jsonl"):
+    """
+    Appends events as JSON lines. Writes are serialised by the repository
+    itself, so callers do not need to hold a lock around `store`.
+
+    With `group_commit` enabled, appends are handed to a background writer
+    thread through a bounded queue. The writer coalesces everything that is
+    pending into one write (and at most one fsync, depending on `durability`)
+    and only then releases the callers waiting in `store`/`store_all`.
+
+    Next to the log a sidecar index (`<file_path>.idx`) maps every stream to
+    the byte offsets of its events, in revision order. It is caught up with
+    the log on open, so `read_stream` can seek straight to a stream's lines
+    instead of parsing the whole file.
+    """
+
+    def __init__(
+        self,
+        file_path: str = "events.jsonl",
+        durability: Durability = Durability.FLUSH,
+        group_commit: bool = False,
+        max_pending: int = 1024,
+        commit_interval: float = 0.002,
+    ):
         self._file_path = file_path
-        self._events_file = open(file_path, "a")
+        self._durability = durability
+        self._commit_interval = commit_interval
+        self._max_pending = max_pending
+        _drop_torn_tail(file_path)
+        self._events_file = open(file_path, "ab")
+        self._closed = False
+        self._lock = threading.Lock()
+        # stream_id -> [(offset, length)], list position is the stream revision
+        self._streams: dict[str, list[tuple[int, int]]] = {}
+        self._index_lock = threading.Lock()
+        self._index_file = self._open_index()
+        self._pending: queue.Queue[_PendingWrite | None] | None = None
+        self._writer: threading.Thread | None = None
+        # Set under _enqueue_lock once nothing may be queued any more: on
+        # destroy, before the sentinel, and when the writer has exited
+        self._closing = False
+        self._enqueue_lock = threading.Lock()
+        # Writes the writer has taken off the queue and not released yet
+        self._batch: list[_PendingWrite] = []
+        if group_commit:
+            self._pending = queue.Queue(maxsize=max_pending)
+            self._writer = threading.Thread(
+                target=self._run_writer, name="event-writer", daemon=True
+            )
+            self._writer.start()
 
     def store(self, event: Any) -> None:
-        event_type = type(event)  # type: ignore[misc]
-        # Serialize event to JSON
-        # Try to use __dict__, but allow for custom serialization
-        try:
-            payload = event.__dict__
-        except AttributeError:
-            # Handle objects with __slots__ or other special cases
-            if hasattr(event, "to_dict"):
-                payload = event.to_dict()
-            else:
-                raise ValueError(
-                    f"Event {event_type.__name__} must have __dict__ or to_dict() method"
-                )
+        self.store_all([event])
 
-        event_json = json.dumps(
-            {
-                "module": event_type.__module__,
-                "type": event_type.__name__,
-                "payload": payload,
-            }
-        )
-        self._events_file.write(event_json + "\n")
-        self._events_file.flush()
+    def store_all(self, events: list[Any]) -> None:
+        lines = [self._serialise(event) for event in events]
+        if not lines:
+            return
+        if self._pending is None:
+            with self._lock:
+                self._check_open()
+                self._write(lines)
+            return
+
+        pending = _PendingWrite(lines)
+        with self._enqueue_lock:
+            if self._closing:
+                raise ValueError(f"Event repository {self._file_path} is destroyed")
+            self._pending.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
 
     def destroy(self) -> None:
+        if self._pending is not None and self._writer is not None:
+            with self._enqueue_lock:
+                if not self._closing:
+                    self._closing = True
+                    # The sentinel is queued behind every pending write, so
+                    # they all get committed before the writer exits
+                    self._pending.put(None)
+            self._writer.join()
+        with self._lock:
+            self._closed = True
+            self._events_file.flush()
+            self._events_file.close()
+        with self._index_lock:
+            self._index_file.close()
+
+    def read_stream(self, stream_id: str, from_revision: int = 0) -> Iterator[Any]:
+        """
+        Yield the events of a single stream, starting at `from_revision`.
+        Only that stream's lines are read from the log.
+        """
+        with self._index_lock:
+            positions = self._streams.get(stream_id, [])[from_revision:]
+        if not positions:
+            return
+        with open(self._file_path, "rb") as log:
+            for offset, length in positions:
+                log.seek(offset)
+                yield decode_record(json.loads(log.read(length)))
+
+    def stream_revision(self, stream_id: str) -> int:
+        """
+        Revision of the last stored event of the stream, -1 if it has none.
+        """
+        with self._index_lock:
+            return len(self._streams.get(stream_id, [])) - 1
+
+    def _serialise(self, event: Any) -> tuple[str, bytes]:
+        record = json.dumps(event_record(event))
+        return event.stream_id, (record + "\n").encode()
+
+    def _write(self, lines: list[tuple[str, bytes]]) -> None:
+        offset = self._events_file.tell()
+        entries: list[tuple[str, int, int]] = []
+        for stream_id, line in lines:
+            entries.append((stream_id, offset, len(line)))
+            offset += len(line)
+
+        if self._durability is Durability.EVENT:
+            for _, line in lines:
+                self._events_file.write(line)
+                self._sync()
+        else:
+            self._events_file.write(b"".join(line for _, line in lines))
+            if self._durability is Durability.FLUSH:
+                self._events_file.flush()
+            else:
+                self._sync()
+
+        # The index is only advanced once the lines are in the log; if we crash
+        # in between, the next open catches the index up again
+        self._add_to_index(entries)
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise ValueError(f"Event repository {self._file_path} is destroyed")
+
+    def _sync(self) -> None:
         self._events_file.flush()
-        self._events_file.close()
+        os.fsync(self._events_file.fileno())
+
+    def _run_writer(self) -> None:
+        try:
+            self._write_batches()
+        finally:
+            # Fail whatever is still in flight or queued, e.g. if the writer
+            # died. The first pass makes room for a store_all blocked on a
+            # full queue.
+            self._fail(self._batch)
+            self._fail_queued()
+            with self._enqueue_lock:
+                self._closing = True
+            self._fail_queued()
+
+    def _fail_queued(self) -> None:
+        assert self._pending is not None
+        while True:
+            try:
+                pending = self._pending.get_nowait()
+            except queue.Empty:
+                return
+            if pending is not None:
+                self._fail([pending])
+
+    def _fail(self, batch: list[_PendingWrite]) -> None:
+        for pending in batch:
+            if not pending.done.is_set():
+                pending.error = ValueError(
+                    f"Event repository {self._file_path} stopped writing"
+                )
+                pending.done.set()
+
+    def _write_batches(self) -> None:
+        assert self._pending is not None
+        while True:
+            first = self._pending.get()
+            if first is None:
+                return
+            batch = self._batch = [first]
+            stop = self._collect_batch(batch)
+            try:
+                with self._lock:
+                    self._check_open()
+                    self._write([line for pending in batch for line in pending.lines])
+            except BaseException as e:
+                for pending in batch:
+                    pending.error = e
+            for pending in batch:
+                pending.done.set()
+            self._batch = []
+            if stop:
+                return
+
+    def _collect_batch(self, batch: list[_PendingWrite]) -> bool:
+        """
+        Add whatever else is already queued to `batch`. In INTERVAL mode keep
+        waiting for late arrivals until the commit window closes. Returns
+        True if the sentinel was reached.
+        """
+        assert self._pending is not None
+        deadline = time.monotonic() + self._commit_interval
+        while len(batch) < self._max_pending:
+            try:
+                if self._durability is Durability.INTERVAL:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        item = self._pending.get_nowait()
+                    else:
+                        item = self._pending.get(timeout=timeout)
+                else:
+                    item = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return True
+            batch.append(item)
+        return False
+
+    def _open_index(self) -> TextIO:
+        """
+        Load the sidecar index and catch it up with the log. The index is
+        rebuilt from scratch if it does not match the log.
+        """
+        index_path = self._file_path + INDEX_SUFFIX
+        indexed_end = 0
+        if os.path.exists(index_path):
+            indexed_end, valid_bytes = self._load_index(index_path)
+            if not self._index_matches_log(indexed_end):
+                self._streams = {}
+                indexed_end = 0
+                os.remove(index_path)
+            elif valid_bytes < os.path.getsize(index_path):
+                # Cut off a torn trailing entry, so the next one is not
+                # appended onto it
+                os.truncate(index_path, valid_bytes)
+
+        index_file = open(index_path, "a", encoding="utf-8")
+        self._write_index_entries(index_file, list(self._scan_log(indexed_end)))
+        return index_file
+
+    def _load_index(self, index_path: str) -> tuple[int, int]:
+        """
+        Returns the log offset the index covers (-1 if it is inconsistent)
+        and the length of its intact entries.
+        """
+        indexed_end = 0
+        valid_bytes = 0
+        with open(index_path, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("Unterminated index entry")
+                    stream_id, revision, offset, length = json.loads(line)
+                except ValueError:
+                    # Torn trailing entry, the log scan will re-add it
+                    break
+                positions = self._streams.setdefault(stream_id, [])
+                if revision != len(positions):
+                    return -1, 0
+                positions.append((offset, length))
+                indexed_end = max(indexed_end, offset + length)
+                valid_bytes += len(line)
+        return indexed_end, valid_bytes
+
+    def _index_matches_log(self, indexed_end: int) -> bool:
+        if indexed_end < 0 or indexed_end > os.path.getsize(self._file_path):
+            return False
+        if indexed_end == 0:
+            return True
+        with open(self._file_path, "rb") as log:
+            log.seek(indexed_end - 1)
+            return log.read(1) == b"\n"
+
+    def _scan_log(self, start: int) -> Iterator[tuple[str, int, int]]:
+        with open(self._file_path, "rb") as log:
+            log.seek(start)
+            offset = start
+            for line in log:
+                if not line.endswith(b"\n"):
+                    # Partially written last line, not a committed event
+                    break
+                if line.strip():
+                    yield record_stream_id(json.loads(line)), offset, len(line)
+                offset += len(line)
+
+    def _add_to_index(self, entries: list[tuple[str, int, int]]) -> None:
+        with self._index_lock:
+            self._write_index_entries(self._index_file, entries)
+
+    def _write_index_entries(
+        self, index_file: TextIO, entries: list[tuple[str, int, int]]
+    ) -> None:
+        for stream_id, offset, length in entries:
+            positions = self._streams.setdefault(stream_id, [])
+            index_file.write(
+                json.dumps([stream_id, len(positions), offset, length]) + "\n"
+            )
+            positions.append((offset, length))
+        index_file.flush()
+
+
+def _drop_torn_tail(file_path: str) -> None:
+    """
+    Cut off a partially written last line, left by a crash mid-append, so
+    new events do not get appended onto it.
+    """
+    if not os.path.exists(file_path):
+        return
+    with open(file_path, "r+b") as log:
+        end = log.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - 4096)
+            log.seek(start)
+            block = log.read(position - start)
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position != end:
+            log.truncate(position)
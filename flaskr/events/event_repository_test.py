@@ -0,0 +1,264 @@
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from .event_repository import INDEX_SUFFIX, Durability, FileEventRepository
+from .types import Event
+
+
+@dataclass
+class MockEvent(Event):
+    id: int
+
+
+def read_ids(path: Path) -> list[int]:
+    with open(path) as f:
+        return [json.loads(line)["payload"]["id"] for line in f]
+
+
+def test_store_appends_json_lines(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    repository = FileEventRepository(str(path))
+
+    repository.store(MockEvent("s", 1))
+    repository.store_all([MockEvent("s", 2), MockEvent("s", 3)])
+    repository.destroy()
+
+    assert read_ids(path) == [1, 2, 3]
+
+
+def test_group_commit_coalesces_concurrent_writers(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    fsyncs: list[int] = []
+    monkeypatch.setattr(
+        "flaskr.events.event_repository.os.fsync", lambda fd: fsyncs.append(fd)  # type: ignore[misc]
+    )
+    path = tmp_path / "events.jsonl"
+    repository = FileEventRepository(
+        str(path),
+        durability=Durability.INTERVAL,
+        group_commit=True,
+        commit_interval=0.2,
+    )
+    writers = 8
+    barrier = threading.Barrier(writers)
+
+    def write(i: int) -> None:
+        barrier.wait()
+        repository.store(MockEvent("s", i))
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    repository.destroy()
+
+    assert sorted(read_ids(path)) == list(range(writers))
+    assert 0 < len(fsyncs) < writers
+
+
+def test_group_commit_store_returns_after_write(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    repository = FileEventRepository(
+        str(path), durability=Durability.BATCH, group_commit=True
+    )
+
+    repository.store_all([MockEvent("s", 1), MockEvent("s", 2)])
+
+    assert read_ids(path) == [1, 2]
+    repository.destroy()
+
+
+def test_group_commit_propagates_write_errors(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    repository = FileEventRepository(str(tmp_path / "events.jsonl"), group_commit=True)
+
+    def fail(lines: list[tuple[str, bytes]]) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(repository, "_write", fail)
+
+    with pytest.raises(OSError, match="disk full"):
+        repository.store(MockEvent("s", 1))
+    repository.destroy()
+
+
+def test_group_commit_fails_queued_writes_when_writer_dies(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    repository = FileEventRepository(str(tmp_path / "events.jsonl"), group_commit=True)
+    collected = threading.Event()
+    release = threading.Event()
+
+    def die(batch: object) -> bool:
+        collected.set()
+        release.wait()
+        raise RuntimeError("writer bug")
+
+    # Both the batch the writer dies on and the write queued behind it are
+    # failed instead of hanging
+    errors: list[BaseException] = []
+
+    def store(id: int) -> None:
+        try:
+            repository.store(MockEvent("s", id))
+        except ValueError as e:
+            errors.append(e)
+
+    monkeypatch.setattr(repository, "_collect_batch", die)
+
+    # The writer thread dying is the point, do not report it
+    def ignore(args: threading.ExceptHookArgs) -> None:
+        pass
+
+    monkeypatch.setattr(threading, "excepthook", ignore)
+    first = threading.Thread(target=store, args=(1,))
+    first.start()
+    assert collected.wait(timeout=5)
+    second = threading.Thread(target=store, args=(2,))
+    second.start()
+    time.sleep(0.05)
+    release.set()
+    first.join(timeout=5)
+    second.join(timeout=5)
+    assert not first.is_alive() and not second.is_alive()
+    assert len(errors) == 2
+
+    with pytest.raises(ValueError):
+        repository.store(MockEvent("s", 3))
+    repository.destroy()
+
+
+def test_read_stream_returns_only_that_stream(tmp_path: Path) -> None:
+    repository = FileEventRepository(str(tmp_path / "events.jsonl"))
+    repository.store_all(
+        [MockEvent("a", 1), MockEvent("b", 2), MockEvent("a", 3), MockEvent("a", 4)]
+    )
+
+    assert list(repository.read_stream("a")) == [
+        MockEvent("a", 1),
+        MockEvent("a", 3),
+        MockEvent("a", 4),
+    ]
+    assert list(repository.read_stream("a", from_revision=2)) == [MockEvent("a", 4)]
+    assert list(repository.read_stream("missing")) == []
+    assert repository.stream_revision("a") == 2
+    repository.destroy()
+
+
+def test_index_is_caught_up_on_open(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    repository = FileEventRepository(str(path))
+    repository.store_all([MockEvent("a", 1), MockEvent("b", 2)])
+    repository.destroy()
+    # Events appended behind the index's back, e.g. by a crash before indexing
+    with open(path, "a") as f:
+        f.write(
+            json.dumps(
+                {
+                    "module": __name__,
+                    "type": "MockEvent",
+                    "stream_id": "a",
+                    "payload": {"stream_id": "a", "id": 3},
+                }
+            )
+            + "\n"
+        )
+
+    repository = FileEventRepository(str(path))
+
+    assert list(repository.read_stream("a")) == [MockEvent("a", 1), MockEvent("a", 3)]
+    assert list(repository.read_stream("b")) == [MockEvent("b", 2)]
+    repository.destroy()
+
+
+def test_torn_index_entry_is_cut_off_on_open(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    index_path = str(path) + INDEX_SUFFIX
+    repository = FileEventRepository(str(path))
+    repository.store_all([MockEvent("a", 1), MockEvent("a", 2)])
+    repository.destroy()
+    # A crash halfway through writing the second index entry
+    with open(index_path, "rb") as f:
+        first, second = f.read().splitlines(keepends=True)
+    with open(index_path, "wb") as f:
+        f.write(first + second[:5])
+
+    for id in (3, 4):
+        repository = FileEventRepository(str(path))
+        repository.store(MockEvent("a", id))
+        repository.destroy()
+
+    with open(index_path) as f:
+        entries = [json.loads(line) for line in f]
+    assert [revision for _, revision, _, _ in entries] == [0, 1, 2, 3]
+    repository = FileEventRepository(str(path))
+    assert [e.id for e in repository.read_stream("a")] == [1, 2, 3, 4]
+    repository.destroy()
+
+
+def test_index_is_rebuilt_when_it_does_not_match_log(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    repository = FileEventRepository(str(path))
+    repository.store_all([MockEvent("a", 1), MockEvent("a", 2)])
+    repository.destroy()
+    with open(str(path) + INDEX_SUFFIX, "a") as f:
+        f.write(json.dumps(["a", 2, 10_000, 10]) + "\n")
+
+    repository = FileEventRepository(str(path))
+
+    assert list(repository.read_stream("a")) == [MockEvent("a", 1), MockEvent("a", 2)]
+    repository.destroy()
+
+
+def test_opens_logs_in_the_baseline_format(tmp_path: Path) -> None:
+    # Before the index, stream_id was only written inside the payload
+    path = tmp_path / "events.jsonl"
+    with open(path, "w") as f:
+        for id in (1, 2):
+            record = {
+                "module": MockEvent.__module__,
+                "type": "MockEvent",
+                "payload": {"stream_id": "s", "id": id},
+            }
+            f.write(json.dumps(record) + "\n")
+
+    repository = FileEventRepository(str(path))
+    repository.store(MockEvent("s", 3))
+
+    assert [e.id for e in repository.read_stream("s")] == [1, 2, 3]
+    assert repository.stream_revision("s") == 2
+    repository.destroy()
+
+
+def test_torn_last_line_is_dropped_on_open(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    repository = FileEventRepository(str(path))
+    repository.store(MockEvent("s", 1))
+    repository.destroy()
+    with open(path, "a") as f:
+        f.write('{"module": "torn')
+
+    repository = FileEventRepository(str(path))
+    repository.store(MockEvent("s", 2))
+    repository.destroy()
+
+    assert read_ids(path) == [1, 2]
+
+
+@pytest.mark.parametrize("group_commit", [False, True])
+def test_store_after_destroy_raises(tmp_path: Path, group_commit: bool) -> None:
+    repository = FileEventRepository(
+        str(tmp_path / "events.jsonl"), group_commit=group_commit
+    )
+    repository.destroy()
+
+    with pytest.raises(ValueError, match="destroyed"):
+        repository.store(MockEvent("s", 1))
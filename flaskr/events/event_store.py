@@ -3,6 +3,7 @@ from logging import getLogger
 from typing import (
     Any,
     Callable,
+    Generic,
     List,
     Protocol,
     Type,
@@ -10,6 +11,7 @@ from typing import (
     runtime_checkable,
 )
 
+from .async_dispatch import AsyncDispatcher, SubscriberMetrics
 from .event_repository import EventRepository
 from .types import Event
 
@@ -40,11 +42,87 @@ class EventStore(Protocol):
     def destroy(self) -> None: ...
 
 
+THandler = TypeVar("THandler", bound=Callable[..., Any])
+
+
+class SubscriptionTable(Generic[THandler]):
+    """
+    Snapshot of the subscriptions together with a lazily filled
+    dispatch table keyed by (subscribed stream, concrete event class).
+    Streams without subscribers of their own share the ALL_STREAMS entries,
+    so the table does not grow with the number of streams. Subscription
+    changes build a new table, so publishers never need a lock.
+    """
+
+    def __init__(
+        self, subscribers: dict[str, tuple[tuple[Type[Any], THandler], ...]]
+    ) -> None:
+        self.subscribers = subscribers
+        self.table: dict[tuple[str, type], tuple[THandler, ...]] = {}
+
+    def handlers_for(self, stream_id: str, event_class: type) -> tuple[THandler, ...]:
+        if stream_id not in self.subscribers:
+            stream_id = ALL_STREAMS
+        key = (stream_id, event_class)
+        handlers = self.table.get(key)
+        if handlers is None:
+            stream_subscribers = (
+                self.subscribers[stream_id] if stream_id != ALL_STREAMS else ()
+            )
+            handlers = tuple(
+                handler
+                for event_type, handler in (
+                    *stream_subscribers,
+                    *self.subscribers.get(ALL_STREAMS, ()),
+                )
+                if issubclass(event_class, event_type)
+            )
+            # A concurrent fill computes the same entry, so racing is harmless
+            self.table[key] = handlers
+        return handlers
+
+    def with_subscriber(
+        self, handler: THandler, stream_id: str, event_type: Type[Any]
+    ) -> "SubscriptionTable[THandler]":
+        subscribers = dict(self.subscribers)
+        subscribers[stream_id] = (
+            *subscribers.get(stream_id, ()),
+            (event_type, handler),
+        )
+        return SubscriptionTable(subscribers)
+
+    def without_subscriber(
+        self, handler: THandler, stream_id: str, event_type: Type[Any]
+    ) -> "SubscriptionTable[THandler] | None":
+        """
+        Returns None if there is no such subscription.
+        """
+        stream_subscribers = list(self.subscribers.get(stream_id, ()))
+        try:
+            stream_subscribers.remove((event_type, handler))
+        except ValueError:
+            return None
+        subscribers = dict(self.subscribers)
+        if stream_subscribers:
+            subscribers[stream_id] = tuple(stream_subscribers)
+        else:
+            del subscribers[stream_id]
+        return SubscriptionTable(subscribers)
+
+
 class DefaultEventStore(EventStore):
-    def __init__(self, event_repository: EventRepository) -> None:
-        # Dictionary mapping event types to lists of handler functions
-        self._subscribers: dict[str, list[tuple[Type[Any], Callable[[Any], None]]]] = {}
+    def __init__(
+        self,
+        event_repository: EventRepository,
+        dispatcher: AsyncDispatcher | None = None,
+    ) -> None:
+        # Subscriptions per stream, swapped copy-on-write together with the
+        # dispatch table on every change
+        self._routing: SubscriptionTable[Callable[[Any], None]] = SubscriptionTable({})
         self._event_repository = event_repository
+        # When set, handlers run on the dispatcher's workers instead of the
+        # emitting thread, so emit only waits for persistence
+        self._dispatcher = dispatcher
         self._lock = threading.Lock()
 
     def add_subscriber(
@@ -58,8 +136,11 @@ class DefaultEventStore(EventStore):
         """
 
         with self._lock:
-            # Add the handler to the list of subscribers for this event type
-            self._subscribers.setdefault(stream_id, []).append((event_type, handler))
+            self._routing = self._routing.with_subscriber(
+                handler, stream_id, event_type
+            )
+            if self._dispatcher is not None:
+                self._dispatcher.add_subscriber(handler)
 
     def remove_subscriber(
         self,
@@ -72,22 +153,35 @@ class DefaultEventStore(EventStore):
         Returns True if the handler was found and removed, False otherwise.
         """
         with self._lock:
-            if stream_id in self._subscribers:
-                try:
-                    self._subscribers[stream_id].remove((event_type, handler))
-                    return True
-                except ValueError:
-                    return False
-            return False
+            routing = self._routing.without_subscriber(handler, stream_id, event_type)
+            if routing is None:
+                return False
+            self._routing = routing
+            if self._dispatcher is not None:
+                self._dispatcher.remove_subscriber(handler)
+            return True
 
     def emit(self, events: List[TEvent]) -> None:
         """
-        Emit an event: persist it to the database and notify all registered handlers.
+        Emit events: persist them to the database and notify all registered handlers.
+        The whole list is handed to the repository at once, so it can be written
+        (and synced) as a single batch. Repositories serialise their own writes,
+        so no store-wide lock is held while persisting.
+
+        With asynchronous dispatch under the FAIL policy, SubscriberQueueFull
+        is raised before anything is persisted; once events are stored, emit
+        does not fail because of a subscriber.
         """
-
+        if self._dispatcher is not None:
+            routing = self._routing
+            self._dispatcher.check_capacity(
+                handler
+                for event in events
+                for handler in routing.handlers_for(event.stream_id, type(event))
+            )
+
+        self._event_repository.store_all(events)
         for event in events:
-            with self._lock:
-                self._event_repository.store(event)
             self._notify_subscribers(event)
 
     def _notify_subscribers(self, event: Event) -> None:
@@ -95,20 +189,19 @@ class DefaultEventStore(EventStore):
         Notify all registered handlers for the event type without persisting.
         Used internally and by replay functionality.
         """
-        with self._lock:
-            type_handler_tuples = [  # type: ignore[misc]
-                *self._subscribers.get(event.stream_id, []),
-                *self._subscribers.get(ALL_STREAMS, []),
-            ]
-        # type: ignore[misc],
+        handlers = self._routing.handlers_for(event.stream_id, type(event))
         logger.debug(
-            f"Notifying {len(type_handler_tuples)} handlers for stream_id {event.stream_id}"
+            f"Notifying {len(handlers)} handlers for stream_id {event.stream_id}"
         )
 
-        for event_type, handler in type_handler_tuples:
+        if self._dispatcher is not None:
+            for handler in handlers:
+                self._dispatcher.deliver(handler, event)
+            return
+
+        for handler in handlers:
             try:
-                if isinstance(event, event_type):
-                    handler(event)
+                handler(event)
             except Exception as e:
                 logger.error(
                     f"Handler {handler.__name__ if hasattr(handler, '__name__') else handler} "
@@ -116,5 +209,15 @@ class DefaultEventStore(EventStore):
                     exc_info=True,
                 )
 
+    def dispatch_metrics(self) -> dict[str, SubscriberMetrics]:
+        """
+        Queue depth, lag and counters per subscriber; empty for synchronous dispatch.
+        """
+        if self._dispatcher is None:
+            return {}
+        return self._dispatcher.metrics()
+
     def destroy(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.shutdown()
         self._event_repository.destroy()
@@ -1,9 +1,9 @@
 from dataclasses import dataclass
-from typing import Generator
+from typing import Any, Callable, Generator
 
 import pytest
 
-from .event_store import DefaultEventStore, EventStore
+from .event_store import ALL_STREAMS, DefaultEventStore, EventStore, SubscriptionTable
 from .replay_wrapper import NoopEventRepository
 from .types import Event
 
@@ -186,3 +186,42 @@ def test_remove_subscriber(event_store: DefaultEventStore) -> None:
     # Try to remove subscriber1 again - should return False
     result = event_store.remove_subscriber(subscriber1.apply, "s")
     assert result is False
+
+
+def test_subscribing_by_base_type(event_store: EventStore) -> None:
+    subscriber = Subscriber()
+    event_store.add_subscriber(subscriber.apply, event_type=Event)
+
+    event_store.emit([MockEvent("s", 1), OtherEvent("s", 2)])
+
+    assert subscriber.handled_events == [MockEvent("s", 1), OtherEvent("s", 2)]
+
+
+def test_new_subscriber_sees_events_after_dispatch_was_cached(
+    event_store: EventStore,
+) -> None:
+    subscriber1 = Subscriber()
+    subscriber2 = Subscriber()
+    event_store.add_subscriber(subscriber1.apply, "s", MockEvent)
+    event_store.emit([MockEvent("s", 1)])
+
+    event_store.add_subscriber(subscriber2.apply, "s", MockEvent)
+    event_store.emit([MockEvent("s", 2)])
+
+    assert subscriber1.handled_events == [MockEvent("s", 1), MockEvent("s", 2)]
+    assert subscriber2.handled_events == [MockEvent("s", 2)]
+
+
+def test_dispatch_table_does_not_grow_with_streams() -> None:
+    stream, every = Subscriber().apply, Subscriber().apply
+    table: SubscriptionTable[Callable[[Any], None]] = SubscriptionTable({})
+    table = table.with_subscriber(stream, "s", MockEvent)
+    table = table.with_subscriber(every, ALL_STREAMS, object)
+
+    for i in range(100):
+        assert table.handlers_for(f"expenses-{i}", MockEvent) == (every,)
+    assert table.handlers_for("s", MockEvent) == (stream, every)
+    assert len(table.table) == 2
+
+    without = table.without_subscriber(stream, "s", MockEvent)
+    assert without is not None and "s" not in without.subscribers
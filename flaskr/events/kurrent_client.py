@@ -0,0 +1,68 @@
+from typing import Iterable, Iterator, Protocol, Sequence
+
+from kurrentdbclient import NewEvent, NewEvents, RecordedEvent, StreamState
+
+__all__ = ["KurrentClient", "CatchupSubscription", "DEFAULT_FILTER_EXCLUDE"]
+
+# Same as kurrentdbclient: skip system and persistent subscription streams
+DEFAULT_FILTER_EXCLUDE: Sequence[str] = (r"\$.+", r"PersistentConfig\d+", "Result")
+
+
+class CatchupSubscription(Protocol):
+    def __iter__(self) -> Iterator[RecordedEvent]: ...
+    def stop(self) -> None: ...
+
+
+class KurrentClient(Protocol):
+    """
+    The part of KurrentDBClient the app uses, so the embedded stand-in can
+    be used in its place.
+    """
+
+    def read_stream(
+        self,
+        stream_name: str,
+        *,
+        stream_position: int | None = None,
+        backwards: bool = False,
+        limit: int = ...,
+    ) -> Iterator[RecordedEvent]: ...
+
+    def read_all(
+        self,
+        *,
+        commit_position: int | None = None,
+        backwards: bool = False,
+        filter_exclude: Sequence[str] = DEFAULT_FILTER_EXCLUDE,
+        filter_include: Sequence[str] = (),
+        filter_by_stream_name: bool = False,
+        filter_by_prefix: bool = False,
+        limit: int = ...,
+    ) -> Iterator[RecordedEvent]: ...
+
+    def get_current_version(self, stream_name: str) -> int | StreamState: ...
+
+    def append_to_stream(
+        self,
+        stream_name: str,
+        *,
+        events: NewEvent | Iterable[NewEvent],
+        current_version: int | StreamState,
+    ) -> int: ...
+
+    def multi_append_to_stream(
+        self, events: NewEvents | Iterable[NewEvents]
+    ) -> int: ...
+
+    def subscribe_to_all(
+        self,
+        *,
+        commit_position: int | None = None,
+        filter_exclude: Sequence[str] = DEFAULT_FILTER_EXCLUDE,
+        filter_include: Sequence[str] = (),
+        filter_by_stream_name: bool = False,
+        filter_by_prefix: bool = False,
+        include_caught_up: bool = False,
+    ) -> CatchupSubscription: ...
+
+    def close(self) -> None: ...
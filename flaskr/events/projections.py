@@ -0,0 +1,452 @@
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Any, ClassVar, Iterable, Protocol, TypeVar
+
+from kurrentdbclient import CaughtUp
+
+from .kurrent_client import CatchupSubscription, KurrentClient
+from .serialisation import decode_event
+from .types import Event
+
+logger = getLogger(__name__)
+
+__all__ = [
+    "Projection",
+    "ProjectionRecord",
+    "ProjectionStore",
+    "SqliteProjectionStore",
+    "ProjectionRunner",
+]
+
+TProjection = TypeVar("TProjection", bound="Projection")
+
+
+class Projection(Protocol):
+    # Key of the stored state and checkpoint
+    name: ClassVar[str]
+    # Bump whenever the shape of to_state() or the meaning of apply() changes;
+    # stored state of another version is discarded and rebuilt from zero
+    VERSION: ClassVar[int]
+    # Event classes apply() is interested in
+    event_types: ClassVar[tuple[type[Event], ...]]
+
+    def apply(self, event: Event) -> None: ...
+    def to_state(self) -> dict[str, Any]: ...
+    def restore_state(self, state: dict[str, Any]) -> None: ...
+    def reset(self) -> None: ...
+
+    def take_rows(self) -> dict[str, Any]:
+        """
+        Rows changed since the last call, None for removed ones. Projections
+        holding many entries keep them in rows rather than in to_state(), so
+        a commit only writes what changed. reset() forgets pending changes,
+        the runner clears the stored rows itself.
+        """
+        return {}
+
+    def restore_rows(self, rows: Iterable[tuple[str, Any]]) -> None:
+        """
+        Called after restore_state() with the stored rows, in the order they
+        were last written.
+        """
+
+
+@dataclass(frozen=True)
+class ProjectionRecord:
+    name: str
+    version: int
+    # Commit position of the last event applied to the state
+    checkpoint: int
+    state: dict[str, Any]
+    # When saving the rows changed since the last save, None for removed
+    # ones; when loading all of them
+    rows: dict[str, Any] = field(default_factory=dict[str, Any])
+
+
+class ProjectionStore(Protocol):
+    def load(self, name: str) -> ProjectionRecord | None: ...
+    def save_all(self, records: list[ProjectionRecord]) -> None: ...
+    def delete(self, name: str) -> None: ...
+    def clear(self) -> None: ...
+    def destroy(self) -> None: ...
+
+
+class SqliteProjectionStore(ProjectionStore):
+    """
+    Keeps the state and checkpoint of every projection in a local SQLite
+    database, and their rows in a table of their own. save_all() writes them
+    in one transaction, so a state is never stored without the checkpoint it
+    belongs to.
+    """
+
+    def __init__(self, db_path: str = "projections.db") -> None:
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS projections (
+                    name TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    checkpoint INTEGER NOT NULL,
+                    state TEXT NOT NULL
+                )
+                """
+            )
+            # Rows are loaded in rowid order; a replaced row moves to the end
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS projection_rows (
+                    name TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (name, key)
+                )
+                """
+            )
+
+    def load(self, name: str) -> ProjectionRecord | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT version, checkpoint, state FROM projections WHERE name = ?",
+                (name,),
+            ).fetchone()
+            if row is None:
+                return None
+            rows = self._connection.execute(
+                "SELECT key, value FROM projection_rows WHERE name = ? ORDER BY rowid",
+                (name,),
+            ).fetchall()
+        version, checkpoint, state = row
+        return ProjectionRecord(
+            name,
+            version,
+            checkpoint,
+            json.loads(state),
+            {key: json.loads(value) for key, value in rows},
+        )
+
+    def save_all(self, records: list[ProjectionRecord]) -> None:
+        # Serialised before taking the lock, loads need not wait for it
+        states = [
+            (r.name, r.version, r.checkpoint, json.dumps(r.state)) for r in records
+        ]
+        changed = [
+            (r.name, key, json.dumps(value))
+            for r in records
+            for key, value in r.rows.items()
+            if value is not None
+        ]
+        removed = [
+            (r.name, key)
+            for r in records
+            for key, value in r.rows.items()
+            if value is None
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO projections (name, version, checkpoint, state) "
+                "VALUES (?, ?, ?, ?)",
+                states,
+            )
+            self._connection.executemany(
+                "DELETE FROM projection_rows WHERE name = ? AND key = ?", removed
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO projection_rows (name, key, value) "
+                "VALUES (?, ?, ?)",
+                changed,
+            )
+
+    def delete(self, name: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM projections WHERE name = ?", (name,))
+            self._connection.execute(
+                "DELETE FROM projection_rows WHERE name = ?", (name,)
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM projections")
+            self._connection.execute("DELETE FROM projection_rows")
+
+    def destroy(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class ProjectionRunner:
+    """
+    Keeps registered projections up to date with a catch-up subscription to
+    the KurrentDB log. Each projection resumes from its own stored
+    checkpoint, so a restart only costs the events written since.
+
+    Events are applied one by one, but state and checkpoints are committed
+    in batches: once live when the oldest uncommitted event is
+    `commit_interval` seconds old, while catching up every
+    `catch_up_commit_interval` seconds, and on catching up and on stopping.
+    A commit writes the projections' states and the rows changed since the
+    last one, outside the lock events are applied under. Readers do not
+    wait for commits, a restart merely replays the events of the last
+    batch. A projection failing on an event is logged and the event skipped.
+    """
+
+    def __init__(
+        self,
+        store: ProjectionStore,
+        rebuild: bool = False,
+        commit_interval: float = 0.5,
+        catch_up_commit_interval: float = 10.0,
+    ) -> None:
+        self._store = store
+        self._commit_interval = commit_interval
+        self._catch_up_commit_interval = catch_up_commit_interval
+        # Discard stored state on the first start
+        self._rebuild = rebuild
+        self._projections: dict[str, Projection] = {}
+        self._by_type: dict[str, list[Projection]] = {}
+        # Commit position of the last event each projection has seen, None
+        # if it has to start from the beginning
+        self._checkpoints: dict[str, int | None] = {}
+        self._dirty: set[str] = set()
+        # Rows taken from the projections that are not stored yet, kept to
+        # retry with the next commit if saving fails
+        self._unsaved_rows: dict[str, dict[str, Any]] = {}
+        self._last_commit = time.monotonic()
+        self._commit_timer: threading.Timer | None = None
+        # Held while projections change or their state is taken for a commit
+        self._state_lock = threading.Lock()
+        # Keeps commits, which may also run on the commit timer's thread, in
+        # order
+        self._commit_lock = threading.Lock()
+        self._loaded = False
+        self._live = False
+        self._position = 0
+        self._thread: threading.Thread | None = None
+        self._subscription: CatchupSubscription | None = None
+        self._run_lock = threading.Lock()
+        # Notified whenever an event was applied or the runner went live
+        self._progress = threading.Condition()
+
+    def register(self, projection: Projection) -> None:
+        with self._run_lock:
+            if self._thread is not None:
+                raise ValueError("Projections must be registered before starting")
+            if projection.name in self._projections:
+                raise ValueError(f"Projection {projection.name} already registered")
+            self._projections[projection.name] = projection
+            for event_type in projection.event_types:
+                self._by_type.setdefault(event_type.type, []).append(projection)
+
+    def get(self, projection_type: type[TProjection]) -> TProjection:
+        for projection in self._projections.values():
+            if isinstance(projection, projection_type):
+                return projection
+        raise ValueError(f"Projection {projection_type.__name__} not registered")
+
+    @property
+    def live(self) -> bool:
+        return self._live
+
+    @property
+    def position(self) -> int:
+        """
+        Commit position of the last event applied, which changes whenever
+        any of the projections might have.
+        """
+        return self._position
+
+    def ensure_running(self, client: KurrentClient) -> None:
+        """
+        Start following the log, or restart after the subscription failed.
+        """
+        with self._run_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+            checkpoints = [c for c in self._checkpoints.values() if c is not None]
+            if len(checkpoints) < len(self._checkpoints):
+                start = None
+            else:
+                start = min(checkpoints, default=None)
+            self._thread = threading.Thread(
+                target=self._follow,
+                args=(client, start),
+                name="projections",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def rebuild(self, client: KurrentClient) -> None:
+        """
+        Throw away all projection state and replay the whole log.
+        """
+        self.stop()
+        with self._run_lock:
+            self._store.clear()
+            for name, projection in self._projections.items():
+                projection.reset()
+                self._checkpoints[name] = None
+            self._dirty.clear()
+            with self._commit_lock:
+                self._unsaved_rows.clear()
+            self._position = 0
+        self.ensure_running(client)
+
+    def wait_for(self, commit_position: int, timeout: float = 1.0) -> bool:
+        """
+        Wait until the event at the given commit position has been applied,
+        to read your own writes. The event must be of a type one of the
+        projections handles, the subscription does not see the others.
+        Returns False if the timeout expired first.
+        """
+        with self._progress:
+            return self._progress.wait_for(
+                lambda: self._position >= commit_position, timeout
+            )
+
+    def wait_until_live(self, timeout: float = 5.0) -> bool:
+        with self._progress:
+            return self._progress.wait_for(lambda: self._live, timeout)
+
+    def stop(self) -> None:
+        with self._run_lock:
+            if self._subscription is not None:
+                self._subscription.stop()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        with self._run_lock:
+            self._thread = None
+
+    def _load(self) -> None:
+        if self._rebuild:
+            self._store.clear()
+        for name, projection in self._projections.items():
+            record = self._store.load(name)
+            if record is not None and record.version != projection.VERSION:
+                logger.info(f"Projection {name} changed version, rebuilding it")
+                self._store.delete(name)
+                record = None
+            if record is None:
+                projection.reset()
+                self._checkpoints[name] = None
+            else:
+                projection.restore_state(record.state)
+                projection.restore_rows(record.rows.items())
+                self._checkpoints[name] = record.checkpoint
+
+    def _follow(self, client: KurrentClient, start: int | None) -> None:
+        self._last_commit = time.monotonic()
+        try:
+            subscription = client.subscribe_to_all(
+                commit_position=start,
+                filter_include=tuple(self._by_type),
+                include_caught_up=True,
+            )
+            with self._run_lock:
+                self._subscription = subscription
+            for recorded in subscription:
+                if isinstance(recorded, CaughtUp):
+                    self._commit()
+                    with self._progress:
+                        self._live = True
+                        self._position = max(
+                            self._position, recorded.commit_position or 0
+                        )
+                        self._progress.notify_all()
+                    continue
+                self._apply(
+                    recorded.type,
+                    recorded.data,
+                    recorded.content_type,
+                    recorded.commit_position,
+                )
+                if self._live:
+                    if self._dirty:
+                        self._schedule_commit()
+                elif (
+                    time.monotonic() - self._last_commit
+                    >= self._catch_up_commit_interval
+                ):
+                    self._commit()
+        except Exception:
+            logger.exception("Projection subscription failed")
+        finally:
+            self._commit()
+            with self._progress:
+                self._live = False
+            self._subscription = None
+
+    def _apply(
+        self, type: str, data: bytes, content_type: str, commit_position: int
+    ) -> None:
+        projections = [
+            projection
+            for projection in self._by_type.get(type, [])
+            if self._behind(projection.name, commit_position)
+        ]
+        if projections:
+            event = decode_event(type, data, content_type)
+            with self._state_lock:
+                for projection in projections:
+                    try:
+                        projection.apply(event)
+                    except Exception:
+                        logger.exception(
+                            f"Projection {projection.name} failed on {type} "
+                            f"at {commit_position}"
+                        )
+                    self._checkpoints[projection.name] = commit_position
+                    self._dirty.add(projection.name)
+        with self._progress:
+            self._position = commit_position
+            self._progress.notify_all()
+
+    def _behind(self, name: str, commit_position: int) -> bool:
+        checkpoint = self._checkpoints[name]
+        return checkpoint is None or checkpoint < commit_position
+
+    def _schedule_commit(self) -> None:
+        with self._state_lock:
+            if self._commit_timer is not None:
+                return
+            self._commit_timer = threading.Timer(self._commit_interval, self._commit)
+            self._commit_timer.daemon = True
+            self._commit_timer.start()
+
+    def _commit(self) -> None:
+        with self._commit_lock:
+            with self._state_lock:
+                if self._commit_timer is not None:
+                    self._commit_timer.cancel()
+                    self._commit_timer = None
+                self._last_commit = time.monotonic()
+                records = [self._take_record(name) for name in self._dirty]
+                self._dirty.clear()
+            if records:
+                try:
+                    self._store.save_all(records)
+                except BaseException:
+                    with self._state_lock:
+                        self._dirty.update(record.name for record in records)
+                    raise
+                for record in records:
+                    self._unsaved_rows.pop(record.name, None)
+
+    def _take_record(self, name: str) -> ProjectionRecord:
+        projection = self._projections[name]
+        checkpoint = self._checkpoints[name]
+        assert checkpoint is not None
+        rows = self._unsaved_rows.setdefault(name, {})
+        rows.update(projection.take_rows())
+        return ProjectionRecord(
+            name, projection.VERSION, checkpoint, projection.to_state(), dict(rows)
+        )
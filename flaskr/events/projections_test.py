@@ -0,0 +1,278 @@
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ClassVar, Generator, Iterable
+
+import pytest
+from kurrentdbclient import NewEvent, StreamState
+
+from .embedded_kurrentdb import EmbeddedKurrentDB
+from .projections import (
+    Projection,
+    ProjectionRecord,
+    ProjectionRunner,
+    SqliteProjectionStore,
+)
+from .serialisation import encode_event, event
+from .types import Event
+
+
+@event("ProjectionTestDeposited")
+@dataclass
+class Deposited(Event):
+    amount: int
+
+
+@event("ProjectionTestIgnored")
+@dataclass
+class Ignored(Event):
+    pass
+
+
+class Balance(Projection):
+    name: ClassVar[str] = "balance"
+    VERSION: ClassVar[int] = 1
+    event_types: ClassVar[tuple[type[Event], ...]] = (Deposited,)
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.applied = 0
+
+    def apply(self, event: Event) -> None:
+        assert isinstance(event, Deposited)
+        self.total += event.amount
+        self.applied += 1
+
+    def to_state(self) -> dict[str, Any]:
+        return {"total": self.total}
+
+    def restore_state(self, state: dict[str, Any]) -> None:
+        self.total = state["total"]
+
+    def reset(self) -> None:
+        self.total = 0
+
+
+class BalanceV2(Balance):
+    VERSION: ClassVar[int] = 2
+
+
+class Deposits(Balance):
+    """
+    Keeps every deposit as a row, the total in the state.
+    """
+
+    name: ClassVar[str] = "deposits"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.deposits: dict[str, int] = {}
+        self.changes: dict[str, Any] = {}
+
+    def apply(self, event: Event) -> None:
+        super().apply(event)
+        assert isinstance(event, Deposited)
+        key = str(len(self.deposits))
+        self.deposits[key] = self.changes[key] = event.amount
+
+    def take_rows(self) -> dict[str, Any]:
+        changes, self.changes = self.changes, {}
+        return changes
+
+    def restore_rows(self, rows: Iterable[tuple[str, Any]]) -> None:
+        self.deposits.update(rows)
+
+    def reset(self) -> None:
+        super().reset()
+        self.deposits = {}
+        self.changes = {}
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> Generator[EmbeddedKurrentDB, None, None]:
+    db = EmbeddedKurrentDB(str(tmp_path / "kurrent.db"))
+    yield db
+    db.close()
+
+
+def append(db: EmbeddedKurrentDB, *events: Event) -> int:
+    return db.append_to_stream(
+        "account",
+        events=[NewEvent(e.type, data=encode_event(e)) for e in events],
+        current_version=StreamState.ANY,
+    )
+
+
+def start(
+    db: EmbeddedKurrentDB, path: Path, projection: Balance, **kwargs: Any
+) -> ProjectionRunner:
+    runner = ProjectionRunner(SqliteProjectionStore(str(path)), **kwargs)
+    runner.register(projection)
+    runner.ensure_running(db)
+    assert runner.wait_until_live()
+    return runner
+
+
+def test_resumes_from_checkpoint(db: EmbeddedKurrentDB, tmp_path: Path) -> None:
+    path = tmp_path / "projections.db"
+    append(db, Deposited("account", 10), Ignored("account"), Deposited("account", 5))
+    first = Balance()
+    runner = start(db, path, first)
+    assert first.total == 15
+
+    position = append(db, Deposited("account", 1))
+    assert runner.wait_for(position)
+    assert first.total == 16
+    runner.stop()
+
+    append(db, Deposited("account", 100))
+    second = Balance()
+    start(db, path, second).stop()
+
+    # Only the event written while stopped was applied again
+    assert second.total == 116
+    assert second.applied == 1
+
+
+def test_checkpoint_at_position_zero_is_not_reapplied(tmp_path: Path) -> None:
+    store = SqliteProjectionStore(str(tmp_path / "projections.db"))
+    store.save_all([ProjectionRecord("balance", Balance.VERSION, 0, {"total": 10})])
+    projection = Balance()
+    runner = ProjectionRunner(store)
+    runner.register(projection)
+    runner._load()  # pyright: ignore[reportPrivateUsage]
+
+    deposited = Deposited("account", 10)
+    for position in (0, 1):
+        runner._apply(  # pyright: ignore[reportPrivateUsage]
+            deposited.type, encode_event(deposited), "application/json", position
+        )
+
+    # Only the event after the checkpoint is applied
+    assert projection.total == 20
+    assert projection.applied == 1
+    store.destroy()
+
+
+def test_rebuilds_on_version_change(db: EmbeddedKurrentDB, tmp_path: Path) -> None:
+    path = tmp_path / "projections.db"
+    append(db, Deposited("account", 10), Deposited("account", 5))
+    start(db, path, Balance()).stop()
+
+    upgraded = BalanceV2()
+    start(db, path, upgraded).stop()
+    assert upgraded.total == 15
+    assert upgraded.applied == 2
+
+    rebuilt = BalanceV2()
+    start(db, path, rebuilt, rebuild=True).stop()
+    assert rebuilt.applied == 2
+
+
+def test_rebuild_replays_everything(db: EmbeddedKurrentDB, tmp_path: Path) -> None:
+    append(db, Deposited("account", 10))
+    projection = Balance()
+    runner = start(db, tmp_path / "projections.db", projection)
+
+    runner.rebuild(db)
+    assert runner.wait_until_live()
+    assert projection.total == 10
+    assert projection.applied == 2
+    runner.stop()
+
+
+def test_register_after_start_fails(db: EmbeddedKurrentDB, tmp_path: Path) -> None:
+    runner = start(db, tmp_path / "projections.db", Balance())
+
+    with pytest.raises(ValueError):
+        runner.register(BalanceV2())
+    runner.stop()
+
+
+class CountingStore(SqliteProjectionStore):
+    def __init__(self, db_path: str) -> None:
+        super().__init__(db_path)
+        self.saves = 0
+        self.saved: list[ProjectionRecord] = []
+
+    def save_all(self, records: list[ProjectionRecord]) -> None:
+        self.saves += 1
+        self.saved.extend(records)
+        super().save_all(records)
+
+
+def test_commits_once_on_catching_up(db: EmbeddedKurrentDB, tmp_path: Path) -> None:
+    append(db, *(Deposited("account", 1) for _ in range(1000)))
+    store = CountingStore(str(tmp_path / "projections.db"))
+    runner = ProjectionRunner(store)
+    runner.register(Balance())
+    runner.ensure_running(db)
+    assert runner.wait_until_live()
+
+    assert store.saves == 1
+    record = store.load("balance")
+    assert record is not None and record.state == {"total": 1000}
+    runner.stop()
+
+
+def test_saves_only_changed_rows(db: EmbeddedKurrentDB, tmp_path: Path) -> None:
+    path = tmp_path / "projections.db"
+    append(db, Deposited("account", 10), Deposited("account", 5))
+    store = CountingStore(str(path))
+    runner = ProjectionRunner(store, commit_interval=60)
+    runner.register(Deposits())
+    runner.ensure_running(db)
+    assert runner.wait_until_live()
+    assert runner.wait_for(append(db, Deposited("account", 1)))
+    runner.stop()
+
+    assert [record.rows for record in store.saved] == [{"0": 10, "1": 5}, {"2": 1}]
+    restored = Deposits()
+    start(db, path, restored).stop()
+    assert restored.deposits == {"0": 10, "1": 5, "2": 1}
+    assert restored.applied == 0
+
+
+def test_version_change_drops_rows(db: EmbeddedKurrentDB, tmp_path: Path) -> None:
+    path = tmp_path / "projections.db"
+    append(db, Deposited("account", 10))
+    start(db, path, Deposits()).stop()
+    store = SqliteProjectionStore(str(path))
+    store.save_all([ProjectionRecord("deposits", 1, 10**6, {"total": 0}, {"x": 1})])
+
+    class DepositsV2(Deposits):
+        VERSION: ClassVar[int] = 2
+
+    upgraded = DepositsV2()
+    start(db, path, upgraded).stop()
+
+    assert upgraded.deposits == {"0": 10}
+    record = store.load("deposits")
+    assert record is not None and record.rows == {"0": 10}
+    store.destroy()
+
+
+def test_batches_commits_once_live(db: EmbeddedKurrentDB, tmp_path: Path) -> None:
+    store = CountingStore(str(tmp_path / "projections.db"))
+    projection = Balance()
+    runner = ProjectionRunner(store, commit_interval=0.05)
+    runner.register(projection)
+    runner.ensure_running(db)
+    assert runner.wait_until_live()
+
+    start_time = time.perf_counter()
+    position = max(append(db, Deposited("account", 1)) for _ in range(3000))
+    assert runner.wait_for(position, timeout=10)
+    elapsed = time.perf_counter() - start_time
+
+    assert projection.total == 3000
+    assert elapsed < 10
+    assert store.saves < 300
+
+    # The last, partial batch is committed by the timer
+    deadline = time.monotonic() + 5
+    while (record := store.load("balance")) is None or record.checkpoint < position:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert record.state == {"total": 3000}
+    runner.stop()
@@ -0,0 +1,165 @@
+import json
+import mmap
+import re
+from typing import Any, Iterator, NamedTuple
+
+from .event_repository import decode_record, record_stream_id
+
+__all__ = ["ReplayRecord", "MmapReplayReader"]
+
+# Records are written as {"module": ..., "type": ..., "stream_id": ..., "payload": ...}
+# with the payload last, so the header fields can be found without parsing it
+_PAYLOAD = re.compile(rb'"payload"\s*:\s*')
+_HEADER_FIELD = re.compile(rb'"(module|type|stream_id)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+class ReplayRecord(NamedTuple):
+    offset: int
+    stream_id: str
+    type: str
+    payload: bytes
+
+
+def _decode_str(raw: bytes) -> str:
+    if b"\\" in raw:
+        return json.loads(b'"' + raw + b'"')
+    return raw.decode()
+
+
+class MmapReplayReader:
+    """
+    Reads an event log through a memory map. Records are split on raw bytes
+    and only the header fields are decoded, so callers can filter on
+    stream_id/type before paying for JSON parsing via `decode`.
+    """
+
+    def __init__(self, file_path: str):
+        self._file = open(file_path, "rb")
+        self._mmap: mmap.mmap | None = None
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped, there is nothing to replay anyway
+            pass
+
+    def __enter__(self) -> "MmapReplayReader":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def records(self) -> Iterator[ReplayRecord]:
+        mm = self._mmap
+        if mm is None:
+            return
+        for start, end in self._lines(mm, 0, None):
+            record = self._parse_header(mm, start, end)
+            if record is not None:
+                yield record
+
+    def events(self, start: int = 0, end: int | None = None) -> Iterator[Any]:
+        """
+        Every event of the log, or of the lines starting within [start, end),
+        each line parsed once. For reading all of it, where the header pass
+        of `records` would only add work.
+        """
+        mm = self._mmap
+        if mm is None:
+            return
+        for line_start, line_end in self._lines(mm, start, end):
+            line = mm[line_start:line_end]
+            if line.strip():
+                yield decode_record(json.loads(line))
+
+    def split(self, size: int) -> list[tuple[int, int]]:
+        """
+        Consecutive (start, end) ranges of about `size` bytes covering the
+        log, each starting at the beginning of a line.
+        """
+        mm = self._mmap
+        if mm is None:
+            return []
+        ranges: list[tuple[int, int]] = []
+        start = 0
+        while start < len(mm):
+            newline = mm.find(b"\n", min(start + size, len(mm)) - 1)
+            end = len(mm) if newline == -1 else newline + 1
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+    def decode(self, offset: int) -> Any:
+        """
+        Fully parse the record at `offset` and rebuild its event.
+        """
+        return decode_record(self.read_record(offset))
+
+    def read_record(self, offset: int) -> dict[str, Any]:
+        return json.loads(self.read_line(offset))
+
+    def read_line(self, offset: int) -> bytes:
+        """
+        Raw bytes of the record at `offset`, without the trailing newline.
+        """
+        mm = self._mmap
+        assert mm is not None
+        end = mm.find(b"\n", offset)
+        return mm[offset : end if end != -1 else len(mm)]
+
+    def _lines(
+        self, mm: mmap.mmap, start: int, end: int | None
+    ) -> Iterator[tuple[int, int]]:
+        """
+        Start and end of every complete, non-empty line starting within
+        [start, end).
+        """
+        position = start
+        size = len(mm) if end is None else min(end, len(mm))
+        while position < size:
+            line_end = mm.find(b"\n", position)
+            if line_end == -1:
+                # Partially written last line, not a committed event
+                return
+            if line_end > position:
+                yield position, line_end
+            position = line_end + 1
+
+    def _parse_header(self, mm: mmap.mmap, start: int, end: int) -> ReplayRecord | None:
+        payload_match = _PAYLOAD.search(mm, start, end)
+        if payload_match is None:
+            if not mm[start:end].strip():
+                return None
+            return self._parse_slow(start, end)
+
+        fields: dict[bytes, bytes] = {}
+        for match in _HEADER_FIELD.finditer(mm, start, payload_match.start()):
+            fields[match.group(1)] = match.group(2)
+        if b"stream_id" not in fields or b"type" not in fields:
+            return self._parse_slow(start, end)
+
+        payload_end = mm.rfind(b"}", payload_match.end(), end)
+        return ReplayRecord(
+            start,
+            _decode_str(fields[b"stream_id"]),
+            _decode_str(fields[b"type"]),
+            mm[payload_match.end() : payload_end],
+        )
+
+    def _parse_slow(self, start: int, end: int) -> ReplayRecord:
+        """
+        Fallback for records that do not follow the payload-last layout, or
+        that predate the top-level stream_id.
+        """
+        record = self.read_record(start)
+        return ReplayRecord(
+            start,
+            record_stream_id(record),
+            record["type"],
+            json.dumps(record["payload"]).encode(),
+        )
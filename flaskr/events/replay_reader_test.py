@@ -0,0 +1,99 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+from .replay_reader import MmapReplayReader, ReplayRecord
+from .types import Event
+
+
+@dataclass
+class MockEvent(Event):
+    id: int
+
+
+def write_records(path: Path, records: list[dict[str, object]]) -> list[int]:
+    offsets: list[int] = []
+    with open(path, "wb") as f:
+        for record in records:
+            offsets.append(f.tell())
+            f.write(json.dumps(record).encode() + b"\n")
+    return offsets
+
+
+def record(stream_id: str, id: int) -> dict[str, object]:
+    return {
+        "module": __name__,
+        "type": "MockEvent",
+        "stream_id": stream_id,
+        "payload": {"id": id},
+    }
+
+
+def test_records_expose_headers_without_decoding(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    offsets = write_records(path, [record("a", 1), record('b"c', 2)])
+
+    with MmapReplayReader(str(path)) as reader:
+        records = list(reader.records())
+
+    assert records == [
+        ReplayRecord(offsets[0], "a", "MockEvent", b'{"id": 1}'),
+        ReplayRecord(offsets[1], 'b"c', "MockEvent", b'{"id": 2}'),
+    ]
+
+
+def test_decode_only_selected_records(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    write_records(path, [record("a", 1), record("b", 2), record("a", 3)])
+
+    with MmapReplayReader(str(path)) as reader:
+        events = [
+            reader.decode(r.offset) for r in reader.records() if r.stream_id == "a"
+        ]
+
+    assert events == [MockEvent("a", 1), MockEvent("a", 3)]
+
+
+def test_skips_torn_last_line_and_empty_files(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    write_records(path, [record("a", 1)])
+    with open(path, "ab") as f:
+        f.write(b'{"module": "x", "type": "Mock')
+    empty = tmp_path / "empty.jsonl"
+    empty.touch()
+
+    with MmapReplayReader(str(path)) as reader:
+        assert [r.stream_id for r in reader.records()] == ["a"]
+        assert list(reader.events()) == [MockEvent("a", 1)]
+    with MmapReplayReader(str(empty)) as reader:
+        assert list(reader.records()) == []
+        assert list(reader.events()) == []
+
+
+def test_reads_records_in_the_baseline_format(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    legacy: dict[str, object] = {
+        "module": __name__,
+        "type": "MockEvent",
+        "payload": {"stream_id": "a", "id": 1},
+    }
+    write_records(path, [legacy])
+
+    with MmapReplayReader(str(path)) as reader:
+        (replay_record,) = reader.records()
+        assert replay_record.stream_id == "a"
+        assert reader.decode(replay_record.offset) == MockEvent("a", 1)
+
+
+def test_split_ranges_start_at_lines_and_cover_the_log(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    write_records(path, [record(f"s{i % 3}", i) for i in range(20)])
+
+    with MmapReplayReader(str(path)) as reader:
+        ranges = reader.split(100)
+        events = [e for start, end in ranges for e in reader.events(start, end)]
+
+    assert len(ranges) > 1
+    assert ranges[0][0] == 0 and ranges[-1][1] == path.stat().st_size
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    assert [e.id for e in events] == list(range(20))
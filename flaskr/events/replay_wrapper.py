@@ -1,9 +1,25 @@
-import importlib
-import json
-from typing import Any, Callable, List, Type
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Any, Callable, Iterator, List, Type
 
 from .event_repository import EventRepository
 from .event_store import ALL_STREAMS, EventStore
+from .replay_reader import MmapReplayReader
+
+logger = getLogger(__name__)
+
+
+@dataclass
+class ReplayStats:
+    events: int
+    seconds: float
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.seconds if self.seconds > 0 else 0.0
 
 
 class ReplayWrapper(EventStore):
@@ -32,22 +48,75 @@ class ReplayWrapper(EventStore):
     def destroy(self) -> None:
         self._event_store.destroy()
 
-    def replay_events(self, file_path: str) -> None:
+    def replay_events(
+        self,
+        file_path: str,
+        quiet: bool = False,
+        workers: int = 1,
+        chunk_size: int = 1 << 20,
+    ) -> ReplayStats:
         """
         Replay events from a file by notifying subscribers without re-persisting.
         This prevents duplicate events in the database and duplicate side effects.
+        In quiet mode nothing is logged per event, only the final throughput.
+
+        With more than one worker the log is split into chunks of about
+        `chunk_size` bytes, which worker processes read and decode on their
+        own. Subscribers live in this process, so events are dispatched here,
+        chunk by chunk in file order: every stream sees its events in order
+        and ALL_STREAMS subscribers the same order as a sequential replay.
         """
-        with open(file_path, "r") as file:
-            for line in file:
-                event_data = json.loads(line)
-                event_type = event_data["type"]
-                event_module = event_data["module"]
-                event_class = getattr(importlib.import_module(event_module), event_type)
-                print(f"Replaying event: {event_type} from data {event_data}")
-                event = event_class(
-                    **{"stream_id": event_data["stream_id"], **event_data["payload"]}
+        started = time.perf_counter()
+        with MmapReplayReader(file_path) as reader:
+            count = 0
+            # Every event is replayed, so each line is parsed just once
+            if workers > 1:
+                events = _decode_in_parallel(
+                    file_path, reader.split(chunk_size), workers
                 )
+            else:
+                events = reader.events()
+            for event in events:
+                if not quiet:
+                    logger.info(
+                        f"Replaying event: {type(event).__name__} in stream {event.stream_id}"
+                    )
                 self._event_store.emit([event])
+                count += 1
+
+        stats = ReplayStats(count, time.perf_counter() - started)
+        logger.info(
+            f"Replayed {stats.events} events in {stats.seconds:.3f}s "
+            f"({stats.events_per_second:.0f} events/s)"
+        )
+        return stats
+
+
+def _decode_in_parallel(
+    file_path: str, chunks: list[tuple[int, int]], workers: int
+) -> Iterator[Any]:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # A couple of chunks per worker in flight keeps them busy while the
+        # oldest one is dispatched, without decoding the whole log ahead
+        in_flight: deque[Future[list[Any]]] = deque()
+        pending = iter(chunks)
+
+        def submit() -> None:
+            chunk = next(pending, None)
+            if chunk is not None:
+                in_flight.append(pool.submit(_decode_chunk, file_path, *chunk))
+
+        for _ in range(2 * workers):
+            submit()
+        while in_flight:
+            events = in_flight.popleft().result()
+            submit()
+            yield from events
+
+
+def _decode_chunk(file_path: str, start: int, end: int) -> list[Any]:
+    with MmapReplayReader(file_path) as reader:
+        return list(reader.events(start, end))
 
 
 class NoopEventRepository(EventRepository):
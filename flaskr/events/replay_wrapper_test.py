@@ -1,4 +1,6 @@
+import json
 from dataclasses import dataclass
+from pathlib import Path
 
 from .event_store import DefaultEventStore, EventStore
 from .replay_wrapper import NoopEventRepository, ReplayWrapper
@@ -31,3 +33,38 @@ def test_replay() -> None:
     event_store.replay_events("test_data/test_replay.jsonl")
 
     assert subscriber.handled_events == [MockEvent("s", 1), MockEvent("s", 2)]
+
+
+def test_quiet_replay_reports_throughput() -> None:
+    event_store = ReplayWrapper(DefaultEventStore(NoopEventRepository()))
+    subscriber = MockSubscriber(event_store)
+
+    stats = event_store.replay_events("test_data/test_replay.jsonl", quiet=True)
+
+    assert stats.events == 2
+    assert stats.events_per_second > 0
+    assert subscriber.handled_events == [MockEvent("s", 1), MockEvent("s", 2)]
+
+
+def test_parallel_replay_keeps_global_order(tmp_path: Path) -> None:
+    path = tmp_path / "events.jsonl"
+    with open(path, "w") as f:
+        for i in range(50):
+            record = {
+                "module": __name__,
+                "type": "MockEvent",
+                "stream_id": f"s{i % 7}",
+                "payload": {"id": i},
+            }
+            f.write(json.dumps(record) + "\n")
+    event_store = ReplayWrapper(DefaultEventStore(NoopEventRepository()))
+    all_events: list[MockEvent] = []
+    s3_events: list[MockEvent] = []
+    event_store.add_subscriber(all_events.append)
+    event_store.add_subscriber(s3_events.append, "s3")
+
+    stats = event_store.replay_events(str(path), quiet=True, workers=3, chunk_size=200)
+
+    assert stats.events == 50
+    assert [e.id for e in all_events] == list(range(50))
+    assert [e.id for e in s3_events] == list(range(3, 50, 7))
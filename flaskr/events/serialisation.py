@@ -1,12 +1,54 @@
+import dataclasses
 import json
-from typing import Dict, TypeVar
+import types
+from dataclasses import dataclass
+from enum import Enum
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Literal,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 
 from flaskr.events.types import Event
 
+__all__ = [
+    "event",
+    "event_types",
+    "serialise_event",
+    "deserialise_event",
+    "encode_event",
+    "decode_event",
+    "event_record",
+    "JSON_CONTENT_TYPE",
+    "ContentType",
+]
+
+# Events are stored as JSON
+ContentType = Literal["application/json"]
+JSON_CONTENT_TYPE: ContentType = "application/json"
+
 T = TypeVar("T", bound=type)
+Converter = Callable[[Any], Any]
+
 event_types: Dict[str, type] = {}
 
 
+@dataclass(frozen=True)
+class _Codec:
+    to_dict: Converter
+    from_dict: Converter
+
+
+_codecs: Dict[type, _Codec] = {}
+
+
 def event(type: str):
     def decorator(cls: T) -> T:
         if type in event_types:
@@ -15,33 +57,181 @@ def event(type: str):
             )
         event_types[type] = cls
         cls.type = type
+        # The codec is built on first use, once forward references in the
+        # class' annotations can be resolved
         return cls
 
     return decorator
 
 
 def serialise_event(event: Event) -> str:
+    return encode_event(event).decode()
+
+
+def deserialise_event(type: str, payload: str | bytes) -> Event:
+    return decode_event(type, payload)
+
+
+def encode_event(event: Event, content_type: ContentType = JSON_CONTENT_TYPE) -> bytes:
     cls = type(event)
     if cls.type not in event_types:
         raise ValueError(
             f"Event of type {cls.type} and class {cls} must be annotated with @event"
         )
 
+    if content_type != JSON_CONTENT_TYPE:
+        raise ValueError(f"Unsupported content type {content_type}")
+    codec = _codec_or_none(cls)
+    if codec is None:
+        return json.dumps(_payload(event)).encode()
+    return json.dumps(codec.to_dict(event)).encode()
+
+
+def decode_event(
+    type: str, data: str | bytes, content_type: str = JSON_CONTENT_TYPE
+) -> Event:
+    if content_type != JSON_CONTENT_TYPE:
+        raise ValueError(f"Unsupported content type {content_type}")
+    cls = event_types[type]
+    codec = _codec_or_none(cls)
+    if codec is None:
+        return cls(**json.loads(data))
+    # json.loads sniffs the encoding of bytes in Python; decoding is cheaper
+    if isinstance(data, bytes):
+        data = data.decode()
+    return codec.from_dict(json.loads(data))
+
+
+def event_record(event: Any) -> dict[str, Any]:
+    """
+    The record event repositories store for an event: the module and name of
+    its class, its stream, and its fields (`__dict__` or `to_dict()`) as
+    payload. The payload goes last, so readers of serialised records can pick
+    out the header fields without parsing all of it.
+    """
+    event_type = type(event)  # type: ignore[misc]
+    return {
+        "module": event_type.__module__,
+        "type": event_type.__name__,
+        "stream_id": event.stream_id,
+        "payload": _payload(event),
+    }
+
+
+def _payload(event: Any) -> dict[str, Any]:
     try:
-        payload = event.__dict__
+        return event.__dict__
     except AttributeError:
         # Handle objects with __slots__ or other special cases
         if hasattr(event, "to_dict"):
-            payload = event.to_dict()  # type:ignore[misc]
-        else:
-            raise ValueError(
-                f"Event of type {cls} must have __dict__ or to_dict() method"
-            )
+            return event.to_dict()
+        raise ValueError(
+            f"Event of type {type(event)} must have __dict__ or to_dict() method"
+        )
 
-    return json.dumps(payload)
 
+def _codec_or_none(cls: type) -> _Codec | None:
+    """
+    Codec of a dataclass event, built on first use; None for other classes,
+    which fall back to plain `__dict__`/`to_dict()` JSON.
+    """
+    codec = _codecs.get(cls)
+    if codec is None and dataclasses.is_dataclass(cls):
+        codec = _codecs[cls] = _build(cls)
+    return codec
 
-def deserialise_event(type: str, payload: str) -> Event:
-    cls = event_types[type]
-    kws = json.loads(payload)
-    return cls(**kws)
+
+def _build(cls: type) -> _Codec:
+    """
+    Encode/decode functions for a dataclass. Fields holding nested
+    dataclasses, enums or containers of them go through a converter; a class
+    with only plain fields is (de)serialised straight from its `__dict__`.
+    Fields missing from records written before they were added take their
+    defaults, as the values are passed to __init__.
+    """
+    hints = get_type_hints(cls)
+    fields = dataclasses.fields(cls)
+    converters = {f.name: _converters(hints[f.name]) for f in fields}
+    if all(f.init for f in fields) and not any(
+        encode or decode for encode, decode in converters.values()
+    ):
+        return _Codec(lambda obj: obj.__dict__, lambda d: cls(**d))
+    names = tuple(f.name for f in fields)
+    return _Codec(
+        partial(_fields_to_dict, names, converters),
+        partial(_fields_from_dict, cls, converters),
+    )
+
+
+def _fields_to_dict(
+    names: tuple[str, ...],
+    converters: dict[str, tuple[Converter | None, Converter | None]],
+    obj: Any,
+) -> dict[str, Any]:
+    payload: dict[str, Any] = {}
+    for name in names:
+        value = getattr(obj, name)
+        encode = converters[name][0]
+        payload[name] = encode(value) if encode else value
+    return payload
+
+
+def _fields_from_dict(
+    cls: type,
+    converters: dict[str, tuple[Converter | None, Converter | None]],
+    payload: dict[str, Any],
+) -> Any:
+    kwargs: dict[str, Any] = {}
+    for name, value in payload.items():
+        decode = converters[name][1]
+        kwargs[name] = decode(value) if decode else value
+    return cls(**kwargs)
+
+
+def _converters(tp: Any) -> tuple[Converter | None, Converter | None]:
+    """
+    (encode, decode) for a field type; None where the value can be used as is.
+    """
+    origin = get_origin(tp)
+    args = get_args(tp)
+    if origin in (Union, types.UnionType):
+        non_none = [arg for arg in args if arg is not type(None)]
+        if len(non_none) != 1:
+            # Unions of several types are only supported for plain values
+            return None, None
+        encode, decode = _converters(non_none[0])
+        return _optional(encode), _optional(decode)
+    if origin in (list, set, frozenset, tuple):
+        encode, decode = _converters(args[0]) if args else (None, None)
+        container: Any = origin
+
+        def encode_items(value: Any) -> Any:
+            return [encode(item) if encode else item for item in value]
+
+        def decode_items(value: Any) -> Any:
+            return container(decode(item) if decode else item for item in value)
+
+        if origin is list and encode is None:
+            return None, None
+        return encode_items, decode_items
+    if origin is dict:
+        encode, decode = _converters(args[1]) if args else (None, None)
+        if encode is None or decode is None:
+            return None, None
+        return (
+            lambda value: {k: encode(v) for k, v in value.items()},
+            lambda value: {k: decode(v) for k, v in value.items()},
+        )
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        enum_type: Any = tp
+        return (lambda value: value.value), enum_type
+    codec = _codec_or_none(tp) if isinstance(tp, type) else None
+    if codec is None:
+        return None, None
+    return codec.to_dict, codec.from_dict
+
+
+def _optional(converter: Converter | None) -> Converter | None:
+    if converter is None:
+        return None
+    return lambda value: None if value is None else converter(value)
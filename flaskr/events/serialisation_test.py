@@ -0,0 +1,98 @@
+import json
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Optional
+
+import pytest
+
+from .serialisation import (
+    decode_event,
+    encode_event,
+    event,
+)
+from .types import Event
+
+
+class Colour(Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+@dataclass
+class Item:
+    name: str
+    colour: Colour
+    amount: Optional[int] = None
+
+
+@event("SerialisationTestItemAdded")
+@dataclass
+class ItemAdded(Event):
+    item: Item
+    previous: Optional[Item]
+    tags: list[str]
+    history: list[Item] = field(default_factory=list[Item])
+    comment: str | None = None
+
+
+SAMPLE = ItemAdded(
+    stream_id="items-1",
+    item=Item("a", Colour.RED, 10),
+    previous=None,
+    tags=["x", "y"],
+    history=[Item("b", Colour.BLUE)],
+)
+
+
+def test_round_trip_nested_dataclasses() -> None:
+    assert decode_event(ItemAdded.type, encode_event(SAMPLE)) == SAMPLE
+
+
+def test_json_encodes_enums_by_value() -> None:
+    payload = json.loads(encode_event(SAMPLE))
+
+    assert payload["item"] == {"name": "a", "colour": "red", "amount": 10}
+    assert payload["history"] == [{"name": "b", "colour": "blue", "amount": None}]
+
+
+def test_missing_optional_fields_take_defaults() -> None:
+    payload: dict[str, object] = {
+        "stream_id": "items-1",
+        "item": {"name": "a", "colour": "red"},
+        "previous": None,
+        "tags": [],
+    }
+
+    decoded = decode_event(ItemAdded.type, json.dumps(payload))
+
+    assert isinstance(decoded, ItemAdded)
+    assert decoded.item == Item("a", Colour.RED)
+    assert decoded.history == []
+    assert decoded.comment is None
+
+
+def test_hints_resolve_on_first_use() -> None:
+    # Registering must not resolve annotations: Later is only defined below
+    @event("SerialisationTestForwardReference")
+    @dataclass
+    class Forward(Event):
+        later: "Later"
+
+    @dataclass
+    class Later:
+        colour: Colour
+
+    globals()["Later"] = Later
+    try:
+        sample = Forward("forward-1", Later(Colour.BLUE))
+        assert json.loads(encode_event(sample))["later"] == {"colour": "blue"}
+        assert decode_event(Forward.type, encode_event(sample)) == sample
+    finally:
+        del globals()["Later"]
+
+
+def test_rejects_other_content_types() -> None:
+    with pytest.raises(ValueError):
+        encode_event(SAMPLE, "application/octet-stream")  # type: ignore[arg-type]
+    with pytest.raises(ValueError):
+        decode_event(ItemAdded.type, b"[]", "application/octet-stream")
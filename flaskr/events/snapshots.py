@@ -0,0 +1,144 @@
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Any, ClassVar, Protocol
+
+from .types import Event
+
+__all__ = [
+    "Snapshot",
+    "Snapshottable",
+    "SnapshotStore",
+    "SqliteSnapshotStore",
+    "SnapshotPolicy",
+    "EveryNEvents",
+    "OnEventTypes",
+    "AnyOf",
+]
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    stream_id: str
+    # Revision of the last event folded into the state
+    revision: int
+    schema_version: int
+    state: dict[str, Any]
+
+
+class Snapshottable(Protocol):
+    # Bump whenever the shape of to_snapshot() changes; older snapshots are
+    # then ignored and dropped on load
+    SNAPSHOT_VERSION: ClassVar[int]
+    revision: int
+
+    def apply(self, event: Event) -> None: ...
+    def to_snapshot(self) -> dict[str, Any]: ...
+    def restore_snapshot(self, state: dict[str, Any]) -> None: ...
+
+
+class SnapshotStore(Protocol):
+    def load(self, stream_id: str) -> Snapshot | None: ...
+    def save(self, snapshot: Snapshot) -> None: ...
+    def invalidate(self, stream_id: str | None = None) -> None: ...
+    def destroy(self) -> None: ...
+
+
+class SqliteSnapshotStore(SnapshotStore):
+    """
+    Keeps the latest snapshot per stream in a local SQLite database.
+    """
+
+    def __init__(self, db_path: str = "snapshots.db") -> None:
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    stream_id TEXT PRIMARY KEY,
+                    revision INTEGER NOT NULL,
+                    schema_version INTEGER NOT NULL,
+                    state TEXT NOT NULL
+                )
+                """
+            )
+
+    def load(self, stream_id: str) -> Snapshot | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT revision, schema_version, state FROM snapshots WHERE stream_id = ?",
+                (stream_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        revision, schema_version, state = row
+        return Snapshot(stream_id, revision, schema_version, json.loads(state))
+
+    def save(self, snapshot: Snapshot) -> None:
+        with self._lock, self._connection:
+            # Never replace a snapshot with an older one
+            self._connection.execute(
+                """
+                INSERT INTO snapshots (stream_id, revision, schema_version, state)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (stream_id) DO UPDATE SET
+                    revision = excluded.revision,
+                    schema_version = excluded.schema_version,
+                    state = excluded.state
+                WHERE excluded.revision >= snapshots.revision
+                    OR excluded.schema_version != snapshots.schema_version
+                """,
+                (
+                    snapshot.stream_id,
+                    snapshot.revision,
+                    snapshot.schema_version,
+                    json.dumps(snapshot.state),
+                ),
+            )
+
+    def invalidate(self, stream_id: str | None = None) -> None:
+        with self._lock, self._connection:
+            if stream_id is None:
+                self._connection.execute("DELETE FROM snapshots")
+            else:
+                self._connection.execute(
+                    "DELETE FROM snapshots WHERE stream_id = ?", (stream_id,)
+                )
+
+    def destroy(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class SnapshotPolicy(Protocol):
+    def should_snapshot(self, events_since_snapshot: int, event: Event) -> bool: ...
+
+
+class EveryNEvents(SnapshotPolicy):
+    def __init__(self, n: int) -> None:
+        self._n = n
+
+    def should_snapshot(self, events_since_snapshot: int, event: Event) -> bool:
+        return events_since_snapshot >= self._n
+
+
+class OnEventTypes(SnapshotPolicy):
+    def __init__(self, *event_types: type) -> None:
+        self._event_types = event_types
+
+    def should_snapshot(self, events_since_snapshot: int, event: Event) -> bool:
+        return isinstance(event, self._event_types)
+
+
+class AnyOf(SnapshotPolicy):
+    def __init__(self, *policies: SnapshotPolicy) -> None:
+        self._policies = policies
+
+    def should_snapshot(self, events_since_snapshot: int, event: Event) -> bool:
+        return any(
+            policy.should_snapshot(events_since_snapshot, event)
+            for policy in self._policies
+        )
@@ -0,0 +1,67 @@
+from pathlib import Path
+from typing import Generator
+
+import pytest
+
+from flaskr.planning.planning_aggregate import (
+    PlanningAggregate,
+    PlanningApprovedEvent,
+    PlanningStartedEvent,
+    PlanningStatus,
+)
+
+from .snapshots import (
+    AnyOf,
+    EveryNEvents,
+    OnEventTypes,
+    Snapshot,
+    SqliteSnapshotStore,
+)
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> Generator[SqliteSnapshotStore, None, None]:
+    store = SqliteSnapshotStore(str(tmp_path / "snapshots.db"))
+    yield store
+    store.destroy()
+
+
+def test_latest_snapshot_wins(store: SqliteSnapshotStore) -> None:
+    store.save(Snapshot("s", 10, 1, {"n": 10}))
+    store.save(Snapshot("s", 5, 1, {"n": 5}))
+
+    assert store.load("s") == Snapshot("s", 10, 1, {"n": 10})
+    assert store.load("other") is None
+
+
+def test_invalidate(store: SqliteSnapshotStore) -> None:
+    store.save(Snapshot("a", 1, 1, {}))
+    store.save(Snapshot("b", 1, 1, {}))
+
+    store.invalidate("a")
+    assert store.load("a") is None
+    assert store.load("b") is not None
+
+    store.invalidate()
+    assert store.load("b") is None
+
+
+def test_policies() -> None:
+    policy = AnyOf(EveryNEvents(3), OnEventTypes(PlanningApprovedEvent))
+    started = PlanningStartedEvent("Planning:1", "2025-05-20")
+
+    assert not policy.should_snapshot(1, started)
+    assert policy.should_snapshot(3, started)
+    assert policy.should_snapshot(1, PlanningApprovedEvent("Planning:1"))
+
+
+def test_planning_aggregate_snapshot_round_trip() -> None:
+    aggregate = PlanningAggregate("1")
+    aggregate.planning_year = 2025
+    aggregate.apply(PlanningStartedEvent(aggregate.stream_id, "2025-05-20"))
+
+    restored = PlanningAggregate("1")
+    restored.restore_snapshot(aggregate.to_snapshot())
+
+    assert restored.__dict__ == aggregate.__dict__
+    assert restored.status == PlanningStatus.IN_PROGRESS
@@ -0,0 +1,196 @@
+import json
+import sqlite3
+import threading
+from typing import Any, Iterator, Sequence
+
+from .event_repository import Durability, EventRepository, decode_record
+from .serialisation import event_record
+
+__all__ = ["SqliteEventRepository"]
+
+_INSERT = (
+    "INSERT INTO events (stream_id, revision, module, type, payload) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+_READ_STREAM = (
+    "SELECT module, type, stream_id, payload FROM events "
+    "WHERE stream_id = ? AND revision >= ? ORDER BY revision"
+)
+_READ_ALL = (
+    "SELECT position, module, type, stream_id, payload FROM events "
+    "WHERE position > ? AND position <= ? ORDER BY position"
+)
+_STREAM_REVISION = "SELECT MAX(revision) FROM events WHERE stream_id = ?"
+_LAST_POSITION = "SELECT MAX(position) FROM events"
+
+
+class SqliteEventRepository(EventRepository):
+    """
+    Stores events in a SQLite database in WAL mode, as an alternative to the
+    JSON lines file. Every event gets a global position (its row id) and a
+    revision within its stream, so replays and projections can resume from
+    a checkpoint with `read_all`, and aggregates can load with `read_stream`.
+
+    All writes go through one connection under a lock, one transaction per
+    `store_all` call. Reads use a connection per thread and, thanks to WAL,
+    do not wait for writers.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "events.db",
+        durability: Durability = Durability.FLUSH,
+    ) -> None:
+        self._db_path = db_path
+        self._durability = durability
+        self._connection = self._connect()
+        self._lock = threading.Lock()
+        # Next revision of every stream written since opening
+        self._next_revisions: dict[str, int] = {}
+        self._readers = threading.local()
+        self._reader_connections: list[sqlite3.Connection] = []
+        with self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS events (
+                    position INTEGER PRIMARY KEY AUTOINCREMENT,
+                    stream_id TEXT NOT NULL,
+                    revision INTEGER NOT NULL,
+                    module TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    UNIQUE (stream_id, revision)
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS events_type ON events (type, position)"
+            )
+        # FLUSH survives a crash of the process (the WAL is only synced at
+        # checkpoints); the others also survive a crash of the machine
+        synchronous = "NORMAL" if durability is Durability.FLUSH else "FULL"
+        self._connection.execute(f"PRAGMA synchronous={synchronous}")
+
+    def store(self, event: Any) -> None:
+        self.store_all([event])
+
+    def store_all(self, events: list[Any]) -> None:
+        records = [_serialise(event) for event in events]
+        if not records:
+            return
+        with self._lock:
+            if self._durability is Durability.EVENT:
+                for record in records:
+                    self._insert([record])
+            else:
+                self._insert(records)
+
+    def destroy(self) -> None:
+        with self._lock:
+            self._connection.close()
+            for reader in self._reader_connections:
+                reader.close()
+            self._reader_connections.clear()
+
+    def read_stream(self, stream_id: str, from_revision: int = 0) -> Iterator[Any]:
+        """
+        Yield the events of a single stream, starting at `from_revision`.
+        """
+        for module, type, stream, payload in self._reader().execute(
+            _READ_STREAM, (stream_id, from_revision)
+        ):
+            yield _decode(module, type, stream, payload)
+
+    def read_all(
+        self,
+        after_position: int = 0,
+        to_position: int | None = None,
+        types: Sequence[str] = (),
+    ) -> Iterator[tuple[int, Any]]:
+        """
+        Yield (position, event) for every event after `after_position`, up to
+        and including `to_position`, in the order they were stored.
+        `types` limits the result to events of the given class names.
+        """
+        end = to_position if to_position is not None else self.last_position()
+        if types:
+            placeholders = ", ".join("?" for _ in types)
+            rows = self._reader().execute(
+                "SELECT position, module, type, stream_id, payload FROM events "
+                f"WHERE type IN ({placeholders}) AND position > ? AND position <= ? "
+                "ORDER BY position",
+                (*types, after_position, end),
+            )
+        else:
+            rows = self._reader().execute(_READ_ALL, (after_position, end))
+        for position, module, type, stream_id, payload in rows:
+            yield position, _decode(module, type, stream_id, payload)
+
+    def stream_revision(self, stream_id: str) -> int:
+        """
+        Revision of the last stored event of the stream, -1 if it has none.
+        """
+        (revision,) = self._reader().execute(_STREAM_REVISION, (stream_id,)).fetchone()
+        return -1 if revision is None else revision
+
+    def last_position(self) -> int:
+        """
+        Global position of the last stored event, 0 if there are none.
+        """
+        (position,) = self._reader().execute(_LAST_POSITION).fetchone()
+        return position or 0
+
+    def _insert(self, records: list[tuple[str, str, str, str]]) -> None:
+        rows: list[tuple[str, int, str, str, str]] = []
+        revisions: dict[str, int] = {}
+        for stream_id, module, type, payload in records:
+            revision = revisions.get(stream_id)
+            if revision is None:
+                revision = self._next_revision(stream_id)
+            rows.append((stream_id, revision, module, type, payload))
+            revisions[stream_id] = revision + 1
+        with self._connection:
+            self._connection.executemany(_INSERT, rows)
+        # Only once the transaction committed
+        self._next_revisions.update(revisions)
+
+    def _next_revision(self, stream_id: str) -> int:
+        revision = self._next_revisions.get(stream_id)
+        if revision is None:
+            (last,) = self._connection.execute(
+                _STREAM_REVISION, (stream_id,)
+            ).fetchone()
+            revision = 0 if last is None else last + 1
+        return revision
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self._db_path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def _reader(self) -> sqlite3.Connection:
+        reader: sqlite3.Connection | None = getattr(self._readers, "connection", None)
+        if reader is None:
+            reader = self._connect()
+            self._readers.connection = reader
+            with self._lock:
+                self._reader_connections.append(reader)
+        return reader
+
+
+def _serialise(event: Any) -> tuple[str, str, str, str]:
+    record = event_record(event)
+    # stream_id has its own column
+    payload = {k: v for k, v in record["payload"].items() if k != "stream_id"}
+    return (record["stream_id"], record["module"], record["type"], json.dumps(payload))
+
+
+def _decode(module: str, type: str, stream_id: str, payload: str) -> Any:
+    return decode_record(
+        {
+            "module": module,
+            "type": type,
+            "stream_id": stream_id,
+            "payload": json.loads(payload),
+        }
+    )
@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from .sqlite_event_repository import SqliteEventRepository
+from .types import Event
+
+
+@dataclass
+class MockEvent(Event):
+    id: int
+
+
+@dataclass
+class OtherEvent(Event):
+    id: int
+
+
+def test_read_stream_and_revisions(tmp_path: Path) -> None:
+    path = str(tmp_path / "events.db")
+    repository = SqliteEventRepository(path)
+    repository.store_all([MockEvent("a", 1), MockEvent("b", 2), MockEvent("a", 3)])
+    repository.store(MockEvent("a", 4))
+    repository.destroy()
+
+    # Revisions continue where they left off after reopening
+    repository = SqliteEventRepository(path)
+    repository.store(MockEvent("a", 5))
+
+    assert [e.id for e in repository.read_stream("a")] == [1, 3, 4, 5]
+    assert [e.id for e in repository.read_stream("a", from_revision=2)] == [4, 5]
+    assert repository.stream_revision("a") == 3
+    assert repository.stream_revision("missing") == -1
+    assert list(repository.read_stream("a"))[0] == MockEvent("a", 1)
+    repository.destroy()
+
+
+def test_read_all_resumes_from_position(tmp_path: Path) -> None:
+    repository = SqliteEventRepository(str(tmp_path / "events.db"))
+    repository.store_all([MockEvent("a", 1), OtherEvent("b", 2), MockEvent("c", 3)])
+    repository.store(OtherEvent("a", 4))
+
+    assert [(p, e.id) for p, e in repository.read_all()] == [
+        (1, 1),
+        (2, 2),
+        (3, 3),
+        (4, 4),
+    ]
+    assert [e.id for _, e in repository.read_all(after_position=2)] == [3, 4]
+    assert [e.id for _, e in repository.read_all(1, to_position=3)] == [2, 3]
+    assert [e.id for _, e in repository.read_all(types=["OtherEvent"])] == [2, 4]
+    assert repository.last_position() == 4
+    repository.destroy()
@@ -1,22 +1,38 @@
 from flask import Flask
 
 from .db import db
-from .events import init_event_extension, init_kurrentdb
+from .events import (
+    get_projections,
+    init_event_extension,
+    init_kurrentdb,
+    init_projections,
+    init_snapshot_store,
+)
 
 __all__ = ["app", "db"]
 
 app = Flask(__name__, template_folder="web/templates", static_folder="web/static")
 app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///zgrany_budget.db"
 app.secret_key = "super_secret_key_for_demo_only"
+# e.g. FLASK_KURRENTDB_BACKEND=embedded to run without a KurrentDB server
+app.config.from_prefixed_env()
 
 db.init_app(app)
 with app.app_context():
     init_event_extension(app)
     init_kurrentdb(app)
+    init_snapshot_store(app)
+    init_projections(app)
     from flaskr.extensions import init_context_extension
 
     init_context_extension(app)
 
+    from .planning.expenses.projection import ExpensesProjection
+    from .planning.office_totals import OfficeTotalsProjection
+
+    get_projections().register(ExpensesProjection())
+    get_projections().register(OfficeTotalsProjection())
+
     from .planning.views import planning_bp
 
     app.register_blueprint(planning_bp, url_prefix="/")
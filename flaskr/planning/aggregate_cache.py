@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+__all__ = ["AggregateCache", "CachedAggregate", "CacheStats"]
+
+
+@dataclass(frozen=True)
+class CachedAggregate:
+    # Shared between requests - never mutate, apply new events to a copy
+    aggregate: Any
+    # Revision of the last event applied to the aggregate
+    revision: int
+    # Revision of the last snapshot taken of the stream, -1 if none
+    snapshot_revision: int
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class AggregateCache:
+    """
+    LRU cache of hydrated aggregates keyed by stream name. Entries remember
+    the revision they were built up to, so a hit only needs the events
+    recorded after it.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 128,
+        ttl: float | None = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, CachedAggregate]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, stream_name: str) -> CachedAggregate | None:
+        with self._lock:
+            item = self._entries.get(stream_name)
+            if item is not None and self._expired(item[0]):
+                del self._entries[stream_name]
+                item = None
+            if item is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(stream_name)
+            self._hits += 1
+            return item[1]
+
+    def peek(self, stream_name: str) -> CachedAggregate | None:
+        """
+        Like get(), but without touching the recency order or the counters.
+        """
+        with self._lock:
+            item = self._entries.get(stream_name)
+            if item is None or self._expired(item[0]):
+                return None
+            return item[1]
+
+    def put(self, stream_name: str, entry: CachedAggregate) -> None:
+        with self._lock:
+            current = self._entries.get(stream_name)
+            # A slower concurrent load must not replace a fresher entry
+            if current is not None and current[1].revision > entry.revision:
+                return
+            self._entries[stream_name] = (self._clock(), entry)
+            self._entries.move_to_end(stream_name)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, stream_name: str | None = None) -> None:
+        with self._lock:
+            if stream_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(stream_name, None)
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                self._hits, self._misses, self._evictions, len(self._entries)
+            )
+
+    def _expired(self, stored_at: float) -> bool:
+        return self._ttl is not None and self._clock() - stored_at > self._ttl
@@ -0,0 +1,53 @@
+from .aggregate_cache import AggregateCache, CachedAggregate, CacheStats
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_hits_and_misses() -> None:
+    cache = AggregateCache()
+    entry = CachedAggregate(object(), 3, -1)
+
+    assert cache.get("s") is None
+    cache.put("s", entry)
+    assert cache.get("s") is entry
+    assert cache.stats() == CacheStats(hits=1, misses=1, evictions=0, size=1)
+
+
+def test_evicts_least_recently_used() -> None:
+    cache = AggregateCache(max_size=2)
+    cache.put("a", CachedAggregate("a", 0, -1))
+    cache.put("b", CachedAggregate("b", 0, -1))
+    cache.get("a")
+    cache.put("c", CachedAggregate("c", 0, -1))
+
+    assert cache.peek("b") is None
+    assert cache.peek("a") is not None
+    assert cache.peek("c") is not None
+    assert cache.stats().evictions == 1
+
+
+def test_entries_expire() -> None:
+    clock = FakeClock()
+    cache = AggregateCache(ttl=10, clock=clock)
+    cache.put("s", CachedAggregate("s", 0, -1))
+
+    clock.now = 5
+    assert cache.get("s") is not None
+    clock.now = 11
+    assert cache.get("s") is None
+    assert cache.stats().size == 0
+
+
+def test_older_revision_does_not_replace_newer() -> None:
+    cache = AggregateCache()
+    newer = CachedAggregate("new", 5, -1)
+    cache.put("s", newer)
+    cache.put("s", CachedAggregate("old", 4, -1))
+
+    assert cache.peek("s") is newer
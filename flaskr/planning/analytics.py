@@ -0,0 +1,224 @@
+"""
+Multi-year budget rollups over all expenses, computed with NumPy.
+NumPy is an optional dependency (the `analytics` extra).
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Literal, get_args
+
+import numpy as np
+import numpy.typing as npt
+
+from .expenses.expense_table import NULL_INT, ExpenseColumns
+from .expenses.projection import ExpensesProjection
+from .office_totals import BUDGET_YEARS
+
+__all__ = [
+    "GroupBy",
+    "GROUP_BY",
+    "parse_group_by",
+    "BudgetRollup",
+    "BudgetAnalytics",
+    "budget_analytics",
+]
+
+GroupBy = Literal["office", "dzial", "rozdzial", "departament", "zrodlo_fin"]
+GROUP_BY: tuple[GroupBy, ...] = get_args(GroupBy)
+
+_BUDGET_FIELDS = tuple(f"budget_{year}" for year in BUDGET_YEARS)
+
+IntArray = npt.NDArray[np.int64]
+
+
+def parse_group_by(value: str) -> GroupBy | None:
+    for by in GROUP_BY:
+        if by == value:
+            return by
+    return None
+
+
+@dataclass(frozen=True)
+class BudgetRollup:
+    by: GroupBy
+    labels: list[str | None]
+    counts: IntArray
+    # One row per group, one column per year of BUDGET_YEARS
+    budgets: IntArray
+
+    @property
+    def totals(self) -> IntArray:
+        return self.budgets.sum(axis=0)
+
+    def shares(self) -> npt.NDArray[np.float64]:
+        """
+        Each group's share of the year's total; 0 for years without budget.
+        """
+        totals = self.totals
+        return np.divide(
+            self.budgets,
+            totals,
+            out=np.zeros(self.budgets.shape, dtype=np.float64),
+            where=totals != 0,
+        )
+
+    def yoy_deltas(self) -> IntArray:
+        return np.diff(self.budgets, axis=1)
+
+    def yoy_changes(self) -> npt.NDArray[np.float64]:
+        """
+        Relative change against the previous year, NaN where it was 0.
+        """
+        previous = self.budgets[:, :-1]
+        return np.divide(
+            self.yoy_deltas(),
+            previous,
+            out=np.full(previous.shape, np.nan),
+            where=previous != 0,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        JSON-ready form, groups ordered by their total over all years.
+        """
+        shares = self.shares()
+        deltas = self.yoy_deltas()
+        changes = self.yoy_changes()
+        order = np.argsort(-self.budgets.sum(axis=1), kind="stable")
+        return {
+            "by": self.by,
+            "years": list(BUDGET_YEARS),
+            "totals": self.totals.tolist(),
+            "groups": [
+                {
+                    "key": self.labels[i],
+                    "count": int(self.counts[i]),
+                    "budgets": self.budgets[i].tolist(),
+                    "shares": shares[i].round(6).tolist(),
+                    "yoy_deltas": deltas[i].tolist(),
+                    "yoy_changes": [
+                        None if np.isnan(c) else round(float(c), 6) for c in changes[i]
+                    ],
+                }
+                for i in order
+            ],
+        }
+
+
+class BudgetAnalytics:
+    """
+    Expense budgets as NumPy columns, with the group of every expense for
+    each grouping encoded as small integers, so a rollup is a handful of
+    vectorised bincounts.
+    """
+
+    def __init__(self, columns: ExpenseColumns) -> None:
+        budgets = np.stack(
+            [_int_column(columns, name) for name in _BUDGET_FIELDS], axis=1
+        )
+        # Missing budgets count as 0
+        budgets[budgets == NULL_INT] = 0
+        self._budgets: IntArray = budgets
+        self._groups: dict[GroupBy, tuple[IntArray, list[str | None]]] = {
+            "office": (
+                np.repeat(np.arange(len(columns.tables)), columns.lengths),
+                list(columns.tables),
+            ),
+            "dzial": _pooled_groups(columns, "chapter", lambda c: _code(c)[:3]),
+            "rozdzial": _pooled_groups(columns, "chapter", _code),
+            "departament": _pooled_groups(columns, "departament", _label),
+            "zrodlo_fin": _int_groups(_int_column(columns, "zrodlo_fin")),
+        }
+
+    def __len__(self) -> int:
+        return len(self._budgets)
+
+    def rollup(self, by: GroupBy) -> BudgetRollup:
+        codes, labels = self._groups[by]
+        groups = len(labels)
+        counts = np.bincount(codes, minlength=groups).astype(np.int64)
+        # bincount sums in float64, exact for sums below 2**53
+        budgets = np.stack(
+            [
+                np.bincount(codes, weights=self._budgets[:, year], minlength=groups)
+                for year in range(len(BUDGET_YEARS))
+            ],
+            axis=1,
+        )
+        # Drop groups that lost all their expenses
+        present = counts > 0
+        return BudgetRollup(
+            by,
+            [label for label, keep in zip(labels, present) if keep],
+            counts[present],
+            np.rint(budgets[present]).astype(np.int64),
+        )
+
+
+def _int_column(columns: ExpenseColumns, name: str) -> IntArray:
+    return np.frombuffer(columns.ints[name], dtype=np.int64).copy()
+
+
+def _code(chapter: object) -> str:
+    # Chapters that went through a number lost their leading zero
+    if isinstance(chapter, int):
+        return f"{chapter:05d}"
+    return "" if chapter is None else str(chapter)
+
+
+def _label(value: object) -> str | None:
+    return None if value is None else str(value)
+
+
+def _pooled_groups(
+    columns: ExpenseColumns, name: str, key: Callable[[object], str | None]
+) -> tuple[IntArray, list[str | None]]:
+    """
+    Group codes for a pooled column: the key is worked out once per
+    distinct value in the column, then every row is mapped through a lookup
+    table.
+    """
+    refs = np.frombuffer(columns.refs[name], dtype=np.uint32)
+    labels: list[str | None] = []
+    label_codes: dict[str | None, int] = {}
+    lookup = np.zeros(len(columns.values), dtype=np.int64)
+    for ref in np.unique(refs).tolist():
+        label = key(columns.values[ref])
+        code = label_codes.get(label)
+        if code is None:
+            code = label_codes[label] = len(labels)
+            labels.append(label)
+        lookup[ref] = code
+    return lookup[refs], labels
+
+
+def _int_groups(values: IntArray) -> tuple[IntArray, list[str | None]]:
+    distinct, codes = np.unique(values, return_inverse=True)
+    labels: list[str | None] = [
+        None if value == NULL_INT else str(value) for value in distinct.tolist()
+    ]
+    return codes.astype(np.int64), labels
+
+
+_cache_lock = threading.Lock()
+_cached: tuple[ExpensesProjection, int, BudgetAnalytics] | None = None
+
+
+def budget_analytics(projection: ExpensesProjection, position: int) -> BudgetAnalytics:
+    """
+    Analytics over the projection's expenses, as of read model `position`.
+    Built once per position, so repeated queries only run the rollups.
+    """
+    global _cached
+    with _cache_lock:
+        cached = _cached
+    if cached is not None and cached[0] is projection and cached[1] == position:
+        return cached[2]
+    analytics = BudgetAnalytics(
+        projection.export_columns(
+            (*_BUDGET_FIELDS, "zrodlo_fin"), ("chapter", "departament")
+        )
+    )
+    with _cache_lock:
+        _cached = (projection, position, analytics)
+    return analytics
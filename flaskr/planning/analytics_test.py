@@ -0,0 +1,103 @@
+import math
+
+import pytest
+
+from flaskr.constants import OFFICES
+
+from .expenses.aggregate import ExpenseAdded
+from .expenses.projection import ExpensesProjection
+from .types import Expense
+
+np = pytest.importorskip("numpy")
+
+from .analytics import BudgetAnalytics, budget_analytics  # noqa: E402
+
+FIRST, SECOND = OFFICES[0], OFFICES[1]
+COLUMNS = (
+    ("budget_2025", "budget_2026", "budget_2027", "budget_2028", "budget_2029"),
+    ("chapter", "departament"),
+)
+
+
+def projection() -> ExpensesProjection:
+    projection = ExpensesProjection()
+    for id, office, chapter, departament, zrodlo_fin, budgets in [
+        ("a", FIRST, 75001, "DB", 1, (10, 20, 30, None, None)),
+        ("b", FIRST, "75002", "DB", None, (0, 10, 10, 10, 10)),
+        ("c", SECOND, 1001, "DI", 1, (5, 0, 5, 5, 5)),
+    ]:
+        b2025, b2026, b2027, b2028, b2029 = budgets
+        projection.apply(
+            ExpenseAdded(
+                f"expenses-{office}",
+                Expense(
+                    id,
+                    chapter,
+                    id,
+                    0,
+                    office,
+                    departament=departament,
+                    zrodlo_fin=zrodlo_fin,
+                    budget_2025=b2025,
+                    budget_2026=b2026,
+                    budget_2027=b2027,
+                    budget_2028=b2028,
+                    budget_2029=b2029,
+                ),
+            )
+        )
+    return projection
+
+
+def analytics() -> BudgetAnalytics:
+    return BudgetAnalytics(
+        projection().export_columns((*COLUMNS[0], "zrodlo_fin"), COLUMNS[1])
+    )
+
+
+def test_rollup_by_office() -> None:
+    rollup = analytics().rollup("office")
+
+    assert rollup.labels == [FIRST, SECOND]
+    assert rollup.counts.tolist() == [2, 1]
+    assert rollup.budgets.tolist() == [[10, 30, 40, 10, 10], [5, 0, 5, 5, 5]]
+    assert rollup.totals.tolist() == [15, 30, 45, 15, 15]
+    assert rollup.shares()[1].tolist() == pytest.approx([1 / 3, 0, 1 / 9, 1 / 3, 1 / 3])
+    assert rollup.yoy_deltas()[0].tolist() == [20, 10, -30, 0]
+    assert rollup.yoy_changes()[0].tolist()[:3] == [2.0, pytest.approx(1 / 3), -0.75]
+    assert math.isnan(rollup.yoy_changes()[1][1])
+
+
+def test_rollup_by_classification_and_attributes() -> None:
+    result = analytics()
+
+    assert sorted(result.rollup("dzial").labels) == ["010", "750"]  # type: ignore[type-var]
+    assert sorted(result.rollup("rozdzial").labels) == ["01001", "75001", "75002"]  # type: ignore[type-var]
+    departament = result.rollup("departament")
+    assert dict(zip(departament.labels, departament.counts.tolist())) == {
+        "DB": 2,
+        "DI": 1,
+    }
+    zrodlo_fin = result.rollup("zrodlo_fin")
+    assert dict(zip(zrodlo_fin.labels, zrodlo_fin.counts.tolist())) == {
+        "1": 2,
+        None: 1,
+    }
+
+
+def test_to_dict_orders_groups_by_total() -> None:
+    result = analytics().rollup("office").to_dict()
+
+    assert [g["key"] for g in result["groups"]] == [FIRST, SECOND]
+    assert result["groups"][1]["yoy_changes"][0] == -1.0
+    assert result["groups"][1]["yoy_changes"][1] is None
+    assert result["years"] == [2025, 2026, 2027, 2028, 2029]
+
+
+def test_built_once_per_position() -> None:
+    source = projection()
+
+    first = budget_analytics(source, 1)
+    assert budget_analytics(source, 1) is first
+    assert budget_analytics(source, 2) is not first
+    assert len(first) == 3
@@ -0,0 +1,107 @@
+import asyncio
+from typing import Mapping, Optional
+
+from kurrentdbclient import AsyncKurrentDBClient, StreamState
+from kurrentdbclient.exceptions import NotFoundError, WrongCurrentVersionError
+
+from flaskr.events import get_async_kurrent
+from flaskr.events.serialisation import decode_event
+from flaskr.events.types import Event
+from flaskr.planning.expenses.aggregate import (
+    ExpenseListAggregate,
+    expense_list_stream_id,
+)
+from flaskr.planning.planning_aggregate import (
+    PlanningAggregate,
+    planning_id_to_stream,
+)
+from flaskr.planning.planning_repository import PlanningRepository
+
+__all__ = ["AsyncPlanningRepository"]
+
+
+class AsyncPlanningRepository:
+    """
+    asyncio variant of PlanningRepository on top of the async KurrentDB client.
+    Independent streams can be read concurrently, e.g. a planning together with
+    all of its expense lists.
+
+    Finding the current planning and appending go through the given
+    PlanningRepository, so both share the current planning pointer, the
+    expected-revision checks and the aggregate cache.
+    """
+
+    def __init__(self, repository: PlanningRepository) -> None:
+        self._repository = repository
+
+    async def _read_events(self, stream_name: str) -> list[Event]:
+        async def read(client: AsyncKurrentDBClient) -> list[Event]:
+            try:
+                return [
+                    decode_event(event.type, event.data, event.content_type)
+                    async for event in await client.read_stream(stream_name)
+                ]
+            except NotFoundError:
+                return []
+
+        return await get_async_kurrent().call(read)
+
+    async def get_planning(self, planning_id: str) -> PlanningAggregate:
+        aggregate = PlanningAggregate(planning_id)
+        for event in await self._read_events(planning_id_to_stream(planning_id)):
+            aggregate.apply(event)
+        return aggregate
+
+    async def get_current_planning(self) -> Optional[PlanningAggregate]:
+        # Only reads the log while the pointer's subscription is catching up
+        planning_id = await asyncio.to_thread(self._repository.current_planning_id)
+        if planning_id is None:
+            return None
+        return await self.get_planning(planning_id)
+
+    async def get_expense_list(
+        self, expense_list_id: str, parent_planning_id: str
+    ) -> ExpenseListAggregate:
+        aggregate = ExpenseListAggregate(expense_list_id, parent_planning_id)
+        for event in await self._read_events(expense_list_stream_id(expense_list_id)):
+            aggregate.apply(event)
+        return aggregate
+
+    async def get_expense_lists(
+        self, planning: PlanningAggregate
+    ) -> dict[str, ExpenseListAggregate]:
+        """
+        Load the expense lists of every office of the planning concurrently.
+        """
+        offices = list(planning.office_expense_ids)
+        aggregates = await asyncio.gather(
+            *(
+                self.get_expense_list(planning.office_expense_ids[office], planning.id)
+                for office in offices
+            )
+        )
+        return dict(zip(offices, aggregates))
+
+    async def store(
+        self,
+        events: list[Event],
+        expected_revisions: Mapping[str, int | StreamState] | None = None,
+    ) -> int | None:
+        """
+        Like PlanningRepository.store: one atomic append of a batch per
+        stream, checked against expected_revisions.
+        """
+        if not events:
+            return None
+        append = self._repository.prepare_append(events, expected_revisions)
+
+        async def multi_append(client: AsyncKurrentDBClient) -> int:
+            return await client.multi_append_to_stream(append.batches)
+
+        try:
+            commit_position = await get_async_kurrent().call(multi_append)
+        except WrongCurrentVersionError as e:
+            raise self._repository.append_conflict(append, e) from e
+        # May read the tail of a cached stream with the blocking client
+        await asyncio.to_thread(self._repository.appended, append, commit_position)
+        return commit_position
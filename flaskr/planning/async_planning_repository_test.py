@@ -0,0 +1,113 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Generator
+
+import pytest
+from flask import Flask, current_app
+from kurrentdbclient import StreamState
+
+from flaskr.constants import OFFICES
+from flaskr.events import (
+    get_async_kurrent,
+    init_event_extension,
+    init_kurrentdb,
+    init_snapshot_store,
+)
+from flaskr.events.types import Event
+
+from .async_planning_repository import AsyncPlanningRepository
+from .expenses.aggregate import ExpenseListCreated, expense_list_stream_id
+from .planning_aggregate import (
+    PlanningScheduled,
+    PlanningStartedEvent,
+    PlanningStatus,
+    planning_id_to_stream,
+)
+from .planning_repository import PlanningRepository, StreamVersionConflict
+from .types import ExpensesStatus
+
+
+@pytest.fixture
+def repository(tmp_path: Path) -> Generator[AsyncPlanningRepository, None, None]:
+    app = Flask(__name__)
+    app.config["KURRENTDB_BACKEND"] = "embedded"
+    app.config["KURRENTDB_FILE"] = str(tmp_path / "kurrent.db")
+    app.config["SNAPSHOTS_FILE"] = str(tmp_path / "snapshots.db")
+    app.config["EVENTS_FILE"] = str(tmp_path / "events.jsonl")
+    with app.app_context():
+        init_event_extension(app)
+        init_kurrentdb(app)
+        init_snapshot_store(app)
+        yield AsyncPlanningRepository(PlanningRepository())
+        if "kurrent-db-async" in app.extensions:
+            get_async_kurrent().close()
+
+
+def schedule_events(planning_id: str) -> list[Any]:
+    return [
+        PlanningScheduled(
+            stream_id=planning_id_to_stream(planning_id),
+            id=planning_id,
+            planning_year=2025,
+            offices=OFFICES,
+        ),
+        *(
+            ExpenseListCreated(
+                stream_id=expense_list_stream_id(f"{planning_id}-{office}"),
+                expense_list_id=f"{planning_id}-{office}",
+                office=office,
+                parent_planning_id=planning_id,
+            )
+            for office in OFFICES
+        ),
+    ]
+
+
+def test_async_client_starts_on_first_use(
+    repository: AsyncPlanningRepository,
+) -> None:
+    assert "kurrent-db-async" not in current_app.extensions
+
+    # Looking for the current planning goes through the synchronous pointer
+    assert asyncio.run(repository.get_current_planning()) is None
+    assert "kurrent-db-async" not in current_app.extensions
+
+    planning = asyncio.run(repository.get_planning("missing"))
+
+    assert planning.revision == -1
+    assert "kurrent-db-async" in current_app.extensions
+
+
+def test_loads_planning_and_expense_lists(repository: AsyncPlanningRepository) -> None:
+    stream_id = planning_id_to_stream("p")
+
+    async def scenario() -> None:
+        await repository.store(schedule_events("p"), {stream_id: StreamState.NO_STREAM})
+        planning = await repository.get_current_planning()
+        assert planning is not None and planning.id == "p"
+
+        lists = await repository.get_expense_lists(planning)
+        assert list(lists) == list(OFFICES)
+        assert all(
+            expense_list.status is ExpensesStatus.NOT_STARTED
+            for expense_list in lists.values()
+        )
+
+    asyncio.run(scenario())
+
+
+def test_store_checks_expected_revisions(repository: AsyncPlanningRepository) -> None:
+    stream_id = planning_id_to_stream("p")
+
+    async def scenario() -> None:
+        await repository.store(schedule_events("p"), {stream_id: StreamState.NO_STREAM})
+        started: list[Event] = [PlanningStartedEvent(stream_id, "2025-12-31")]
+        await repository.store(started, {stream_id: 0})
+
+        # The planning is at revision 1 now
+        with pytest.raises(StreamVersionConflict):
+            await repository.store(started, {stream_id: 0})
+        planning = await repository.get_planning("p")
+        assert planning.status is PlanningStatus.IN_PROGRESS
+
+    asyncio.run(scenario())
@@ -1,24 +1,47 @@
-from flask import Blueprint, redirect, render_template, request, url_for
+from flask import Blueprint, abort, redirect, render_template, request, url_for
 from werkzeug.wrappers import Response
 
+from flaskr.constants import OFFICES
 from flaskr.extensions import ctx
 
 from ...auth import auth_required
-from ...constants import OFFICES
+from ...conditional import etag_cached
+from ...streaming import render_page
+from ..expenses.pagination import SORT_FIELDS, decode_cursor
+from ..expenses.projection import expenses_projection
+from ..office_totals import office_totals
 from ..planning_aggregate import (
-    EXPENSES,
-    EXPENSES_CLOSED,
     PlanningStatus,
     ReopenPlanningCommand,
     StartPlanningCommand,
     SubmitToMinisterCommand,
 )
+from ..versions import dashboard_version
 
 chief_bp = Blueprint("chief", __name__)
 
+# Expenses per page of the office details
+PAGE_SIZE = 50
+# Titles of the SORT_FIELDS columns
+_COLUMN_TITLES = (
+    "Rozdział",
+    "Departament",
+    "Nazwa zadania",
+    "Opis projektu",
+    "Termin realizacji",
+    "2025",
+    "2026",
+    "2027",
+    "2028",
+    "2029",
+    "Nr umowy",
+    "Z kim zawarta",
+)
+
 
 @chief_bp.route("/dashboard", methods=["GET", "POST"])
 @auth_required
+@etag_cached(dashboard_version)
 def dashboard() -> str | Response:
     if request.method == "POST":
         action = request.form.get("action")
@@ -34,30 +57,73 @@ def dashboard() -> str | Response:
 
         return redirect(url_for("planning.chief.dashboard"))
 
-    offices_status: list[dict[str, object]] = []
-    total_all_needs = 0
-    for office in OFFICES:
-        expenses = EXPENSES.get(office, [])
-        total_needs = sum(e.financial_needs for e in expenses)
-        task_count = len(expenses)
-        is_submitted = EXPENSES_CLOSED.get(office, False)
-
-        total_all_needs += total_needs
-
-        offices_status.append(
-            {
-                "name": office,
-                "status": "Submitted" if is_submitted else "Open",
-                "total_needs": total_needs,
-                "task_count": task_count,
-                "expenses": expenses,
-            }
-        )
+    # Expenses are fetched per office when its details are opened
+    totals = office_totals()
+    offices_status: list[dict[str, object]] = [
+        {
+            "name": office.office,
+            "status": "Submitted" if office.submitted else "Open",
+            "total_needs": office.total_needs,
+            "task_count": office.task_count,
+        }
+        for office in totals.offices
+    ]
 
-    return render_template(
+    return render_page(
         "chief_dashboard.html",
         state=ctx().planning_service.get_current_planning(),
         offices_status=offices_status,
-        total_all_needs=total_all_needs,
+        total_all_needs=totals.total_needs,
         PlanningStatus=PlanningStatus,
     )
+
+
+@chief_bp.route("/api/expense-lists")
+@auth_required
+async def expense_lists() -> dict[str, object]:
+    """
+    Status and number of expenses of every office's expense list, read from
+    their streams concurrently.
+    """
+    try:
+        lists = await ctx().planning_service.get_expense_lists()
+    except ValueError:
+        abort(404)
+    return {
+        office: {
+            "status": expense_list.status.value,
+            "expenses": len(expense_list.expenses),
+        }
+        for office, expense_list in lists.items()
+    }
+
+
+@chief_bp.route("/dashboard/offices/<office>/expenses")
+@auth_required
+@etag_cached(dashboard_version)
+def office_expenses(office: str) -> str:
+    """
+    HTML fragment with one page of an office's expenses, ordered by `sort`
+    (`desc=1` reverses it) and continuing after `after`.
+    """
+    if office not in OFFICES:
+        abort(404)
+    sort = request.args.get("sort", "chapter")
+    if sort not in SORT_FIELDS:
+        abort(400)
+    descending = request.args.get("desc") == "1"
+    cursor = request.args.get("after")
+    try:
+        after = decode_cursor(sort, cursor) if cursor else None
+    except ValueError:
+        abort(400)
+
+    page = expenses_projection().page(office, sort, descending, after, PAGE_SIZE)
+    return render_template(
+        "partials/office_expenses.html",
+        office=office,
+        page=page,
+        sort=sort,
+        descending=descending,
+        columns=list(zip(SORT_FIELDS, _COLUMN_TITLES)),
+    )
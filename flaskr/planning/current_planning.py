@@ -0,0 +1,147 @@
+import threading
+from dataclasses import dataclass, replace
+from logging import getLogger
+
+from kurrentdbclient import CaughtUp, RecordedEvent
+
+from flaskr.events.kurrent_client import CatchupSubscription, KurrentClient
+from flaskr.planning.planning_aggregate import (
+    PlanningScheduled,
+    planning_id_to_stream,
+    stream_to_planning_id,
+)
+
+logger = getLogger(__name__)
+
+__all__ = ["CurrentPlanningProjection", "PlanningPointer"]
+
+PLANNING_STREAM_PREFIX = planning_id_to_stream("")
+
+
+@dataclass(frozen=True)
+class PlanningPointer:
+    planning_id: str
+    # Commit position of the PlanningScheduled event of the planning
+    scheduled_at: int
+    # Latest known revision of the planning's stream, -1 if not known yet
+    revision: int
+
+
+class CurrentPlanningProjection:
+    """
+    Keeps track of the most recently scheduled planning by following the
+    planning streams with a catch-up subscription, so looking it up does not
+    scan the global log.
+
+    The pointer is only trustworthy while `caught_up` is True; until the
+    subscription has caught up (and again after it failed) callers should
+    fall back to reading the log.
+    """
+
+    def __init__(self) -> None:
+        self._pointer: PlanningPointer | None = None
+        self._caught_up = False
+        # Commit position to resume the subscription after, None for the start
+        self._position: int | None = None
+        self._started = False
+        self._thread: threading.Thread | None = None
+        self._subscription: CatchupSubscription | None = None
+        # Guards the pointer; _run_lock guards starting and stopping
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+
+    @property
+    def pointer(self) -> PlanningPointer | None:
+        return self._pointer
+
+    @property
+    def caught_up(self) -> bool:
+        return self._caught_up
+
+    def ensure_running(self, client: KurrentClient) -> None:
+        """
+        Start the subscription, or restart it after a failure. The first start
+        looks up the latest PlanningScheduled with a backwards read, so the
+        subscription only has to follow what comes after it.
+        """
+        with self._run_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if not self._started:
+                for recorded in client.read_all(
+                    filter_include=(PlanningScheduled.type,), backwards=True, limit=1
+                ):
+                    self._observe(recorded)
+                self._started = True
+            self._thread = threading.Thread(
+                target=self._follow,
+                args=(client, self._position),
+                name="current-planning",
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._run_lock:
+            if self._subscription is not None:
+                self._subscription.stop()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+
+    def observe_scheduled(
+        self, planning_id: str, commit_position: int, revision: int = -1
+    ) -> None:
+        """
+        Record a PlanningScheduled event. Also used to advance the pointer
+        right after this process stored one, without waiting for the
+        subscription to deliver it.
+        """
+        with self._lock:
+            pointer = self._pointer
+            if pointer is None or commit_position > pointer.scheduled_at:
+                self._pointer = PlanningPointer(planning_id, commit_position, revision)
+            elif pointer.planning_id == planning_id and revision > pointer.revision:
+                self._pointer = replace(pointer, revision=revision)
+
+    def observe_revision(self, planning_id: str, revision: int) -> None:
+        with self._lock:
+            pointer = self._pointer
+            if (
+                pointer is not None
+                and pointer.planning_id == planning_id
+                and revision > pointer.revision
+            ):
+                self._pointer = replace(pointer, revision=revision)
+
+    def _follow(self, client: KurrentClient, position: int | None) -> None:
+        try:
+            subscription = client.subscribe_to_all(
+                commit_position=position,
+                filter_include=(PLANNING_STREAM_PREFIX,),
+                filter_by_stream_name=True,
+                filter_by_prefix=True,
+                include_caught_up=True,
+            )
+            with self._run_lock:
+                self._subscription = subscription
+            for recorded in subscription:
+                if isinstance(recorded, CaughtUp):
+                    self._caught_up = True
+                else:
+                    self._observe(recorded)
+        except Exception:
+            logger.exception("Current planning subscription failed")
+        finally:
+            self._caught_up = False
+            self._subscription = None
+
+    def _observe(self, recorded: RecordedEvent) -> None:
+        planning_id = stream_to_planning_id(recorded.stream_name)
+        if recorded.type == PlanningScheduled.type:
+            self.observe_scheduled(
+                planning_id, recorded.commit_position, recorded.stream_position
+            )
+        else:
+            self.observe_revision(planning_id, recorded.stream_position)
+        self._position = recorded.commit_position
@@ -0,0 +1,94 @@
+import threading
+import time
+from typing import Any, Iterator, cast
+from uuid import uuid4
+
+from kurrentdbclient import CaughtUp, KurrentDBClient, RecordedEvent
+
+from .current_planning import CurrentPlanningProjection, PlanningPointer
+from .planning_aggregate import PlanningScheduled, planning_id_to_stream
+
+
+def recorded(
+    planning_id: str, type: str, revision: int, position: int
+) -> RecordedEvent:
+    return RecordedEvent(
+        type=type,
+        data=b"{}",
+        metadata=b"",
+        content_type="application/json",
+        id=uuid4(),
+        stream_name=planning_id_to_stream(planning_id),
+        stream_position=revision,
+        commit_position=position,
+        prepare_position=position,
+    )
+
+
+class FakeSubscription:
+    def __init__(self, items: list[RecordedEvent]) -> None:
+        self._items = items
+        self._stopped = threading.Event()
+
+    def __iter__(self) -> Iterator[RecordedEvent]:
+        yield from self._items
+        self._stopped.wait()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+class FakeClient:
+    def __init__(self, latest: list[RecordedEvent], live: list[RecordedEvent]):
+        self.latest = latest
+        self.live = live
+        self.subscribed_from: int | None = None
+
+    def read_all(self, **kwargs: Any) -> Iterator[RecordedEvent]:
+        return iter(self.latest)
+
+    def subscribe_to_all(self, **kwargs: Any) -> FakeSubscription:
+        self.subscribed_from = kwargs["commit_position"]
+        return FakeSubscription(self.live)
+
+
+def wait_for(condition: Any) -> None:
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_follows_plannings_after_cold_start() -> None:
+    client = FakeClient(
+        latest=[recorded("a", PlanningScheduled.type, 0, 100)],
+        live=[
+            recorded("a", "PlanningStarted", 1, 110),
+            recorded("b", PlanningScheduled.type, 0, 120),
+            recorded("a", "PlanningApproved", 2, 130),
+            recorded("b", "PlanningStarted", 1, 140),
+            CaughtUp(2, 140, 140, None),
+        ],
+    )
+    projection = CurrentPlanningProjection()
+
+    projection.ensure_running(cast(KurrentDBClient, client))
+    wait_for(lambda: projection.caught_up)
+
+    assert client.subscribed_from == 100
+    assert projection.pointer == PlanningPointer("b", 120, 1)
+    projection.stop()
+    assert not projection.caught_up
+
+
+def test_own_writes_advance_the_pointer() -> None:
+    projection = CurrentPlanningProjection()
+    projection.observe_scheduled("a", 100, 0)
+    projection.observe_scheduled("b", 200)
+
+    # The subscription delivering older events later must not move it back
+    projection.observe_scheduled("a", 100, 3)
+    projection.observe_scheduled("b", 200, 0)
+    projection.observe_revision("a", 4)
+
+    assert projection.pointer == PlanningPointer("b", 200, 0)
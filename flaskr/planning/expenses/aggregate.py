@@ -1,9 +1,9 @@
 import logging
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+from typing import Any, ClassVar
 
 from flaskr.events.serialisation import event
 
-from ...events import events
 from ...events.types import Event
 from ..planning_aggregate import (
     Command,
@@ -20,6 +20,7 @@ __all__ = [
 ]
 
 
+@event("ExpenseAdded")
 @dataclass
 class ExpenseAdded(Event):
     expense: Expense
@@ -33,6 +34,12 @@ class ExpenseListCreated(Event):
     parent_planning_id: str
 
 
+@event("ExpenseListClosed")
+@dataclass
+class ExpenseListClosed(Event):
+    office: str
+
+
 @dataclass
 class AddExpenseCommand(Command):
     expense: Expense
@@ -55,11 +62,25 @@ def expense_list_stream_id(expense_id: str | None) -> str:
 
 
 class ExpenseListAggregate:
+    SNAPSHOT_VERSION: ClassVar[int] = 1
+
     def __init__(self, id: str, parent_planning_id: str):
         self.id = id
         self.parent_planning_id = parent_planning_id
         self.expenses: list[Expense] = []
         self.status: ExpensesStatus = ExpensesStatus.NOT_STARTED
+        # Revision of the last applied event, maintained by the repository
+        self.revision = -1
+
+    def to_snapshot(self) -> dict[str, Any]:
+        return {
+            "status": self.status.value,
+            "expenses": [asdict(expense) for expense in self.expenses],
+        }
+
+    def restore_snapshot(self, state: dict[str, Any]) -> None:
+        self.status = ExpensesStatus(state["status"])
+        self.expenses = [Expense(**expense) for expense in state["expenses"]]
 
     def process(self, command: Command) -> list[Event]:
         match command:
@@ -84,12 +105,16 @@ class ExpenseListAggregate:
             case _:
                 return []
 
-    def _apply(self, event: Event) -> None:
+    def apply(self, event: Event) -> None:
         match event:
+            case ExpenseAdded(expense=expense):
+                self.expenses.append(expense)
             case PlanningStartedEvent(planning_id=self.parent_planning_id):
                 self.status = ExpensesStatus.IN_PROGRESS
             case PlanningSubmittedEvent(planning_id=self.parent_planning_id):
                 self.status = ExpensesStatus.CLOSED
+            case ExpenseListClosed():
+                self.status = ExpensesStatus.CLOSED
             case ExpenseRemovedEvent(expense_id=expense_id):
                 for i in range(len(self.expenses)):
                     if self.expenses[i].id == expense_id:
@@ -98,17 +123,5 @@ class ExpenseListAggregate:
                 return
 
 
-expenses_aggregates: dict[str, ExpenseListAggregate] = {}
-
-
-def expense_list_created_listener(event: ExpenseListCreated) -> None:
-    logger.warning(f"Creating expense list aggregate for id {event.expense_list_id}")
-    aggregate = ExpenseListAggregate(event.parent_planning_id, event.expense_list_id)
-    expenses_aggregates[event.expense_list_id] = aggregate
-
-
-events().add_subscriber(expense_list_created_listener, "expense_list_created")
-
-
 def office_year_to_expense_list_id(office_id: str, year: int) -> str:
     return f"expenses-{office_id}-{year}"
@@ -0,0 +1,114 @@
+import bisect
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from typing import Literal, Mapping, Sequence
+
+__all__ = ["Classification", "ClassificationIndex", "classification_index"]
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+# Działy have 3 digit codes, rozdziały 5 digit codes starting with their dział
+Kind = Literal["dzial", "rozdzial"]
+
+
+@dataclass(frozen=True)
+class Classification:
+    code: str
+    name: str
+    kind: Kind
+
+
+class ClassificationIndex:
+    """
+    Read-only lookup over the budget classification: działy, rozdziały and
+    which rozdziały belong to which dział. Built once; the full catalogue is
+    kept serialised and gzipped so serving it costs no work per request.
+    """
+
+    def __init__(
+        self,
+        dzialy: Mapping[str, str],
+        rozdzialy: Mapping[str, str],
+        mapping: Mapping[str, Sequence[str]],
+    ) -> None:
+        self._dzialy = {
+            code: Classification(code, name, "dzial") for code, name in dzialy.items()
+        }
+        self._rozdzialy = {
+            code: Classification(code, name, "rozdzial")
+            for code, name in rozdzialy.items()
+        }
+        self._by_dzial = {
+            dzial: tuple(self._rozdzialy[code] for code in codes if code in rozdzialy)
+            for dzial, codes in mapping.items()
+        }
+        self._dzial_of = {
+            code: dzial for dzial, codes in mapping.items() for code in codes
+        }
+        # Sorted by code for prefix search
+        self._sorted = sorted(
+            [*self._dzialy.values(), *self._rozdzialy.values()],
+            key=lambda c: (c.code, c.kind),
+        )
+        self._codes = [c.code for c in self._sorted]
+
+        self.body = json.dumps(
+            {
+                "dzialy": dict(dzialy),
+                "rozdzialy": dict(rozdzialy),
+                "dzial_rozdzial_mapping": {k: list(v) for k, v in mapping.items()},
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode()
+        # mtime=0 keeps the compressed bytes, and so the ETag, reproducible
+        self.gzipped_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+
+    @classmethod
+    def load(cls, data_dir: Path = DATA_DIR) -> "ClassificationIndex":
+        def read(name: str) -> dict[str, object]:
+            with open(data_dir / name, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        return cls(
+            read("dzialy.json"),  # type: ignore[arg-type]
+            read("rozdzialy.json"),  # type: ignore[arg-type]
+            read("dzial_rozdzial_mapping.json"),  # type: ignore[arg-type]
+        )
+
+    def get(self, code: str) -> Classification | None:
+        return self._dzialy.get(code) or self._rozdzialy.get(code)
+
+    def dzialy(self) -> list[Classification]:
+        return list(self._dzialy.values())
+
+    def rozdzialy_of(self, dzial: str) -> tuple[Classification, ...]:
+        return self._by_dzial.get(dzial, ())
+
+    def dzial_of(self, rozdzial: str) -> Classification | None:
+        dzial = self._dzial_of.get(rozdzial)
+        return self._dzialy.get(dzial) if dzial is not None else None
+
+    def search(
+        self, prefix: str, kind: Kind | None = None, limit: int = 50
+    ) -> list[Classification]:
+        """
+        Classifications whose code starts with `prefix`, in code order.
+        """
+        results: list[Classification] = []
+        for i in range(bisect.bisect_left(self._codes, prefix), len(self._codes)):
+            if not self._codes[i].startswith(prefix) or len(results) >= limit:
+                break
+            if kind is None or self._sorted[i].kind == kind:
+                results.append(self._sorted[i])
+        return results
+
+
+@cache
+def classification_index() -> ClassificationIndex:
+    return ClassificationIndex.load()
@@ -0,0 +1,43 @@
+import gzip
+import json
+
+from .classifications import ClassificationIndex, classification_index
+
+
+def small_index() -> ClassificationIndex:
+    return ClassificationIndex(
+        {"010": "Rolnictwo", "020": "Leśnictwo"},
+        {"01001": "Doradztwo", "01002": "Ośrodki", "02001": "Gospodarka leśna"},
+        {"010": ["01001", "01002"], "020": ["02001"]},
+    )
+
+
+def test_lookups() -> None:
+    index = small_index()
+
+    assert index.get("010").name == "Rolnictwo"  # type: ignore[union-attr]
+    assert index.get("01002").kind == "rozdzial"  # type: ignore[union-attr]
+    assert index.get("999") is None
+    assert [c.code for c in index.rozdzialy_of("010")] == ["01001", "01002"]
+    assert index.rozdzialy_of("999") == ()
+    assert index.dzial_of("02001").code == "020"  # type: ignore[union-attr]
+
+
+def test_prefix_search() -> None:
+    index = small_index()
+
+    assert [c.code for c in index.search("01")] == ["010", "01001", "01002"]
+    assert [c.code for c in index.search("0100")] == ["01001", "01002"]
+    assert [c.code for c in index.search("", kind="dzial")] == ["010", "020"]
+    assert [c.code for c in index.search("0", limit=2)] == ["010", "01001"]
+    assert index.search("3") == []
+
+
+def test_serialised_catalogue() -> None:
+    index = classification_index()
+
+    assert classification_index() is index
+    catalogue = json.loads(gzip.decompress(index.gzipped_body))
+    assert catalogue == json.loads(index.body)
+    assert set(catalogue) == {"dzialy", "rozdzialy", "dzial_rozdzial_mapping"}
+    assert ClassificationIndex.load().etag == index.etag
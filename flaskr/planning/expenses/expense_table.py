@@ -0,0 +1,250 @@
+from array import array
+from dataclasses import dataclass, fields
+from typing import Iterator, Mapping, Sequence
+
+from ..types import Expense
+
+__all__ = [
+    "ValuePool",
+    "ExpenseTable",
+    "ExpenseColumns",
+    "INT_FIELDS",
+    "ROW_FIELDS",
+    "NULL_INT",
+    "export_columns",
+]
+
+# Stored as 64-bit integers; the rest goes through the value pool
+INT_FIELDS = (
+    "financial_needs",
+    "czesc",
+    "zrodlo_fin",
+    "budget_2025",
+    "budget_2026",
+    "budget_2027",
+    "budget_2028",
+    "budget_2029",
+)
+_VALUE_FIELDS = tuple(
+    f.name for f in fields(Expense) if f.name not in INT_FIELDS and f.name != "id"
+)
+# Order of the values in ExpenseTable.row()
+ROW_FIELDS = INT_FIELDS + _VALUE_FIELDS
+# Stands for None in integer columns
+NULL_INT = -(2**63)
+
+
+class ValuePool:
+    """
+    Keeps one copy of every distinct value and refers to it by number.
+    Expenses repeat a handful of departments, chapters and project types,
+    and expenses made from the same template share all their texts.
+    """
+
+    def __init__(self) -> None:
+        self._values: list[object] = []
+        # Keyed by type as well, so 1 and "1" stay apart
+        self._refs: dict[tuple[type, object], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def ref(self, value: object) -> int:
+        key = (type(value), value)
+        ref = self._refs.get(key)
+        if ref is None:
+            ref = len(self._values)
+            self._values.append(value)
+            self._refs[key] = ref
+        return ref
+
+    def value(self, ref: int) -> object:
+        return self._values[ref]
+
+    def values(self) -> tuple[object, ...]:
+        return tuple(self._values)
+
+
+class ExpenseTable:
+    """
+    Expenses stored column by column: integer fields in arrays, other fields
+    as 32-bit references into a ValuePool, which tables may share. Rows are
+    read back as Expense instances, created on access.
+    """
+
+    def __init__(self, pool: ValuePool | None = None) -> None:
+        self._pool = pool if pool is not None else ValuePool()
+        self._ids: list[str] = []
+        # Row of every id, rebuilt on first lookup after a removal
+        self._positions: dict[str, int] | None = {}
+        self._ints = {name: array("q") for name in INT_FIELDS}
+        self._refs = {name: array("I") for name in _VALUE_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[Expense]:
+        for i in range(len(self._ids)):
+            yield self[i]
+
+    def __getitem__(self, index: int) -> Expense:
+        values: dict[str, object] = {"id": self._ids[index]}
+        for name, column in self._ints.items():
+            value = column[index]
+            values[name] = None if value == NULL_INT else value
+        for name, column in self._refs.items():
+            values[name] = self._pool.value(column[index])
+        return Expense(**values)  # type: ignore[arg-type]
+
+    def append(self, expense: Expense) -> None:
+        # Convert everything first, so a bad value leaves the table unchanged
+        ints = [_to_int(expense, name) for name in INT_FIELDS]
+        refs = [self._pool.ref(getattr(expense, name)) for name in _VALUE_FIELDS]
+        self._append_id(expense.id)
+        for column, value in zip(self._ints.values(), ints):
+            column.append(value)
+        for column, ref in zip(self._refs.values(), refs):
+            column.append(ref)
+
+    def row(self, index: int) -> list[object]:
+        """
+        The values of a row other than its id, in ROW_FIELDS order, without
+        creating an Expense.
+        """
+        values: list[object] = []
+        for column in self._ints.values():
+            value = column[index]
+            values.append(None if value == NULL_INT else value)
+        for column in self._refs.values():
+            values.append(self._pool.value(column[index]))
+        return values
+
+    def append_row(self, expense_id: str, values: Sequence[object]) -> None:
+        """
+        Append a row given as returned by row().
+        """
+        if len(values) != len(ROW_FIELDS):
+            raise ValueError(f"Expense {expense_id} has {len(values)} values")
+        ints = [_int_value(expense_id, n, v) for n, v in zip(INT_FIELDS, values)]
+        refs = [self._pool.ref(value) for value in values[len(INT_FIELDS) :]]
+        self._append_id(expense_id)
+        for column, value in zip(self._ints.values(), ints):
+            column.append(value)
+        for column, ref in zip(self._refs.values(), refs):
+            column.append(ref)
+
+    def id(self, index: int) -> str:
+        return self._ids[index]
+
+    def position(self, expense_id: str) -> int | None:
+        """
+        Index of the row of an expense, None if the table does not have it.
+        """
+        if self._positions is None:
+            self._positions = {id: i for i, id in enumerate(self._ids)}
+        return self._positions.get(expense_id)
+
+    def remove(self, expense_id: str) -> bool:
+        index = self.position(expense_id)
+        if index is None:
+            return False
+        del self._ids[index]
+        for column in (*self._ints.values(), *self._refs.values()):
+            del column[index]
+        self._positions = None
+        return True
+
+    def copy(self) -> "ExpenseTable":
+        """
+        A copy sharing the pool, with the columns copied as arrays, to read
+        from while this table changes.
+        """
+        table = ExpenseTable(self._pool)
+        table._ids = list(self._ids)
+        table._positions = None
+        table._ints = {name: array("q", column) for name, column in self._ints.items()}
+        table._refs = {name: array("I", column) for name, column in self._refs.items()}
+        return table
+
+    def _append_id(self, expense_id: str) -> None:
+        if self._positions is not None:
+            self._positions.setdefault(expense_id, len(self._ids))
+        self._ids.append(expense_id)
+
+    def int_column(self, name: str) -> "array[int]":
+        """
+        The raw column of an integer field, with missing values as -2**63.
+        """
+        return self._ints[name]
+
+    def ref_column(self, name: str) -> "array[int]":
+        """
+        The raw column of a pooled field, as references into the pool.
+        """
+        return self._refs[name]
+
+    @property
+    def pool(self) -> ValuePool:
+        return self._pool
+
+    def column(self, name: str) -> list[object]:
+        if name == "id":
+            return list(self._ids)
+        if name in self._ints:
+            return [None if v == NULL_INT else v for v in self._ints[name]]
+        return [self._pool.value(ref) for ref in self._refs[name]]
+
+
+@dataclass(frozen=True)
+class ExpenseColumns:
+    """
+    Copies of some columns of several tables sharing a pool, one after the
+    other, for bulk processing.
+    """
+
+    # Key of every table, and how many rows it contributed
+    tables: tuple[str, ...]
+    lengths: tuple[int, ...]
+    ints: Mapping[str, "array[int]"]
+    refs: Mapping[str, "array[int]"]
+    # Pool values by reference
+    values: tuple[object, ...]
+
+
+def export_columns(
+    tables: Mapping[str, ExpenseTable],
+    int_fields: Sequence[str],
+    ref_fields: Sequence[str],
+    pool: ValuePool,
+) -> ExpenseColumns:
+    """
+    Copy columns out of tables that all use `pool`. Copying an array is a
+    memcpy, so this is cheap even for many rows.
+    """
+    ints = {name: array("q") for name in int_fields}
+    refs = {name: array("I") for name in ref_fields}
+    for table in tables.values():
+        assert table.pool is pool
+        for name, column in ints.items():
+            column.extend(table.int_column(name))
+        for name, column in refs.items():
+            column.extend(table.ref_column(name))
+    return ExpenseColumns(
+        tuple(tables),
+        tuple(len(table) for table in tables.values()),
+        ints,
+        refs,
+        pool.values(),
+    )
+
+
+def _to_int(expense: Expense, name: str) -> int:
+    return _int_value(expense.id, name, getattr(expense, name))
+
+
+def _int_value(expense_id: str, name: str, value: object) -> int:
+    if value is None:
+        return NULL_INT
+    if not isinstance(value, int) or isinstance(value, bool) or value == NULL_INT:
+        raise ValueError(f"Expense {expense_id} has a non integer {name}: {value!r}")
+    return value
@@ -0,0 +1,74 @@
+import pytest
+
+from ..types import Expense
+from .expense_table import ExpenseTable, ValuePool
+
+
+def expense(id: str, **kwargs: object) -> Expense:
+    values: dict[str, object] = {
+        "chapter": 75001,
+        "task_name": "task",
+        "financial_needs": 10,
+        "role": "office",
+        **kwargs,
+    }
+    return Expense(id=id, **values)  # type: ignore[arg-type]
+
+
+def test_rows_round_trip() -> None:
+    table = ExpenseTable()
+    first = expense("a", budget_2025=5, departament="DB", uwagi=None)
+    second = expense("b", chapter="75002", czesc=None, zrodlo_fin=0)
+    table.append(first)
+    table.append(second)
+
+    assert len(table) == 2
+    assert list(table) == [first, second]
+    assert table[1].chapter == "75002"
+    assert table.column("budget_2025") == [5, None]
+    assert table.column("chapter") == [75001, "75002"]
+    assert table.int_column("financial_needs").tolist() == [10, 10]
+
+
+def test_row_values_round_trip() -> None:
+    table = ExpenseTable()
+    table.append(expense("a", budget_2025=5, departament="DB"))
+    copy = ExpenseTable()
+
+    copy.append_row("a", table.row(0))
+
+    assert list(copy) == list(table)
+    with pytest.raises(ValueError):
+        copy.append_row("b", table.row(0)[1:])
+    with pytest.raises(ValueError):
+        copy.append_row("b", ["10", *table.row(0)[1:]])
+    assert len(copy) == 1
+
+
+def test_remove() -> None:
+    table = ExpenseTable()
+    for id in "abc":
+        table.append(expense(id))
+
+    assert table.remove("b")
+    assert not table.remove("missing")
+    assert [e.id for e in table] == ["a", "c"]
+
+
+def test_tables_share_values() -> None:
+    pool = ValuePool()
+    first, second = ExpenseTable(pool), ExpenseTable(pool)
+    first.append(expense("a", departament="DB", opis_projektu="opis"))
+    size = len(pool)
+    second.append(expense("b", departament="DB", opis_projektu="opis"))
+
+    assert len(pool) == size
+
+
+def test_rejects_non_integer_budget() -> None:
+    table = ExpenseTable()
+
+    with pytest.raises(ValueError):
+        table.append(expense("a", budget_2026="100"))
+    assert len(table) == 0
+    assert all(len(table.column(name)) == 0 for name in ("id", "budget_2025", "bz"))
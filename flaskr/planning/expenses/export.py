@@ -0,0 +1,76 @@
+"""
+Expenses written out as CSV, JSON Lines or XLSX, one row at a time.
+openpyxl, needed for XLSX, is an optional dependency (the `export` extra).
+"""
+
+import csv
+import io
+import json
+from dataclasses import astuple, fields
+from typing import IO, Iterable, Iterator
+
+from ..types import Expense
+
+__all__ = ["EXPORT_FIELDS", "csv_chunks", "jsonl_chunks", "write_xlsx"]
+
+# Every field of Expense, in definition order
+EXPORT_FIELDS = tuple(f.name for f in fields(Expense))
+
+# Rows per chunk of a streamed export
+CHUNK_ROWS = 500
+
+
+def csv_chunks(expenses: Iterable[Expense]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for i, expense in enumerate(expenses, 1):
+        # csv writes None as an empty field
+        writer.writerow(astuple(expense))
+        if i % CHUNK_ROWS == 0:
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+
+def jsonl_chunks(expenses: Iterable[Expense]) -> Iterator[str]:
+    lines: list[str] = []
+    for expense in expenses:
+        row = dict(zip(EXPORT_FIELDS, astuple(expense)))
+        lines.append(json.dumps(row, ensure_ascii=False) + "\n")
+        if len(lines) == CHUNK_ROWS:
+            yield "".join(lines)
+            lines.clear()
+    yield "".join(lines)
+
+
+def write_xlsx(expenses: Iterable[Expense], file: IO[bytes]) -> None:
+    """
+    Write a workbook in openpyxl's write-only mode, which keeps rows in a
+    temporary file rather than in memory. Control characters XLSX cannot
+    hold are left out of text. Raises ImportError without openpyxl.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Wydatki")
+    sheet.append(EXPORT_FIELDS)
+    for expense in expenses:
+        sheet.append(
+            [
+                (
+                    ILLEGAL_CHARACTERS_RE.sub("", value)
+                    if isinstance(value, str)
+                    else value
+                )
+                for value in astuple(expense)
+            ]
+        )
+    workbook.save(file)
+
+
+def _drain(buffer: io.StringIO) -> str:
+    chunk = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return chunk
@@ -0,0 +1,58 @@
+import csv
+import io
+import json
+
+import pytest
+
+from ..types import Expense
+from .export import EXPORT_FIELDS, csv_chunks, jsonl_chunks, write_xlsx
+
+EXPENSES = [
+    Expense("a", "75001", 'Zadanie, "pierwsze"', 10, "Jednostka A", budget_2025=5),
+    Expense("b", 1001, "Drugie", 0, "Jednostka B", uwagi="zażółć\ngęślą"),
+]
+
+
+def test_csv_has_every_field() -> None:
+    rows = list(csv.DictReader(io.StringIO("".join(csv_chunks(EXPENSES)))))
+
+    assert list(rows[0]) == list(EXPORT_FIELDS)
+    assert rows[0]["task_name"] == 'Zadanie, "pierwsze"'
+    assert rows[0]["budget_2025"] == "5"
+    assert rows[0]["uwagi"] == ""
+    assert rows[1]["uwagi"] == "zażółć\ngęślą"
+
+
+def test_jsonl_keeps_types() -> None:
+    lines = "".join(jsonl_chunks(EXPENSES)).splitlines()
+
+    assert [Expense(**json.loads(line)) for line in lines] == EXPENSES
+
+
+def test_chunks_are_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("flaskr.planning.expenses.export.CHUNK_ROWS", 1)
+
+    assert len(list(csv_chunks(EXPENSES))) == 3
+    assert len(list(jsonl_chunks(EXPENSES))) == 3
+
+
+def test_xlsx() -> None:
+    openpyxl = pytest.importorskip("openpyxl")
+    file = io.BytesIO()
+    write_xlsx(EXPENSES, file)
+
+    sheet = openpyxl.load_workbook(file, read_only=True)["Wydatki"]
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0] == EXPORT_FIELDS
+    assert rows[2][:4] == ("b", 1001, "Drugie", 0)
+    assert len(rows) == 3
+
+
+def test_xlsx_leaves_out_illegal_characters() -> None:
+    openpyxl = pytest.importorskip("openpyxl")
+    file = io.BytesIO()
+    write_xlsx([Expense("c", 1, "Trzecie\x07", 1, "Jednostka A")], file)
+
+    sheet = openpyxl.load_workbook(file, read_only=True)["Wydatki"]
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[1][2] == "Trzecie"
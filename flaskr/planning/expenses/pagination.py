@@ -0,0 +1,168 @@
+import base64
+import json
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from itertools import chain, islice
+
+from ..types import Expense
+from .expense_table import INT_FIELDS, NULL_INT, ExpenseTable
+
+__all__ = [
+    "SORT_FIELDS",
+    "SortKey",
+    "ExpensePage",
+    "SortIndex",
+    "decode_cursor",
+    "page_expenses",
+]
+
+# Columns of the office details table, in order
+SORT_FIELDS = (
+    "chapter",
+    "departament",
+    "task_name",
+    "opis_projektu",
+    "termin_realizacji",
+    "budget_2025",
+    "budget_2026",
+    "budget_2027",
+    "budget_2028",
+    "budget_2029",
+    "nr_umowy",
+    "z_kim_zawarta",
+)
+
+# (rank, value, expense id), rank 1 for a missing value
+SortKey = tuple[int, int | str, str]
+
+
+@dataclass(frozen=True)
+class ExpensePage:
+    expenses: list[Expense]
+    # Continues after the last expense; None on the last page
+    next_cursor: str | None
+
+
+class SortIndex:
+    """
+    Sort keys of the rows of a table, kept in order for every field pages
+    were asked for, so a page is a bisection to the cursor plus `limit`
+    rows. The keys of a field are sorted on its first page, then kept up to
+    date through add() and remove() as the table changes.
+    """
+
+    def __init__(self, table: ExpenseTable) -> None:
+        self._table = table
+        self._keys: dict[str, list[SortKey]] = {}
+
+    def add(self, index: int) -> None:
+        """
+        Call after appending the row at `index` to the table.
+        """
+        for sort, keys in self._keys.items():
+            insort(keys, _sort_key(self._table, sort, index))
+
+    def remove(self, index: int) -> None:
+        """
+        Call before removing the row at `index` from the table.
+        """
+        for sort, keys in self._keys.items():
+            del keys[bisect_left(keys, _sort_key(self._table, sort, index))]
+
+    def page(
+        self,
+        sort: str,
+        descending: bool = False,
+        after: SortKey | None = None,
+        limit: int = 50,
+    ) -> ExpensePage:
+        """
+        One page of the table ordered by `sort`, then by id, with missing
+        values last in either direction. `after` is the key of the last
+        expense of the previous page, so pages stay consistent while
+        expenses are added or removed in between. Only the rows on the page
+        are turned into Expense instances.
+        """
+        keys = self._sorted(sort)
+        if descending:
+            # Present values largest first, then missing ones
+            missing = bisect_left(keys, (1, "", ""))
+            start = len(keys) if after is None else bisect_left(keys, after)
+            if after is not None and after[0] == 1:
+                rows = range(start - 1, missing - 1, -1)
+            else:
+                rows = chain(
+                    range(min(start, missing) - 1, -1, -1),
+                    range(len(keys) - 1, missing - 1, -1),
+                )
+        else:
+            rows = range(0 if after is None else bisect_right(keys, after), len(keys))
+        page = [keys[i] for i in islice(rows, limit + 1)]
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = _encode_cursor(page[-1])
+        expenses: list[Expense] = []
+        for _, _, id in page:
+            index = self._table.position(id)
+            assert index is not None
+            expenses.append(self._table[index])
+        return ExpensePage(expenses, next_cursor)
+
+    def _sorted(self, sort: str) -> list[SortKey]:
+        keys = self._keys.get(sort)
+        if keys is None:
+            if sort not in SORT_FIELDS:
+                raise ValueError(f"Cannot sort expenses by {sort}")
+            keys = self._keys[sort] = sorted(
+                _sort_key(self._table, sort, i) for i in range(len(self._table))
+            )
+        return keys
+
+
+def page_expenses(
+    table: ExpenseTable,
+    sort: str,
+    descending: bool = False,
+    after: SortKey | None = None,
+    limit: int = 50,
+) -> ExpensePage:
+    """
+    A single page of a table without an index kept for it, see
+    SortIndex.page.
+    """
+    return SortIndex(table).page(sort, descending, after, limit)
+
+
+def decode_cursor(sort: str, cursor: str) -> SortKey:
+    """
+    Parse a cursor made for ordering by `sort`. Raises ValueError when it is
+    malformed or belongs to another ordering.
+    """
+    try:
+        rank, value, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+    value_type = int if sort in INT_FIELDS else str
+    if (
+        rank not in (0, 1)
+        or not isinstance(id, str)
+        or type(value) is not (value_type if rank == 0 else str)
+    ):
+        raise ValueError(f"Invalid cursor for {sort}: {cursor!r}")
+    return rank, value, id
+
+
+def _encode_cursor(key: SortKey) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _sort_key(table: ExpenseTable, sort: str, index: int) -> SortKey:
+    id = table.id(index)
+    if sort in INT_FIELDS:
+        value = table.int_column(sort)[index]
+        return (1, "", id) if value == NULL_INT else (0, value, id)
+    value = table.pool.value(table.ref_column(sort)[index])
+    # Chapters may be numbers or strings, compare them as text
+    return (1, "", id) if value is None else (0, str(value), id)
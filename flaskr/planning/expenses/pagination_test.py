@@ -0,0 +1,123 @@
+import random
+
+import pytest
+
+from ..types import Expense
+from .expense_table import ExpenseTable
+from .pagination import SortIndex, decode_cursor, page_expenses
+
+
+def table(*budgets: int | None) -> ExpenseTable:
+    table = ExpenseTable()
+    for i, budget in enumerate(budgets):
+        table.append(
+            Expense(f"e{i}", "75001", f"task {i}", 0, "office", budget_2025=budget)
+        )
+    return table
+
+
+def all_pages(
+    table: ExpenseTable,
+    sort: str,
+    descending: bool = False,
+    index: SortIndex | None = None,
+) -> list[str]:
+    ids: list[str] = []
+    after = None
+    while True:
+        if index is None:
+            page = page_expenses(table, sort, descending, after, limit=2)
+        else:
+            page = index.page(sort, descending, after, limit=2)
+        ids += [e.id for e in page.expenses]
+        if page.next_cursor is None:
+            return ids
+        after = decode_cursor(sort, page.next_cursor)
+
+
+def test_pages_in_sort_order_with_missing_values_last() -> None:
+    expenses = table(30, None, 10, 30, 20)
+
+    assert all_pages(expenses, "budget_2025") == ["e2", "e4", "e0", "e3", "e1"]
+    assert all_pages(expenses, "budget_2025", descending=True) == [
+        "e3",
+        "e0",
+        "e4",
+        "e2",
+        "e1",
+    ]
+    assert all_pages(expenses, "task_name") == ["e0", "e1", "e2", "e3", "e4"]
+
+
+def test_missing_values_last_when_descending_across_pages() -> None:
+    expenses = table(None, 5, None, 7, None)
+
+    # Pages of two put a cursor on a present and on a missing value
+    assert all_pages(expenses, "budget_2025", descending=True) == [
+        "e3",
+        "e1",
+        "e4",
+        "e2",
+        "e0",
+    ]
+
+
+def test_keyset_survives_changes_between_pages() -> None:
+    expenses = table(10, 20, 30, 40)
+    first = page_expenses(expenses, "budget_2025", limit=2)
+    assert first.next_cursor is not None
+
+    # Removing a row of the first page does not shift the second one
+    expenses.remove("e0")
+    second = page_expenses(
+        expenses, "budget_2025", after=decode_cursor("budget_2025", first.next_cursor)
+    )
+    assert [e.id for e in second.expenses] == ["e2", "e3"]
+    assert second.next_cursor is None
+
+
+def test_rejects_foreign_cursors() -> None:
+    cursor = page_expenses(table(1, 2), "budget_2025", limit=1).next_cursor
+    assert cursor is not None
+
+    with pytest.raises(ValueError):
+        decode_cursor("task_name", cursor)
+    with pytest.raises(ValueError):
+        decode_cursor("budget_2025", "not a cursor")
+    with pytest.raises(ValueError):
+        page_expenses(table(), "id")
+
+
+def test_index_follows_changes_to_the_table() -> None:
+    rng = random.Random(7)
+    expenses = table()
+    index = SortIndex(expenses)
+    # Built before the changes, so they go through add() and remove()
+    assert index.page("budget_2025").expenses == []
+    assert index.page("chapter", descending=True).expenses == []
+    assert index.page("departament").expenses == []
+    for i in range(200):
+        budget = rng.choice([None, *range(10)])
+        departament = rng.choice([None, "DB", "DI"])
+        expenses.append(
+            Expense(
+                f"e{i}",
+                rng.choice([75001, "75002"]),
+                "task",
+                0,
+                "office",
+                departament=departament,
+                budget_2025=budget,
+            )
+        )
+        index.add(len(expenses) - 1)
+        if rng.random() < 0.3:
+            row = rng.randrange(len(expenses))
+            index.remove(row)
+            expenses.remove(expenses.id(row))
+
+    for sort in ("budget_2025", "chapter", "departament"):
+        for descending in (False, True):
+            assert all_pages(expenses, sort, descending, index) == all_pages(
+                expenses, sort, descending
+            )
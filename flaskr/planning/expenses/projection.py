@@ -0,0 +1,188 @@
+import threading
+from typing import Any, ClassVar, Iterable, Iterator, Sequence
+
+from flaskr.constants import OFFICES
+from flaskr.events import get_projection
+from flaskr.events.projections import Projection
+from flaskr.events.types import Event
+
+from ..planning_aggregate import (
+    PlanningScheduled,
+    PlanningStartedEvent,
+    PlanningSubmittedEvent,
+)
+from ..types import Expense
+from .aggregate import ExpenseAdded, ExpenseListClosed, ExpenseRemovedEvent
+from .expense_table import (
+    NULL_INT,
+    ExpenseColumns,
+    ExpenseTable,
+    ValuePool,
+    export_columns,
+)
+from .pagination import ExpensePage, SortIndex, SortKey, page_expenses
+
+__all__ = ["ExpensesProjection", "expenses_projection"]
+
+
+class ExpensesProjection(Projection):
+    """
+    Expenses of every office in the current planning, and whether the office
+    has closed its list. Expenses are saved as rows keyed by their id, with
+    the office followed by the values of ExpenseTable.row().
+    """
+
+    name: ClassVar[str] = "expenses"
+    VERSION: ClassVar[int] = 2
+    event_types: ClassVar[tuple[type[Event], ...]] = (
+        PlanningScheduled,
+        PlanningStartedEvent,
+        PlanningSubmittedEvent,
+        ExpenseAdded,
+        ExpenseRemovedEvent,
+        ExpenseListClosed,
+    )
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._expenses: dict[str, ExpenseTable] = {}
+        # Sort orders of every office's expenses, for paging
+        self._sort_indexes: dict[str, SortIndex] = {}
+        self._closed: dict[str, bool] = {}
+        # Rows changed since take_rows(), None for removed expenses
+        self._changes: dict[str, Any] = {}
+        self.reset()
+
+    def expenses(self, office: str) -> list[Expense]:
+        with self._lock:
+            table = self._expenses.get(office)
+            return list(table) if table is not None else []
+
+    def iter_expenses(self, office: str) -> Iterator[Expense]:
+        """
+        Expenses of the office as they are now, created one at a time while
+        iterating.
+        """
+        with self._lock:
+            table = self._expenses.get(office)
+            snapshot = table.copy() if table is not None else None
+        return iter(snapshot if snapshot is not None else ())
+
+    def total_needs(self, office: str) -> int:
+        with self._lock:
+            table = self._expenses.get(office)
+            if table is None:
+                return 0
+            return sum(v for v in table.int_column("financial_needs") if v != NULL_INT)
+
+    def page(
+        self,
+        office: str,
+        sort: str,
+        descending: bool = False,
+        after: SortKey | None = None,
+        limit: int = 50,
+    ) -> ExpensePage:
+        with self._lock:
+            index = self._sort_indexes.get(office)
+            if index is None:
+                return page_expenses(
+                    ExpenseTable(self._pool), sort, descending, after, limit
+                )
+            return index.page(sort, descending, after, limit)
+
+    def count(self, office: str) -> int:
+        with self._lock:
+            table = self._expenses.get(office)
+            return len(table) if table is not None else 0
+
+    def export_columns(
+        self, int_fields: Sequence[str], ref_fields: Sequence[str]
+    ) -> ExpenseColumns:
+        """
+        Copies of the given columns of all offices, for bulk processing.
+        """
+        with self._lock:
+            return export_columns(self._expenses, int_fields, ref_fields, self._pool)
+
+    def is_closed(self, office: str) -> bool:
+        with self._lock:
+            return self._closed.get(office, False)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reset()
+            self._changes = {}
+
+    def apply(self, event: Event) -> None:
+        with self._lock:
+            match event:
+                case PlanningScheduled():
+                    for table in self._expenses.values():
+                        for expense_id in table.column("id"):
+                            self._changes[str(expense_id)] = None
+                    self._reset()
+                case PlanningStartedEvent():
+                    # Reset office approvals
+                    for office in self._closed:
+                        self._closed[office] = False
+                case PlanningSubmittedEvent():
+                    for office in self._closed:
+                        self._closed[office] = True
+                case ExpenseAdded(expense=expense):
+                    table = self._table(expense.role)
+                    table.append(expense)
+                    self._sort_indexes[expense.role].add(len(table) - 1)
+                    self._changes[expense.id] = [expense.role, *table.row(-1)]
+                case ExpenseRemovedEvent(expense_id=expense_id):
+                    for office, table in self._expenses.items():
+                        index = table.position(expense_id)
+                        if index is not None:
+                            self._sort_indexes[office].remove(index)
+                            table.remove(expense_id)
+                            self._changes[expense_id] = None
+                            break
+                case ExpenseListClosed(office=office):
+                    self._closed[office] = True
+                case _:
+                    return
+
+    def to_state(self) -> dict[str, Any]:
+        with self._lock:
+            return {"closed": dict(self._closed)}
+
+    def restore_state(self, state: dict[str, Any]) -> None:
+        with self._lock:
+            self._reset()
+            self._changes = {}
+            self._closed.update(state["closed"])
+
+    def take_rows(self) -> dict[str, Any]:
+        with self._lock:
+            changes, self._changes = self._changes, {}
+            return changes
+
+    def restore_rows(self, rows: Iterable[tuple[str, Any]]) -> None:
+        with self._lock:
+            for expense_id, (office, *values) in rows:
+                self._table(office).append_row(expense_id, values)
+
+    def _reset(self) -> None:
+        # Offices share their pool, they use the same templates and codes
+        self._pool = ValuePool()
+        self._expenses = {}
+        self._sort_indexes = {}
+        for office in OFFICES:
+            self._table(office)
+        self._closed = {office: False for office in OFFICES}
+
+    def _table(self, office: str) -> ExpenseTable:
+        table = self._expenses.get(office)
+        if table is None:
+            table = self._expenses[office] = ExpenseTable(self._pool)
+            self._sort_indexes[office] = SortIndex(table)
+        return table
+
+
+def expenses_projection(commit_position: int | None = None) -> ExpensesProjection:
+    return get_projection(ExpensesProjection, commit_position)
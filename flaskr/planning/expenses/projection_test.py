@@ -0,0 +1,90 @@
+import json
+
+from flaskr.constants import OFFICES
+
+from ..planning_aggregate import (
+    PlanningScheduled,
+    PlanningStartedEvent,
+    PlanningSubmittedEvent,
+)
+from ..types import Expense
+from .aggregate import ExpenseAdded, ExpenseListClosed, ExpenseRemovedEvent
+from .projection import ExpensesProjection
+
+OFFICE = OFFICES[0]
+
+
+def expense(id: str) -> Expense:
+    return Expense(id, "75001", f"task {id}", 100, OFFICE, budget_2026=100)
+
+
+def test_tracks_expenses_and_closed_lists() -> None:
+    projection = ExpensesProjection()
+    projection.apply(PlanningScheduled("Planning:p", "p", 2025, OFFICES))
+    projection.apply(PlanningStartedEvent("Planning:p", "2025-12-31"))
+    projection.apply(ExpenseAdded(f"expenses-{OFFICE}", expense("a")))
+    projection.apply(ExpenseAdded(f"expenses-{OFFICE}", expense("b")))
+    projection.apply(ExpenseRemovedEvent(f"expenses-{OFFICE}", "a"))
+    projection.apply(ExpenseListClosed(f"expenses-{OFFICE}", OFFICE))
+
+    assert [e.id for e in projection.expenses(OFFICE)] == ["b"]
+    assert projection.is_closed(OFFICE)
+    assert not projection.is_closed(OFFICES[1])
+
+    projection.apply(PlanningSubmittedEvent("Planning:p"))
+    assert all(projection.is_closed(office) for office in OFFICES)
+
+    # A new planning starts from empty lists
+    projection.apply(PlanningScheduled("Planning:q", "q", 2026, OFFICES))
+    assert projection.expenses(OFFICE) == []
+    assert not projection.is_closed(OFFICE)
+
+
+def test_state_round_trip() -> None:
+    projection = ExpensesProjection()
+    for id in ("a", "b", "c"):
+        projection.apply(ExpenseAdded(f"expenses-{OFFICE}", expense(id)))
+    projection.apply(ExpenseListClosed(f"expenses-{OFFICE}", OFFICE))
+    projection.apply(ExpenseRemovedEvent(f"expenses-{OFFICE}", "b"))
+
+    # As saved and loaded by the projection store
+    rows = json.loads(json.dumps(projection.take_rows()))
+    restored = ExpensesProjection()
+    restored.restore_state(json.loads(json.dumps(projection.to_state())))
+    restored.restore_rows((id, row) for id, row in rows.items() if row is not None)
+
+    assert restored.expenses(OFFICE) == [expense("a"), expense("c")]
+    assert restored.is_closed(OFFICE)
+
+
+def test_takes_only_changed_rows() -> None:
+    projection = ExpensesProjection()
+    projection.apply(ExpenseAdded(f"expenses-{OFFICE}", expense("a")))
+    assert list(projection.take_rows()) == ["a"]
+
+    projection.apply(ExpenseAdded(f"expenses-{OFFICE}", expense("b")))
+    projection.apply(ExpenseRemovedEvent(f"expenses-{OFFICE}", "a"))
+    rows = projection.take_rows()
+    assert rows["a"] is None and rows["b"][0] == OFFICE
+
+    projection.apply(PlanningScheduled("Planning:q", "q", 2026, OFFICES))
+    assert projection.take_rows() == {"b": None}
+    assert projection.take_rows() == {}
+
+
+def test_pages_follow_added_and_removed_expenses() -> None:
+    projection = ExpensesProjection()
+    for id in ("b", "a", "c"):
+        projection.apply(ExpenseAdded(f"expenses-{OFFICE}", expense(id)))
+    assert [e.id for e in projection.page(OFFICE, "task_name").expenses] == [
+        "a",
+        "b",
+        "c",
+    ]
+
+    projection.apply(ExpenseRemovedEvent(f"expenses-{OFFICE}", "a"))
+    projection.apply(ExpenseAdded(f"expenses-{OFFICE}", expense("d")))
+
+    page = projection.page(OFFICE, "task_name", descending=True, limit=2)
+    assert [e.id for e in page.expenses] == ["d", "c"]
+    assert projection.page(OFFICES[1], "task_name").expenses == []
@@ -0,0 +1,76 @@
+import copy
+import json
+import random
+from dataclasses import fields
+from functools import cache
+from pathlib import Path
+from typing import Any, Sequence
+from uuid import uuid4
+
+from ..types import Expense
+
+__all__ = ["ExpenseTemplatePool", "expense_template_pool"]
+
+TEMPLATES_PATH = (
+    Path(__file__).parent.parent.parent / "data" / "expenses_template.jsonl"
+)
+
+_FIELDS = {f.name for f in fields(Expense)}
+
+
+class ExpenseTemplatePool:
+    """
+    Prototype expenses parsed once from the template file. The prototypes
+    are never handed out; every expense produced is a copy with its own id
+    and role.
+    """
+
+    def __init__(self, prototypes: Sequence[Expense]) -> None:
+        self._prototypes = tuple(prototypes)
+
+    @classmethod
+    def load(cls, path: Path = TEMPLATES_PATH) -> "ExpenseTemplatePool":
+        # One template per line, as written by scripts/convert_expenses.py
+        with open(path, "r", encoding="utf-8") as f:
+            return cls([_prototype(json.loads(line)) for line in f if line.strip()])
+
+    def __len__(self) -> int:
+        return len(self._prototypes)
+
+    def sample(
+        self, role: str, n: int, rng: random.Random | None = None
+    ) -> list[Expense]:
+        """
+        n distinct templates (all of them if there are fewer) for the role.
+        """
+        indices = (rng or random).sample(range(len(self)), min(n, len(self)))
+        return [self._clone(i, role) for i in indices]
+
+    def generate(
+        self, role: str, n: int, rng: random.Random | None = None
+    ) -> list[Expense]:
+        """
+        n expenses for the role drawn with replacement, so n may exceed the
+        number of templates. Meant for load testing.
+        """
+        indices = (rng or random).choices(range(len(self)), k=n)
+        return [self._clone(i, role) for i in indices]
+
+    def _clone(self, index: int, role: str) -> Expense:
+        # A shallow copy is enough, all fields are immutable values; it
+        # skips the __init__ call dataclasses.replace would make
+        expense = copy.copy(self._prototypes[index])
+        expense.id = str(uuid4())
+        expense.role = role
+        return expense
+
+
+def _prototype(template: dict[str, Any]) -> Expense:
+    return Expense(
+        id="", role="", **{k: v for k, v in template.items() if k in _FIELDS}
+    )
+
+
+@cache
+def expense_template_pool() -> ExpenseTemplatePool:
+    return ExpenseTemplatePool.load()
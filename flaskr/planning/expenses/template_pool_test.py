@@ -0,0 +1,43 @@
+import random
+
+from ..types import Expense
+from .template_pool import ExpenseTemplatePool, expense_template_pool
+
+
+def pool() -> ExpenseTemplatePool:
+    return ExpenseTemplatePool(
+        [Expense("", str(i), f"task {i}", i, "", budget_2026=i) for i in range(5)]
+    )
+
+
+def test_sample_clones_distinct_templates() -> None:
+    expenses = pool().sample("office", 3, random.Random(1))
+
+    assert len({e.task_name for e in expenses}) == 3
+    assert len({e.id for e in expenses}) == 3
+    assert all(e.role == "office" and e.id for e in expenses)
+    assert len(pool().sample("office", 10)) == 5
+
+
+def test_clones_do_not_share_state() -> None:
+    templates = ExpenseTemplatePool([Expense("", "75001", "task", 1, "")])
+    first, second = templates.generate("office", 2)
+    first.task_name = "changed"
+
+    assert second.task_name == "task"
+    assert templates.sample("office", 1)[0].task_name == "task"
+
+
+def test_generate_draws_with_replacement() -> None:
+    expenses = pool().generate("office", 1000)
+
+    assert len(expenses) == 1000
+    assert len({e.id for e in expenses}) == 1000
+
+
+def test_loads_template_file_once() -> None:
+    templates = expense_template_pool()
+
+    assert templates is expense_template_pool()
+    assert len(templates) > 0
+    assert all(e.chapter and e.task_name for e in templates.sample("office", 10))
@@ -1,14 +1,16 @@
-import json
-import random
-from pathlib import Path
+import tempfile
+from dataclasses import asdict
+from typing import Iterator
 from uuid import uuid4
 
 from flask import (
     Blueprint,
+    abort,
     flash,
     redirect,
     render_template,
     request,
+    send_file,
     session,
     url_for,
 )
@@ -17,16 +19,18 @@ from werkzeug.wrappers import Response
 from flaskr.extensions import ctx
 
 from ...auth import auth_required
+from ...conditional import etag_cached, precompressed_response
 from ...constants import OFFICES, OFFICES_GENITIVE
 from ...db import Section, db
-from ..planning_aggregate import (
-    EXPENSES,
-    EXPENSES_CLOSED,
-    PlanningStatus,
-    get_planning_aggregate,
-)
+from ...streaming import render_page
+from ..planning_aggregate import PlanningStatus, get_planning_aggregate
 from ..types import Expense
+from ..versions import office_expenses_version
 from .aggregate import expense_list_stream_id
+from .classifications import classification_index
+from .export import csv_chunks, jsonl_chunks, write_xlsx
+from .projection import expenses_projection
+from .template_pool import expense_template_pool
 
 print(f"expense_stream_id function loaded: {expense_list_stream_id}")
 
@@ -37,18 +41,18 @@ expenses_bp = Blueprint("expenses", __name__)
 
 @expenses_bp.route("/")
 @auth_required
+@etag_cached(office_expenses_version)
 def list_expenses() -> str | Response:
     if "role" not in session or session["role"] not in OFFICES:
         return redirect(url_for("planning.index"))
-    current_expenses = EXPENSES[session["role"]]
-    expenses_sum = sum(e.financial_needs for e in current_expenses)
-    return render_template(
+    projection = expenses_projection()
+    return render_page(
         "expenses_list.html",
-        expenses=current_expenses,
-        closed=EXPENSES_CLOSED[session["role"]],
-        state=ctx().planning_aggregate,
+        expenses=projection.iter_expenses(session["role"]),
+        closed=projection.is_closed(session["role"]),
+        state=ctx().planning_service.get_current_planning(),
         PlanningStatus=PlanningStatus,
-        expenses_sum=expenses_sum,
+        expenses_sum=projection.total_needs(session["role"]),
         offices_genitive=OFFICES_GENITIVE,
     )
 
@@ -61,7 +65,7 @@ def add_expense() -> str | Response:
 
     # Allow editing if status is IN_PROGRESS
     can_edit = get_planning_aggregate().status == PlanningStatus.IN_PROGRESS
-    if EXPENSES_CLOSED[session["role"]] or not can_edit:
+    if expenses_projection().is_closed(session["role"]) or not can_edit:
         return redirect(url_for("planning.expenses.list_expenses"))
 
     if request.method == "POST":
@@ -104,34 +108,49 @@ def add_expense() -> str | Response:
             z_kim_zawarta=request.form.get("z_kim_zawarta") or None,
             uwagi=request.form.get("uwagi") or None,
         )
-        EXPENSES[session["role"]].append(expense)
+        expenses_projection(ctx().planning_service.add_expenses([expense]))
         return redirect(url_for("planning.expenses.list_expenses"))
     return render_template("add_expense.html")
 
 
 @expenses_bp.route("/api/classifications", methods=["GET"])
 @auth_required
-def get_classifications() -> dict[str, object]:
+def get_classifications() -> Response:
     """Get działów and rozdziałów classification data."""
-    data_dir = Path(__file__).parent.parent.parent / "data"
+    index = classification_index()
+    return precompressed_response(index.body, index.gzipped_body, index.etag)
 
-    # Load działów
-    with open(data_dir / "dzialy.json", "r", encoding="utf-8") as f:
-        dzialy = json.load(f)
 
-    # Load rozdziały
-    with open(data_dir / "rozdzialy.json", "r", encoding="utf-8") as f:
-        rozdzialy = json.load(f)
+@expenses_bp.route("/api/classifications/search", methods=["GET"])
+@auth_required
+def search_classifications() -> dict[str, object]:
+    """Działy and rozdziały whose code starts with the given prefix."""
+    kind = request.args.get("kind")
+    if kind not in (None, "dzial", "rozdzial"):
+        abort(400)
+    results = classification_index().search(
+        request.args.get("prefix", ""),
+        kind=kind,
+        limit=min(request.args.get("limit", 50, type=int), 1000),
+    )
+    return {"results": [asdict(c) for c in results]}
 
-    # Load dział-rozdział mapping
-    with open(data_dir / "dzial_rozdzial_mapping.json", "r", encoding="utf-8") as f:
-        dzial_rozdzial_mapping = json.load(f)
 
-    return {
-        "dzialy": dzialy,
-        "rozdzialy": rozdzialy,
-        "dzial_rozdzial_mapping": dzial_rozdzial_mapping,
-    }
+@expenses_bp.route("/api/classifications/<code>", methods=["GET"])
+@auth_required
+def get_classification(code: str) -> dict[str, object]:
+    """A dział with its rozdziały, or a rozdział with its dział."""
+    index = classification_index()
+    classification = index.get(code)
+    if classification is None:
+        abort(404)
+    if classification.kind == "dzial":
+        return {
+            **asdict(classification),
+            "rozdzialy": [asdict(c) for c in index.rozdzialy_of(code)],
+        }
+    dzial = index.dzial_of(code)
+    return {**asdict(classification), "dzial": asdict(dzial) if dzial else None}
 
 
 @expenses_bp.route("/fragment/section/chapter")
@@ -153,8 +172,8 @@ def close_expenses() -> str | Response:
     if not can_edit:
         return redirect(url_for("planning.expenses.list_expenses"))
 
-    if "role" in session and session["role"] in EXPENSES_CLOSED:
-        EXPENSES_CLOSED[session["role"]] = True
+    if "role" in session and session["role"] in OFFICES:
+        expenses_projection(ctx().planning_service.close_expenses(session["role"]))
     return redirect(url_for("planning.expenses.list_expenses"))
 
 
@@ -163,52 +182,64 @@ def close_expenses() -> str | Response:
 def import_data() -> str | Response:
     role = session["role"]
 
-    for e in create_expenses(role, 10):
-        EXPENSES[role].append(e)
+    expenses_projection(ctx().planning_service.add_expenses(create_expenses(role, 10)))
 
     return redirect(url_for("planning.expenses.list_expenses"))
 
 
 def create_expenses(role: str, n: int) -> list[Expense]:
-    """Load expense data from JSON file and return n random expenses."""
-    json_path = Path(__file__).parent.parent / "data" / "expenses_template.json"
+    """Return n random expenses for the role, made from the expense templates."""
+    return expense_template_pool().sample(role, n)
 
-    with open(json_path, "r", encoding="utf-8") as f:
-        expenses_data = json.load(f)
 
-    # Randomly select n expenses from the data
-    selected = random.sample(expenses_data, min(n, len(expenses_data)))
+_EXPORT_MIMETYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/jsonl",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
 
-    # Convert to Expense objects
-    return [
-        Expense(
-            id=str(uuid4()),
-            chapter=exp["chapter"],
-            task_name=exp["task_name"],
-            financial_needs=exp["financial_needs"],
-            role=role,
-            # Additional fields
-            czesc=exp.get("czesc"),
-            departament=exp.get("departament"),
-            rodzaj_projektu=exp.get("rodzaj_projektu"),
-            opis_projektu=exp.get("opis_projektu"),
-            data_zlozenia=exp.get("data_zlozenia"),
-            program_operacyjny=exp.get("program_operacyjny"),
-            termin_realizacji=exp.get("termin_realizacji"),
-            zrodlo_fin=exp.get("zrodlo_fin"),
-            bz=exp.get("bz"),
-            beneficjent=exp.get("beneficjent"),
-            szczegolowe_uzasadnienie=exp.get("szczegolowe_uzasadnienie"),
-            budget_2025=exp.get("budget_2025"),
-            budget_2026=exp.get("budget_2026"),
-            budget_2027=exp.get("budget_2027"),
-            budget_2028=exp.get("budget_2028"),
-            budget_2029=exp.get("budget_2029"),
-            etap_dzialan=exp.get("etap_dzialan"),
-            umowy=exp.get("umowy"),
-            nr_umowy=exp.get("nr_umowy"),
-            z_kim_zawarta=exp.get("z_kim_zawarta"),
-            uwagi=exp.get("uwagi"),
-        )
-        for exp in selected
-    ]
+
+@expenses_bp.route("/export.<format>")
+@auth_required
+def export_expenses(format: str) -> Response:
+    """
+    Every field of every expense of `office`, or of all offices, as CSV,
+    JSON Lines or XLSX. Rows are produced as they are sent.
+    """
+    if format not in _EXPORT_MIMETYPES:
+        abort(404)
+    office = request.args.get("office")
+    if office is not None and office not in OFFICES:
+        abort(400)
+    projection = expenses_projection()
+
+    def expenses() -> Iterator[Expense]:
+        for o in [office] if office is not None else OFFICES:
+            yield from projection.iter_expenses(o)
+
+    download_name = f"wydatki-{office or 'wszystkie'}.{format}"
+    if format == "xlsx":
+        # A workbook is a zip archive, complete only once every row is in
+        file = tempfile.TemporaryFile()
+        try:
+            write_xlsx(expenses(), file)
+            file.seek(0)
+            # The response closes the file once it has been sent
+            return send_file(
+                file,
+                mimetype=_EXPORT_MIMETYPES[format],
+                as_attachment=True,
+                download_name=download_name,
+            )
+        except ImportError:
+            file.close()
+            abort(501, "XLSX export needs openpyxl, install the export extra")
+        except BaseException:
+            # Anything else is answered with a 500 by Flask
+            file.close()
+            raise
+
+    chunks = csv_chunks(expenses()) if format == "csv" else jsonl_chunks(expenses())
+    response = Response(chunks, mimetype=_EXPORT_MIMETYPES[format])
+    response.headers.set("Content-Disposition", "attachment", filename=download_name)
+    return response
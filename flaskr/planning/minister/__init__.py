@@ -1,23 +1,27 @@
-from flask import Blueprint, redirect, render_template, request, url_for
+from flask import Blueprint, abort, redirect, request, url_for
 from werkzeug.wrappers import Response
 
+from flaskr.events import get_projections
 from flaskr.extensions import ctx
 
 from ...auth import auth_required
-from ...constants import OFFICES
+from ...conditional import etag_cached
+from ...streaming import render_page
+from ..expenses.projection import expenses_projection
+from ..office_totals import office_totals
 from ..planning_aggregate import (
-    EXPENSES,
-    EXPENSES_CLOSED,
     ApprovePlanningCommand,
     PlanningStatus,
     RequestCorrectionCommand,
 )
+from ..versions import dashboard_version
 
 minister_bp = Blueprint("minister", __name__)
 
 
 @minister_bp.route("/dashboard", methods=["GET", "POST"])
 @auth_required
+@etag_cached(dashboard_version)
 def dashboard() -> str | Response:
     if request.method == "POST":
         action = request.form.get("action")
@@ -31,30 +35,44 @@ def dashboard() -> str | Response:
             ctx().planning_service.execute(ApprovePlanningCommand("2025"))
         return redirect(url_for("planning.minister.dashboard"))
 
-    offices_status: list[dict[str, object]] = []
-    total_all_needs = 0
-    for office in OFFICES:
-        expenses = EXPENSES.get(office, [])
-        total_needs = sum(e.financial_needs for e in expenses)
-        task_count = len(expenses)
-        is_submitted = EXPENSES_CLOSED.get(office, False)
-
-        total_all_needs += total_needs
-
-        offices_status.append(
-            {
-                "name": office,
-                "status": "Submitted" if is_submitted else "Open",
-                "total_needs": total_needs,
-                "task_count": task_count,
-                "expenses": expenses,
-            }
-        )
-
-    return render_template(
+    totals = office_totals()
+    projection = expenses_projection()
+    offices_status: list[dict[str, object]] = [
+        {
+            "name": office.office,
+            "status": "Submitted" if office.submitted else "Open",
+            "total_needs": office.total_needs,
+            "task_count": office.task_count,
+            "expenses": projection.iter_expenses(office.office),
+        }
+        for office in totals.offices
+    ]
+
+    return render_page(
         "minister_dashboard.html",
-        state=ctx().planning_aggregate,
+        state=ctx().planning_service.get_current_planning(),
         offices_status=offices_status,
-        total_all_needs=total_all_needs,
+        total_all_needs=totals.total_needs,
         PlanningStatus=PlanningStatus,
     )
+
+
+@minister_bp.route("/api/budget-rollup")
+@auth_required
+@etag_cached(dashboard_version)
+def budget_rollup() -> dict[str, object]:
+    """
+    budget_2025..budget_2029 summed by office, dzial, rozdzial, departament
+    or zrodlo_fin, with each group's share and year-over-year changes.
+    """
+    try:
+        from ..analytics import budget_analytics, parse_group_by
+    except ImportError:
+        abort(501, "Budget analytics need NumPy, install the analytics extra")
+    by = parse_group_by(request.args.get("by", "office"))
+    if by is None:
+        abort(400)
+    # Position first: the analytics may be newer than it, never older
+    position = get_projections().position
+    analytics = budget_analytics(expenses_projection(), position)
+    return analytics.rollup(by).to_dict()
@@ -0,0 +1,223 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, ClassVar, Iterable
+
+from flaskr.constants import OFFICES
+from flaskr.events import get_projection
+from flaskr.events.projections import Projection
+from flaskr.events.types import Event
+
+from .expenses.aggregate import ExpenseAdded, ExpenseListClosed, ExpenseRemovedEvent
+from .planning_aggregate import (
+    PlanningScheduled,
+    PlanningStartedEvent,
+    PlanningSubmittedEvent,
+)
+from .types import Expense
+
+__all__ = [
+    "BUDGET_YEARS",
+    "OfficeTotals",
+    "DashboardTotals",
+    "OfficeTotalsProjection",
+    "office_totals",
+]
+
+BUDGET_YEARS = (2025, 2026, 2027, 2028, 2029)
+
+
+@dataclass(frozen=True)
+class OfficeTotals:
+    office: str
+    total_needs: int
+    task_count: int
+    submitted: bool
+    # Sums of budget_2025..budget_2029, in BUDGET_YEARS order
+    budgets: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class DashboardTotals:
+    # In OFFICES order
+    offices: tuple[OfficeTotals, ...]
+    total_needs: int
+    task_count: int
+    budgets: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class _Contribution:
+    office: str
+    financial_needs: int
+    budgets: tuple[int, ...]
+
+
+def _contribution(expense: Expense) -> _Contribution:
+    return _Contribution(
+        expense.role,
+        expense.financial_needs,
+        tuple(getattr(expense, f"budget_{year}") or 0 for year in BUDGET_YEARS),
+    )
+
+
+class OfficeTotalsProjection(Projection):
+    """
+    Per office totals for the dashboards, kept up to date event by event so
+    reading them never touches the expenses themselves.
+    """
+
+    name: ClassVar[str] = "office_totals"
+    VERSION: ClassVar[int] = 3
+    event_types: ClassVar[tuple[type[Event], ...]] = (
+        PlanningScheduled,
+        PlanningStartedEvent,
+        PlanningSubmittedEvent,
+        ExpenseAdded,
+        ExpenseRemovedEvent,
+        ExpenseListClosed,
+    )
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Rows changed since take_rows(), None for removed expenses
+        self._changes: dict[str, Any] = {}
+        self.reset()
+
+    def totals(self) -> DashboardTotals:
+        with self._lock:
+            if self._totals is None:
+                self._totals = self._build_totals()
+            return self._totals
+
+    def reset(self) -> None:
+        with self._lock:
+            self._reset()
+            self._changes = {}
+
+    def apply(self, event: Event) -> None:
+        with self._lock:
+            match event:
+                case PlanningScheduled():
+                    for expense_id in self._contributions:
+                        self._changes[expense_id] = None
+                    self._reset()
+                case PlanningStartedEvent():
+                    for office in self._submitted:
+                        self._submitted[office] = False
+                case PlanningSubmittedEvent():
+                    for office in self._submitted:
+                        self._submitted[office] = True
+                case ExpenseAdded(expense=expense):
+                    self._add(expense.id, _contribution(expense))
+                case ExpenseRemovedEvent(expense_id=expense_id):
+                    self._remove(expense_id)
+                case ExpenseListClosed(office=office):
+                    self._submitted[office] = True
+                case _:
+                    return
+            self._totals = None
+
+    def to_state(self) -> dict[str, Any]:
+        """
+        The per office aggregates. What removals need, the office, needs and
+        budgets of every expense, is saved in rows keyed by expense id, as
+        ExpenseRemovedEvent only carries the id.
+        """
+        with self._lock:
+            return {
+                "offices": {
+                    office: [
+                        self._needs[office],
+                        self._counts[office],
+                        self._budgets[office],
+                    ]
+                    for office in self._needs
+                },
+                "submitted": dict(self._submitted),
+            }
+
+    def restore_state(self, state: dict[str, Any]) -> None:
+        with self._lock:
+            self._reset()
+            self._changes = {}
+            for office, (needs, count, budgets) in state["offices"].items():
+                self._needs[office] = needs
+                self._counts[office] = count
+                self._budgets[office] = list(budgets)
+                self._total_needs += needs
+                self._task_count += count
+                for i, amount in enumerate(budgets):
+                    self._total_budgets[i] += amount
+            self._submitted.update(state["submitted"])
+
+    def take_rows(self) -> dict[str, Any]:
+        with self._lock:
+            changes, self._changes = self._changes, {}
+            return changes
+
+    def restore_rows(self, rows: Iterable[tuple[str, Any]]) -> None:
+        with self._lock:
+            for id, (office, financial_needs, *budgets) in rows:
+                self._contributions[id] = _Contribution(
+                    office, financial_needs, tuple(budgets)
+                )
+
+    def _reset(self) -> None:
+        self._contributions: dict[str, _Contribution] = {}
+        self._needs = {office: 0 for office in OFFICES}
+        self._counts = {office: 0 for office in OFFICES}
+        self._budgets = {office: [0] * len(BUDGET_YEARS) for office in OFFICES}
+        self._submitted = {office: False for office in OFFICES}
+        self._total_needs = 0
+        self._task_count = 0
+        self._total_budgets = [0] * len(BUDGET_YEARS)
+        # Built on first read after a change
+        self._totals: DashboardTotals | None = None
+
+    def _add(self, expense_id: str, contribution: _Contribution) -> None:
+        self._remove(expense_id)
+        self._contributions[expense_id] = contribution
+        self._changes[expense_id] = [
+            contribution.office,
+            contribution.financial_needs,
+            *contribution.budgets,
+        ]
+        self._update(contribution, 1)
+
+    def _remove(self, expense_id: str) -> None:
+        contribution = self._contributions.pop(expense_id, None)
+        if contribution is not None:
+            self._changes[expense_id] = None
+            self._update(contribution, -1)
+
+    def _update(self, contribution: _Contribution, sign: int) -> None:
+        office = contribution.office
+        self._needs[office] = (
+            self._needs.get(office, 0) + sign * contribution.financial_needs
+        )
+        self._counts[office] = self._counts.get(office, 0) + sign
+        self._total_needs += sign * contribution.financial_needs
+        self._task_count += sign
+        budgets = self._budgets.setdefault(office, [0] * len(BUDGET_YEARS))
+        for i, amount in enumerate(contribution.budgets):
+            budgets[i] += sign * amount
+            self._total_budgets[i] += sign * amount
+
+    def _build_totals(self) -> DashboardTotals:
+        offices = tuple(
+            OfficeTotals(
+                office,
+                self._needs.get(office, 0),
+                self._counts.get(office, 0),
+                self._submitted.get(office, False),
+                tuple(self._budgets.get(office, [0] * len(BUDGET_YEARS))),
+            )
+            for office in OFFICES
+        )
+        return DashboardTotals(
+            offices, self._total_needs, self._task_count, tuple(self._total_budgets)
+        )
+
+
+def office_totals(commit_position: int | None = None) -> DashboardTotals:
+    return get_projection(OfficeTotalsProjection, commit_position).totals()
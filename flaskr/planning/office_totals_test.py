@@ -0,0 +1,73 @@
+import json
+
+from flaskr.constants import OFFICES
+
+from .expenses.aggregate import ExpenseAdded, ExpenseListClosed, ExpenseRemovedEvent
+from .office_totals import OfficeTotalsProjection
+from .planning_aggregate import PlanningScheduled, PlanningSubmittedEvent
+from .types import Expense
+
+FIRST, SECOND = OFFICES[0], OFFICES[1]
+
+
+def added(
+    id: str, office: str, needs: int, budget_2027: int | None = None
+) -> ExpenseAdded:
+    return ExpenseAdded(
+        f"expenses-{office}",
+        Expense(
+            id, "75001", id, needs, office, budget_2026=needs, budget_2027=budget_2027
+        ),
+    )
+
+
+def test_totals_follow_expenses() -> None:
+    projection = OfficeTotalsProjection()
+    projection.apply(added("a", FIRST, 10, 3))
+    projection.apply(added("b", FIRST, 20))
+    projection.apply(added("c", SECOND, 5, 1))
+    projection.apply(ExpenseRemovedEvent(f"expenses-{FIRST}", "b"))
+    projection.apply(ExpenseListClosed(f"expenses-{SECOND}", SECOND))
+
+    totals = projection.totals()
+    first, second = totals.offices[0], totals.offices[1]
+    assert (first.office, first.total_needs, first.task_count) == (FIRST, 10, 1)
+    assert not first.submitted
+    assert (second.total_needs, second.task_count, second.submitted) == (5, 1, True)
+    assert totals.total_needs == 15
+    assert totals.task_count == 2
+    assert totals.budgets == (0, 15, 4, 0, 0)
+    assert len(totals.offices) == len(OFFICES)
+    # Unchanged totals are not rebuilt
+    assert projection.totals() is totals
+
+    projection.apply(PlanningSubmittedEvent("Planning:p"))
+    assert all(o.submitted for o in projection.totals().offices)
+    projection.apply(PlanningScheduled("Planning:q", "q", 2026, OFFICES))
+    assert projection.totals().total_needs == 0
+
+
+def test_state_round_trip() -> None:
+    projection = OfficeTotalsProjection()
+    projection.apply(added("a", FIRST, 10, 3))
+    projection.apply(added("b", FIRST, 1, 1))
+    projection.apply(ExpenseRemovedEvent(f"expenses-{FIRST}", "b"))
+    projection.apply(ExpenseListClosed(f"expenses-{FIRST}", FIRST))
+
+    restored = OfficeTotalsProjection()
+    state = projection.to_state()
+    rows = projection.take_rows()
+    restored.restore_state(json.loads(json.dumps(state)))
+    restored.restore_rows(
+        (id, row) for id, row in json.loads(json.dumps(rows)).items() if row
+    )
+    assert restored.totals() == projection.totals()
+    # Only the aggregates are in the state, contributions go in rows
+    assert "expenses" not in state
+    assert rows == {"a": [FIRST, 10, 0, 10, 3, 0, 0], "b": None}
+    assert projection.take_rows() == {}
+
+    # Removals still know what to subtract
+    restored.apply(ExpenseRemovedEvent(f"expenses-{FIRST}", "a"))
+    assert restored.totals().budgets == (0, 0, 0, 0, 0)
+    assert restored.take_rows() == {"a": None}
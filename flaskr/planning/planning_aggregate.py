@@ -1,71 +1,66 @@
 import logging
 from dataclasses import dataclass
+from typing import Any, ClassVar
 
-from flaskr.constants import OFFICES
 from flaskr.events.serialisation import event
 
 from ..events.types import Command, Event
-from .types import Expense, PlanningStatus
+from .types import PlanningStatus
 
 logger = logging.getLogger(__name__)
 
 __all__ = [
     "PlanningStatus",
-    "EXPENSES",
-    "EXPENSES_CLOSED",
     "PlanningAggregate",
 ]
 
-EXPENSES: dict[str, list[Expense]] = {office: [] for office in OFFICES}
-EXPENSES_CLOSED = {office: False for office in OFFICES}
 
-
-@dataclass
 @event(type="PlanningScheduled")
+@dataclass
 class PlanningScheduled(Event):
     id: str
     planning_year: int
     offices: list[str]
 
 
-@dataclass
 @event(type="PlanningStarted")
+@dataclass
 class PlanningStartedEvent(Event):
     deadline: str
 
 
-@dataclass
 @event("PlanningSubmitted")
+@dataclass
 class PlanningSubmittedEvent(Event):
     pass
 
 
-@dataclass
 @event("PlanningApproved")
+@dataclass
 class PlanningApprovedEvent(Event):
     pass
 
 
-@dataclass
 @event("InitialMinisterGuidance")
+@dataclass
 class InitialMinisterGuidanceEvent(Event):
     comment: str
 
 
-@dataclass
 @event("MinisterCorrectionRequested")
+@dataclass
 class MinisterCorrectionRequestedEvent(Event):
     comment: str
 
 
-@dataclass
 @event("PlanningReopenedEvent")
+@dataclass
 class PlanningReopenedEvent(Event):
     pass
 
 
-@dataclass
 @event("ExpenseAssigned")
+@dataclass
 class ExpenseAssignedEvent(Event):
     office_ids: list[str]
 
@@ -107,6 +102,8 @@ def stream_to_planning_id(stream_id: str) -> str:
 
 
 class PlanningAggregate:
+    SNAPSHOT_VERSION: ClassVar[int] = 1
+
     def __init__(self, id: str):
         self.id = id
         self.stream_id = planning_id_to_stream(self.id)
@@ -115,6 +112,24 @@ class PlanningAggregate:
         self.correction_comment: str | None = None
         self.planning_year: int | None = None
         self.office_expense_ids: dict[str, str] = {}
+        # Revision of the last applied event, maintained by the repository
+        self.revision = -1
+
+    def to_snapshot(self) -> dict[str, Any]:
+        return {
+            "deadline": self.deadline,
+            "status": self.status.value,
+            "correction_comment": self.correction_comment,
+            "planning_year": self.planning_year,
+            "office_expense_ids": self.office_expense_ids,
+        }
+
+    def restore_snapshot(self, state: dict[str, Any]) -> None:
+        self.deadline = state["deadline"]
+        self.status = PlanningStatus(state["status"])
+        self.correction_comment = state["correction_comment"]
+        self.planning_year = state["planning_year"]
+        self.office_expense_ids = dict(state["office_expense_ids"])
 
     def process(self, command: Command) -> list[Event]:
         match command:
@@ -206,16 +221,8 @@ class PlanningAggregate:
         self.deadline = event.deadline
         self.status = PlanningStatus.IN_PROGRESS
 
-        # Side effect: Reset office approvals - shouls be refactored?
-        for office in EXPENSES_CLOSED:
-            EXPENSES_CLOSED[office] = False
-
     def _handle_submitted_to_minister(self, _: PlanningSubmittedEvent) -> None:
         self.status = PlanningStatus.IN_REVIEW
-        # Side effect: Reset office approvals
-
-        for office in EXPENSES_CLOSED:
-            EXPENSES_CLOSED[office] = True
 
     def _handle_initial_minister_guidance(
         self, event: InitialMinisterGuidanceEvent
@@ -1,45 +1,356 @@
-from typing import Optional
+import copy
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Optional, TypeVar
 
-from kurrentdbclient import NewEvent, StreamState
+from kurrentdbclient import NewEvent, NewEvents, StreamState
+from kurrentdbclient.exceptions import WrongCurrentVersionError
 
-from flaskr.events import get_kurrent_client
-from flaskr.events.serialisation import deserialise_event, serialise_event
+from flaskr.events import get_kurrent_client, get_snapshot_store
+from flaskr.events.serialisation import (
+    JSON_CONTENT_TYPE,
+    ContentType,
+    decode_event,
+    encode_event,
+)
+from flaskr.events.snapshots import (
+    AnyOf,
+    EveryNEvents,
+    OnEventTypes,
+    Snapshot,
+    SnapshotPolicy,
+    Snapshottable,
+)
 from flaskr.events.types import Event
+from flaskr.planning.aggregate_cache import AggregateCache, CachedAggregate, CacheStats
+from flaskr.planning.current_planning import (
+    PLANNING_STREAM_PREFIX,
+    CurrentPlanningProjection,
+)
+from flaskr.planning.expenses.aggregate import (
+    ExpenseListAggregate,
+    expense_list_stream_id,
+)
 from flaskr.planning.planning_aggregate import (
     PlanningAggregate,
+    PlanningApprovedEvent,
     PlanningScheduled,
     planning_id_to_stream,
     stream_to_planning_id,
 )
 
+TAggregate = TypeVar("TAggregate", bound=Snapshottable)
+
+
+class StreamVersionConflict(Exception):
+    """
+    The stream was written to since the aggregate was loaded.
+    """
+
+    def __init__(self, stream_name: str, expected: int | StreamState) -> None:
+        super().__init__(f"Stream {stream_name} is no longer at revision {expected}")
+        self.stream_name = stream_name
+        self.expected = expected
+
+
+@dataclass(frozen=True)
+class PendingAppend:
+    """
+    The events of a store() call grouped into one batch per stream, with the
+    revision each stream is expected to be at.
+    """
+
+    by_stream: dict[str, list[Event]]
+    current_versions: dict[str, int | StreamState]
+    batches: list[NewEvents]
+
 
 class PlanningRepository:
+    def __init__(
+        self,
+        content_type: ContentType = JSON_CONTENT_TYPE,
+        snapshot_policy: SnapshotPolicy = AnyOf(
+            EveryNEvents(50), OnEventTypes(PlanningApprovedEvent)
+        ),
+        cache: AggregateCache | None = None,
+    ) -> None:
+        # Format for new events; reads follow each event's own content type
+        self._content_type: ContentType = content_type
+        self._snapshot_policy = snapshot_policy
+        self._cache = cache if cache is not None else AggregateCache()
+        self._current_planning = CurrentPlanningProjection()
+
     def get_planning(self, planning_id: str) -> PlanningAggregate:
-        stream = get_kurrent_client().read_stream(planning_id_to_stream(planning_id))
-        aggregate = PlanningAggregate(planning_id)
-        for event in stream:
-            domain_event = deserialise_event(event.type, event.data.decode())
+        return self._load(
+            PlanningAggregate(planning_id), planning_id_to_stream(planning_id)
+        )
+
+    def get_expense_list(
+        self, expense_list_id: str, parent_planning_id: str
+    ) -> ExpenseListAggregate:
+        return self._load(
+            ExpenseListAggregate(expense_list_id, parent_planning_id),
+            expense_list_stream_id(expense_list_id),
+        )
+
+    def _load(self, aggregate: TAggregate, stream_name: str) -> TAggregate:
+        """
+        Bring the aggregate up to date from the cheapest starting point: the
+        cached instance, else the latest usable snapshot, else the start of
+        the stream. Only events after that point are read.
+        """
+        return self._catch_up(aggregate, stream_name, self._cache.get(stream_name))
+
+    def _catch_up(
+        self, aggregate: TAggregate, stream_name: str, cached: CachedAggregate | None
+    ) -> TAggregate:
+        snapshots = get_snapshot_store()
+        if cached is not None:
+            revision = cached.revision
+            snapshot_revision = cached.snapshot_revision
+        else:
+            revision = snapshot_revision = -1
+            snapshot = snapshots.load(stream_name)
+            if (
+                snapshot is not None
+                and snapshot.schema_version != aggregate.SNAPSHOT_VERSION
+            ):
+                snapshots.invalidate(stream_name)
+                snapshot = None
+            if snapshot is not None:
+                aggregate.restore_snapshot(snapshot.state)
+                revision = snapshot_revision = snapshot.revision
+
+        recorded = list(
+            get_kurrent_client().read_stream(stream_name, stream_position=revision + 1)
+        )
+        if cached is not None:
+            if not recorded:
+                return cached.aggregate
+            # The cached instance may be in use by other requests
+            aggregate = copy.deepcopy(cached.aggregate)
+
+        return self._advance(
+            aggregate,
+            stream_name,
+            revision,
+            snapshot_revision,
+            (
+                (
+                    decode_event(event.type, event.data, event.content_type),
+                    event.stream_position,
+                )
+                for event in recorded
+            ),
+        )
+
+    def _advance(
+        self,
+        aggregate: TAggregate,
+        stream_name: str,
+        revision: int,
+        snapshot_revision: int,
+        events: Iterable[tuple[Event, int]],
+    ) -> TAggregate:
+        """
+        Apply (event, revision) pairs to an aggregate no one else can see yet,
+        snapshot it if the policy asks for it and publish it to the cache.
+        """
+        snapshot_due = False
+        for domain_event, revision in events:
             aggregate.apply(domain_event)
-        print("Agg dict:", aggregate.__dict__, "Planning id: ", planning_id)
+            snapshot_due = snapshot_due or self._snapshot_policy.should_snapshot(
+                revision - snapshot_revision, domain_event
+            )
+        aggregate.revision = revision
+
+        if snapshot_due:
+            get_snapshot_store().save(
+                Snapshot(
+                    stream_name,
+                    revision,
+                    aggregate.SNAPSHOT_VERSION,
+                    aggregate.to_snapshot(),
+                )
+            )
+            snapshot_revision = revision
+        self._cache.put(
+            stream_name, CachedAggregate(aggregate, revision, snapshot_revision)
+        )
         return aggregate
 
+    def _write_through(
+        self,
+        stream_name: str,
+        previous: int | StreamState,
+        events: list[Event],
+    ) -> None:
+        """
+        Bring the cached aggregate of a stream we just appended to up to date.
+        When the append was checked against the cached revision the new events
+        are known to directly follow it; otherwise read the tail.
+        """
+        cached = self._cache.peek(stream_name)
+        if cached is None:
+            return
+        if cached.revision != previous:
+            self._catch_up(cached.aggregate, stream_name, cached)
+            return
+        self._advance(
+            copy.deepcopy(cached.aggregate),
+            stream_name,
+            cached.revision,
+            cached.snapshot_revision,
+            zip(events, range(cached.revision + 1, cached.revision + 1 + len(events))),
+        )
+
+    def cache_stats(self) -> CacheStats:
+        return self._cache.stats()
+
     def get_current_planning(self) -> Optional[PlanningAggregate]:
+        self._current_planning.ensure_running(get_kurrent_client())
+        if not self._current_planning.caught_up:
+            return self._scan_current_planning()
+
+        pointer = self._current_planning.pointer
+        if pointer is None:
+            return None
+        stream_name = planning_id_to_stream(pointer.planning_id)
+        cached = self._cache.get(stream_name)
+        if cached is not None and cached.revision >= pointer.revision:
+            return cached.aggregate
+        return self._catch_up(
+            PlanningAggregate(pointer.planning_id), stream_name, cached
+        )
+
+    def current_planning_version(self) -> str | None:
+        """
+        Identifies the state of the current planning without loading it: its
+        id and stream revision. None while the subscription is catching up.
+        """
+        self._current_planning.ensure_running(get_kurrent_client())
+        if not self._current_planning.caught_up:
+            return None
+        pointer = self._current_planning.pointer
+        if pointer is None:
+            return "none"
+        return f"{pointer.planning_id}@{pointer.revision}"
+
+    def current_planning_id(self) -> str | None:
+        """
+        Id of the current planning, without loading it.
+        """
+        self._current_planning.ensure_running(get_kurrent_client())
+        if not self._current_planning.caught_up:
+            return self._scan_current_planning_id()
+        pointer = self._current_planning.pointer
+        return pointer.planning_id if pointer is not None else None
+
+    def _scan_current_planning(self) -> Optional[PlanningAggregate]:
+        planning_id = self._scan_current_planning_id()
+        return self.get_planning(planning_id) if planning_id is not None else None
+
+    def _scan_current_planning_id(self) -> str | None:
+        for started_event in get_kurrent_client().read_all(
+            filter_include=PlanningScheduled.type, backwards=True, limit=1
+        ):
+            return stream_to_planning_id(started_event.stream_name)
+        return None
+
+    def store(
+        self,
+        events: list[Event],
+        expected_revisions: Mapping[str, int | StreamState] | None = None,
+    ) -> int | None:
+        """
+        Append the events in a single atomic request, as one batch per
+        stream. A stream listed in expected_revisions must still be at that
+        revision (StreamState.NO_STREAM for a new stream) or nothing is
+        written and StreamVersionConflict is raised. Other streams are
+        appended to unconditionally.
+        Returns the commit position of the last appended event, None if there
+        were no events.
+        """
+        if not events:
+            return None
+        append = self.prepare_append(events, expected_revisions)
         try:
-            started_event = next(
-                get_kurrent_client().read_all(
-                    filter_include=PlanningScheduled.type, backwards=True
-                )
+            commit_position = get_kurrent_client().multi_append_to_stream(
+                append.batches
             )
-            return self.get_planning(stream_to_planning_id(started_event.stream_name))
-        except StopIteration:
-            return None
+        except WrongCurrentVersionError as e:
+            raise self.append_conflict(append, e) from e
+        self.appended(append, commit_position)
+        return commit_position
 
-    def store(self, events: list[Event]) -> None:
-        kurrent = get_kurrent_client()
+    def prepare_append(
+        self,
+        events: list[Event],
+        expected_revisions: Mapping[str, int | StreamState] | None = None,
+    ) -> PendingAppend:
+        """
+        Group events for multi_append_to_stream, see store(). Together with
+        append_conflict() and appended() this lets other clients of the log,
+        like AsyncPlanningRepository, append the same way.
+        """
+        expected_revisions = expected_revisions or {}
+        by_stream: dict[str, list[Event]] = {}
         for event in events:
-            k_event = NewEvent(event.type, data=serialise_event(event).encode())
-            kurrent.append_event(
-                stream_name=event.stream_id,
-                event=k_event,
-                current_version=StreamState.ANY,
-            )
+            by_stream.setdefault(event.stream_id, []).append(event)
+        current_versions = {
+            stream_name: expected_revisions.get(stream_name, StreamState.ANY)
+            for stream_name in by_stream
+        }
+        return PendingAppend(
+            by_stream,
+            current_versions,
+            [
+                NewEvents(
+                    stream_name,
+                    [
+                        NewEvent(
+                            event.type,
+                            data=encode_event(event, self._content_type),
+                            content_type=self._content_type,
+                        )
+                        for event in stream_events
+                    ],
+                    current_versions[stream_name],
+                )
+                for stream_name, stream_events in by_stream.items()
+            ],
+        )
+
+    def append_conflict(
+        self, append: PendingAppend, error: WrongCurrentVersionError
+    ) -> StreamVersionConflict:
+        """
+        The conflict to raise when an append was rejected. Nothing was
+        written; the retry has to reload what was involved.
+        """
+        for stream_name in append.by_stream:
+            self._cache.invalidate(stream_name)
+        stream_name = error.stream_name or next(iter(append.by_stream))
+        return StreamVersionConflict(
+            stream_name, append.current_versions.get(stream_name, StreamState.ANY)
+        )
+
+    def appended(self, append: PendingAppend, commit_position: int) -> None:
+        """
+        Bring the current planning and cached aggregates up to date with an
+        append that went through.
+        """
+        for stream_name, stream_events in append.by_stream.items():
+            for event in stream_events:
+                if isinstance(event, PlanningScheduled):
+                    # Don't wait for the subscription to see our own planning
+                    self._current_planning.observe_scheduled(event.id, commit_position)
+            expected = append.current_versions[stream_name]
+            if stream_name.startswith(PLANNING_STREAM_PREFIX) and (
+                isinstance(expected, int) or expected is StreamState.NO_STREAM
+            ):
+                # The checked append tells us the new revision exactly
+                previous = expected if isinstance(expected, int) else -1
+                self._current_planning.observe_revision(
+                    stream_to_planning_id(stream_name), previous + len(stream_events)
+                )
+            self._write_through(stream_name, expected, stream_events)
@@ -0,0 +1,95 @@
+import time
+from pathlib import Path
+from typing import Any, Generator
+
+import pytest
+from flask import Flask
+from kurrentdbclient import StreamState
+
+from flaskr.events import init_event_extension, init_kurrentdb, init_snapshot_store
+
+from .planning_aggregate import (
+    PlanningScheduled,
+    PlanningStartedEvent,
+    PlanningStatus,
+    planning_id_to_stream,
+)
+from .planning_repository import PlanningRepository, StreamVersionConflict
+
+
+@pytest.fixture
+def repository(tmp_path: Path) -> Generator[Any, None, None]:
+    app = Flask(__name__)
+    app.config["KURRENTDB_BACKEND"] = "embedded"
+    app.config["KURRENTDB_FILE"] = str(tmp_path / "kurrent.db")
+    app.config["SNAPSHOTS_FILE"] = str(tmp_path / "snapshots.db")
+    app.config["EVENTS_FILE"] = str(tmp_path / "events.jsonl")
+    with app.app_context():
+        init_event_extension(app)
+        init_kurrentdb(app)
+        init_snapshot_store(app)
+        yield PlanningRepository()
+
+
+def schedule(repository: Any, planning_id: str) -> None:
+    repository.store(
+        [
+            PlanningScheduled(
+                stream_id=planning_id_to_stream(planning_id),
+                id=planning_id,
+                planning_year=2025,
+                offices=[],
+            )
+        ],
+        {planning_id_to_stream(planning_id): StreamState.NO_STREAM},
+    )
+
+
+def test_cached_aggregate_follows_own_writes(repository: Any) -> None:
+    schedule(repository, "p")
+    planning = repository.get_planning("p")
+    assert planning.revision == 0
+
+    repository.store(
+        [PlanningStartedEvent(planning.stream_id, "2025-12-31")],
+        {planning.stream_id: planning.revision},
+    )
+    started = repository.get_planning("p")
+
+    assert started is not planning
+    assert started.revision == 1
+    assert started.status == PlanningStatus.IN_PROGRESS
+    # The instance handed out earlier is left alone
+    assert planning.status == PlanningStatus.NOT_STARTED
+    assert repository.cache_stats().misses == 1
+
+
+def test_stale_revision_conflicts(repository: Any) -> None:
+    schedule(repository, "p")
+    planning = repository.get_planning("p")
+    repository.store(
+        [PlanningStartedEvent(planning.stream_id, "2025-12-31")],
+        {planning.stream_id: planning.revision},
+    )
+
+    with pytest.raises(StreamVersionConflict):
+        repository.store(
+            [PlanningStartedEvent(planning.stream_id, "2026-01-31")],
+            {planning.stream_id: planning.revision},
+        )
+    assert repository.get_planning("p").deadline == "2025-12-31"
+
+
+def test_current_planning(repository: Any) -> None:
+    assert repository.get_current_planning() is None
+    schedule(repository, "first")
+    schedule(repository, "second")
+
+    deadline = time.monotonic() + 5
+    while not repository._current_planning.caught_up:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    assert repository.get_current_planning().id == "second"
+    schedule(repository, "third")
+    assert repository.get_current_planning().id == "third"
@@ -2,8 +2,14 @@ from logging import getLogger
 from typing import Optional
 from uuid import uuid4
 
+from kurrentdbclient import StreamState
+
 from flaskr.constants import OFFICES
+from flaskr.planning.async_planning_repository import AsyncPlanningRepository
 from flaskr.planning.expenses.aggregate import (
+    ExpenseAdded,
+    ExpenseListAggregate,
+    ExpenseListClosed,
     ExpenseListCreated,
     expense_list_stream_id,
 )
@@ -12,7 +18,11 @@ from flaskr.planning.planning_aggregate import (
     PlanningScheduled,
     planning_id_to_stream,
 )
-from flaskr.planning.planning_repository import PlanningRepository
+from flaskr.planning.planning_repository import (
+    PlanningRepository,
+    StreamVersionConflict,
+)
+from flaskr.planning.types import Expense
 
 from ..events.types import Command, Event
 
@@ -20,38 +30,100 @@ logger = getLogger(__name__)
 
 __all__ = ["PlanningService"]
 
+EXECUTE_ATTEMPTS = 3
+
 
 class PlanningService:
 
     def __init__(self) -> None:
         self._planning_repository = PlanningRepository()
+        self._async_planning_repository = AsyncPlanningRepository(
+            self._planning_repository
+        )
 
     def get_current_planning(self) -> Optional[PlanningAggregate]:
         return self._planning_repository.get_current_planning()
 
+    def current_planning_version(self) -> str | None:
+        return self._planning_repository.current_planning_version()
+
     def execute(self, command: Command) -> None:
-        planning = self._planning_repository.get_current_planning()
+        for attempt in range(1, EXECUTE_ATTEMPTS + 1):
+            planning = self._planning_repository.get_current_planning()
+            if planning is None:
+                raise ValueError("No planning found")
+
+            event_list = planning.process(command)
+            try:
+                self._planning_repository.store(
+                    event_list, {planning.stream_id: planning.revision}
+                )
+                return
+            except StreamVersionConflict:
+                if attempt == EXECUTE_ATTEMPTS:
+                    raise
+                # Someone else changed the planning - decide again on fresh state
+                logger.info(f"Retrying {type(command).__name__} after a conflict")
+
+    def add_expenses(self, expenses: list[Expense]) -> int | None:
+        """
+        Record expenses on the expense lists of their offices. Returns the
+        commit position to wait for before reading them back.
+        """
+        planning = self._current_planning_or_raise()
+        return self._planning_repository.store(
+            [
+                ExpenseAdded(
+                    expense_list_stream_id(planning.office_expense_ids[e.role]), e
+                )
+                for e in expenses
+            ]
+        )
+
+    def close_expenses(self, office: str) -> int | None:
+        planning = self._current_planning_or_raise()
+        return self._planning_repository.store(
+            [
+                ExpenseListClosed(
+                    expense_list_stream_id(planning.office_expense_ids[office]),
+                    office,
+                )
+            ]
+        )
+
+    async def get_expense_lists(self) -> dict[str, ExpenseListAggregate]:
+        """
+        The expense lists of every office in the current planning, read
+        concurrently.
+        """
+        planning = await self._async_planning_repository.get_current_planning()
         if planning is None:
             raise ValueError("No planning found")
+        return await self._async_planning_repository.get_expense_lists(planning)
 
-        event_list = planning.process(command)
-        self._planning_repository.store(event_list)
+    def _current_planning_or_raise(self) -> PlanningAggregate:
+        planning = self._planning_repository.get_current_planning()
+        if planning is None:
+            raise ValueError("No planning found")
+        return planning
 
     def schedule_planning(self):
         logger.warning("Scheduling planning")
 
         planning_id = str(uuid4())
+        stream_id = planning_id_to_stream(planning_id)
 
         self._planning_repository.store(
             [
                 PlanningScheduled(
-                    stream_id=planning_id_to_stream(planning_id),
+                    stream_id=stream_id,
                     id=planning_id,
                     planning_year=2025,
                     offices=OFFICES,
                 ),
                 *self._create_expenses(planning_id),
             ],
+            {stream_id: StreamState.NO_STREAM},
         )
 
     def _create_expenses(self, planning_aggregate_id: str) -> list[Event]:
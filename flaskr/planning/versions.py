@@ -0,0 +1,27 @@
+from flask import session
+
+from flaskr.events import get_kurrent_client, get_projections
+from flaskr.extensions import ctx
+
+__all__ = ["dashboard_version", "office_expenses_version"]
+
+
+def dashboard_version() -> str | None:
+    """
+    Version of what the planning views show: the current planning's stream
+    revision and how far the read models got in the log. None while either
+    is still catching up.
+    """
+    planning = ctx().planning_service.current_planning_version()
+    projections = get_projections()
+    projections.ensure_running(get_kurrent_client())
+    if planning is None or not projections.live:
+        return None
+    return f"{planning}:{projections.position}"
+
+
+def office_expenses_version() -> str | None:
+    version = dashboard_version()
+    if version is None:
+        return None
+    return f"{session.get('role')}:{version}"
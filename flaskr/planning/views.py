@@ -5,10 +5,11 @@ from werkzeug.wrappers import Response
 
 from ..auth import auth_required
 from ..constants import CHIEF, OFFICES, OFFICES_NAME, OFFICES_SINGLE
+from ..extensions import ctx
 from .chief import chief_bp
+from .expenses.projection import expenses_projection
 from .expenses.views import create_expenses, expenses_bp
 from .minister import minister_bp
-from .planning_aggregate import EXPENSES
 
 planning_bp = Blueprint("planning", __name__)
 planning_bp.register_blueprint(chief_bp, url_prefix="/chief")
@@ -46,8 +47,11 @@ def set_role() -> str | Response:
 @planning_bp.route("/file_import", methods=["POST"])
 @auth_required
 def import_file() -> str | Response:
-    for role, expense_list in EXPENSES.items():
-        for new_expense in create_expenses(role, randrange(1, 40)):
-            expense_list.append(new_expense)
+    expenses = [
+        new_expense
+        for role in OFFICES
+        for new_expense in create_expenses(role, randrange(1, 40))
+    ]
+    expenses_projection(ctx().planning_service.add_expenses(expenses))
 
     return redirect(url_for("planning.chief.chief_dashboard"))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Time budget rollups over many expenses: building the NumPy columns once per
+read model position, then every grouping on its own.
+Usage: python -m flaskr.scripts.bench_budget_analytics [expenses]
+"""
+import sys
+import time
+from typing import Callable
+
+from flaskr.constants import OFFICES
+from flaskr.planning.analytics import GROUP_BY, budget_analytics
+from flaskr.planning.expenses.aggregate import ExpenseAdded
+from flaskr.planning.expenses.projection import ExpensesProjection
+from flaskr.planning.expenses.template_pool import expense_template_pool
+
+
+def build_projection(n: int) -> ExpensesProjection:
+    projection = ExpensesProjection()
+    pool = expense_template_pool()
+    per_office = n // len(OFFICES)
+    for office in OFFICES:
+        for expense in pool.generate(office, per_office):
+            projection.apply(ExpenseAdded(f"expenses-{office}", expense))
+    return projection
+
+
+def timed_ms(f: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    f()
+    return (time.perf_counter() - start) * 1000
+
+
+def main(n: int) -> None:
+    projection = build_projection(n)
+    total = sum(projection.count(office) for office in OFFICES)
+    print(f"{total:,} expenses in {len(OFFICES)} offices")
+
+    build = timed_ms(lambda: budget_analytics(projection, 1))
+    print(f"  columns         {build:8.1f} ms")
+    analytics = budget_analytics(projection, 1)
+    for by in GROUP_BY:
+        runs = [
+            timed_ms(lambda by=by: analytics.rollup(by).to_dict()) for _ in range(5)
+        ]
+        print(f"  by {by:<12} {min(runs):8.1f} ms")
+    cold = timed_ms(lambda: budget_analytics(projection, 2).rollup("dzial").to_dict())
+    print(f"  cold by dzial   {cold:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark append and read throughput of the JSON lines and SQLite event
+repositories.
+Usage: python -m flaskr.scripts.bench_event_repository [events]
+"""
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from flaskr.events.event_repository import Durability, FileEventRepository
+from flaskr.events.sqlite_event_repository import SqliteEventRepository
+from flaskr.events.types import Event
+
+STREAMS = 100
+# A scheduled planning plus its expense lists
+BATCH_SIZE = 17
+
+Repository = FileEventRepository | SqliteEventRepository
+
+
+@dataclass
+class BenchEvent(Event):
+    office: str
+    financial_needs: int
+
+
+def sample(i: int) -> BenchEvent:
+    return BenchEvent(f"stream-{i % STREAMS}", f"office-{i % 16}", i)
+
+
+def report(name: str, events: int, seconds: float) -> None:
+    print(f"  {name:<16} {events / seconds:12,.0f} events/s")
+
+
+def timed(fn: Callable[[], int]) -> tuple[int, float]:
+    start = time.perf_counter()
+    count = fn()
+    return count, time.perf_counter() - start
+
+
+def bench(name: str, open_repository: Callable[[Path], Repository], n: int) -> None:
+    print(f"{name}:")
+    with tempfile.TemporaryDirectory() as tmp:
+        repository = open_repository(Path(tmp) / "single")
+
+        def append_single() -> int:
+            for i in range(n):
+                repository.store(sample(i))
+            return n
+
+        report("append x1", *timed(append_single))
+        repository.destroy()
+
+        repository = open_repository(Path(tmp) / "batched")
+
+        def append_batches() -> int:
+            for start in range(0, n, BATCH_SIZE):
+                repository.store_all(
+                    [sample(i) for i in range(start, min(start + BATCH_SIZE, n))]
+                )
+            return n
+
+        report(f"append x{BATCH_SIZE}", *timed(append_batches))
+
+        def read_streams() -> int:
+            return sum(
+                1 for s in range(STREAMS) for _ in repository.read_stream(f"stream-{s}")
+            )
+
+        report("read streams", *timed(read_streams))
+
+        def read_tail() -> int:
+            # The last few events of every stream, like a cached aggregate load
+            return sum(
+                1
+                for s in range(STREAMS)
+                for _ in repository.read_stream(
+                    f"stream-{s}", repository.stream_revision(f"stream-{s}") - 4
+                )
+            )
+
+        report("read tails", *timed(read_tail))
+        if isinstance(repository, SqliteEventRepository):
+            sqlite = repository
+            report("read all", *timed(lambda: sum(1 for _ in sqlite.read_all())))
+        repository.destroy()
+
+
+def main(n: int) -> None:
+    for durability in (Durability.FLUSH, Durability.BATCH):
+        bench(
+            f"file ({durability.value})",
+            lambda path: FileEventRepository(str(path), durability=durability),
+            n,
+        )
+        bench(
+            f"sqlite ({durability.value})",
+            lambda path: SqliteEventRepository(str(path), durability=durability),
+            n,
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
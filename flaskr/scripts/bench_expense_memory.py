@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Compare the memory held by expenses kept as a list of Expense objects with
+the same expenses in an ExpenseTable.
+Usage: python -m flaskr.scripts.bench_expense_memory [expenses]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+from dataclasses import asdict
+from typing import Callable, Iterator
+
+from flaskr.planning.expenses.expense_table import ExpenseTable
+from flaskr.planning.expenses.template_pool import expense_template_pool
+from flaskr.planning.types import Expense
+
+
+def decoded_expenses(n: int) -> Iterator[Expense]:
+    # Like the projection gets them: decoded from events, so no two expenses
+    # share string objects even when they came from the same template
+    for expense in expense_template_pool().generate("Jednostka A", n):
+        yield Expense(**json.loads(json.dumps(asdict(expense))))
+
+
+def retained(build: Callable[[], object]) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def build_table(n: int) -> ExpenseTable:
+    table = ExpenseTable()
+    for expense in decoded_expenses(n):
+        table.append(expense)
+    return table
+
+
+def main(n: int) -> None:
+    expense_template_pool()
+    expenses, list_size = retained(lambda: list(decoded_expenses(n)))
+    del expenses
+    table, table_size = retained(lambda: build_table(n))
+    del table
+
+    print(f"{n:,} expenses")
+    print(
+        f"  list[Expense]  {list_size / 2**20:8.1f} MiB  {list_size / n:6.0f} B/expense"
+    )
+    print(
+        f"  ExpenseTable   {table_size / 2**20:8.1f} MiB  {table_size / n:6.0f} B/expense"
+    )
+    print(f"  ratio          {list_size / table_size:8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
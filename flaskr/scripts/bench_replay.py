@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Benchmark replaying an event log sequentially and with worker processes
+decoding it. Besides the wall time the CPU time of this process is shown:
+it is what dispatching costs, and bounds the speedup on enough cores.
+Usage: python -m flaskr.scripts.bench_replay [events]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from flaskr.events.event_repository import FileEventRepository
+from flaskr.events.event_store import DefaultEventStore
+from flaskr.events.replay_wrapper import NoopEventRepository, ReplayWrapper
+from flaskr.planning.expenses.aggregate import ExpenseRemovedEvent
+
+STREAMS = 50
+BATCH_SIZE = 1000
+
+
+def write_log(path: Path, n: int) -> None:
+    repository = FileEventRepository(str(path))
+    for start in range(0, n, BATCH_SIZE):
+        repository.store_all(
+            [
+                ExpenseRemovedEvent(f"expenses-{i % STREAMS}", f"expense-{i}")
+                for i in range(start, min(start + BATCH_SIZE, n))
+            ]
+        )
+    repository.destroy()
+
+
+def main(n: int) -> None:
+    counts: dict[str, int] = {}
+
+    def count(event: ExpenseRemovedEvent) -> None:
+        counts[event.stream_id] = counts.get(event.stream_id, 0) + 1
+
+    store = ReplayWrapper(DefaultEventStore(NoopEventRepository()))
+    store.add_subscriber(count)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "events.jsonl"
+        write_log(path, n)
+        print(f"{n} events, {os.cpu_count()} cores:")
+        for workers in (1, 2, 4, 8):
+            wall = time.perf_counter()
+            cpu = time.process_time()
+            stats = store.replay_events(str(path), quiet=True, workers=workers)
+            print(
+                f"  workers={workers:<3} {stats.events_per_second:12,.0f} events/s"
+                f"  wall {time.perf_counter() - wall:6.2f}s"
+                f"  this process {time.process_time() - cpu:6.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
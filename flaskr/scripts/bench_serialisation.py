@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark event serialisation: the previous generic path (`__dict__` +
+`json.dumps`, `cls(**json.loads(...))`) against the dataclass codecs.
+Usage: python -m flaskr.scripts.bench_serialisation [iterations]
+"""
+import json
+import sys
+import timeit
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable
+
+from flaskr.constants import OFFICES
+from flaskr.events.serialisation import (
+    decode_event,
+    encode_event,
+    event,
+    event_types,
+)
+from flaskr.events.types import Event
+from flaskr.planning.planning_aggregate import PlanningScheduled
+from flaskr.planning.types import Expense
+
+
+# Same shape as ExpenseAdded, which cannot be imported outside of the app
+@event("BenchExpenseAdded")
+@dataclass
+class ExpenseAdded(Event):
+    expense: Expense
+
+
+def legacy_round_trip(event: Any) -> Any:
+    # What PlanningRepository used to do: serialise_event(...).encode() on
+    # append, deserialise_event(type, data.decode()) on read
+    cls = event_types[event.type]
+    data = json.dumps(event.__dict__).encode()
+    return cls(**json.loads(data.decode()))
+
+
+def round_trip(event: Event) -> Event:
+    return decode_event(event.type, encode_event(event))
+
+
+def report(name: str, fn: Callable[[], Any], iterations: int) -> None:
+    seconds = timeit.timeit(fn, number=iterations)
+    print(f"  {name:<10} {seconds / iterations * 1e6:8.2f} us/event")
+
+
+def main(iterations: int) -> None:
+    scheduled = PlanningScheduled(
+        stream_id="Planning:1", id="1", planning_year=2025, offices=OFFICES
+    )
+    expense_added = ExpenseAdded(
+        stream_id="expenses-1",
+        expense=Expense(
+            id="1",
+            chapter="75001",
+            task_name="Zakup sprzętu",
+            financial_needs=100_000,
+            role=OFFICES[0],
+            departament="DI",
+            budget_2025=50_000,
+            budget_2026=100_000,
+        ),
+    )
+
+    for sample in (scheduled, expense_added):
+        print(f"{type(sample).__name__} round trip:")
+        if sample is scheduled:
+            # The generic path cannot serialise nested dataclasses at all
+            report("legacy", partial(legacy_round_trip, sample), iterations)
+        report("codec", partial(round_trip, sample), iterations)
+        print(f"  {'':<10} {len(encode_event(sample))} bytes")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Compare time to first byte, total time and peak RSS of the expense list
+rendered as a stream and rendered up front, each in a fresh process against
+an embedded event store.
+Usage: python -m flaskr.scripts.bench_streaming [expenses]
+"""
+import base64
+import gc
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+OFFICE = "Jednostka A"
+AUTH = {"Authorization": "Basic " + base64.b64encode(b"mc:MiniCyfr1!").decode()}
+
+
+def measure(n: int, stream: bool) -> dict[str, float]:
+    os.chdir(tempfile.mkdtemp())
+    os.environ["FLASK_KURRENTDB_BACKEND"] = "embedded"
+    from flaskr.extensions import ctx
+    from flaskr.main import app
+    from flaskr.planning.expenses.aggregate import ExpenseAdded
+    from flaskr.planning.expenses.projection import expenses_projection
+    from flaskr.planning.expenses.template_pool import expense_template_pool
+
+    app.config["STREAM_TEMPLATES"] = stream
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["role"] = OFFICE
+    with app.app_context():
+        ctx().planning_service.schedule_planning()
+    # Compile templates while the list is still empty, a full render now
+    # would set the peak RSS being measured
+    client.get("/expenses/", headers=AUTH).close()
+
+    with app.app_context():
+        projection = expenses_projection()
+        for expense in expense_template_pool().generate(OFFICE, n):
+            projection.apply(ExpenseAdded(f"expenses-{OFFICE}", expense))
+    gc.collect()
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    response = client.get("/expenses/", headers=AUTH, buffered=False)
+    chunks = iter(response.response)
+    size = len(next(chunks))
+    first_byte = time.perf_counter() - start
+    for chunk in chunks:
+        size += len(chunk)
+    total = time.perf_counter() - start
+    response.close()
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "ttfb_ms": first_byte * 1000,
+        "total_ms": total * 1000,
+        "size_mib": size / 2**20,
+        # ru_maxrss is in KiB on Linux
+        "rss_growth_mib": (peak - baseline) / 2**10,
+    }
+
+
+def main(n: int) -> None:
+    context = multiprocessing.get_context("spawn")
+    print(f"{n:,} expenses")
+    for name, stream in [("render_template", False), ("streamed", True)]:
+        with context.Pool(1) as pool:
+            result = pool.apply(measure, (n, stream))
+        print(
+            f"  {name:<16} TTFB {result['ttfb_ms']:8.1f} ms"
+            f"  total {result['total_ms']:8.1f} ms"
+            f"  {result['size_mib']:6.1f} MiB"
+            f"  peak RSS +{result['rss_growth_mib']:6.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
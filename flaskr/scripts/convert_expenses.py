@@ -1,15 +1,29 @@
 #!/usr/bin/env python3
 """
-Script to convert Excel expense data to JSON format.
-Usage: python convert_expenses.py <path_to_excel_file.xlsx>
+Script to convert Excel expense data to JSON Lines, one expense per line.
+The workbook is read row by row and rows are converted in chunks, optionally
+in several processes, so memory does not grow with the size of the sheet.
+Usage: python convert_expenses.py <path_to_excel_file.xlsx> [-o output.jsonl]
+           [--workers N] [--chunk-size N]
 """
+import argparse
 import json
+import os
 import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator, Sequence
 
 import openpyxl  # type: ignore[import-untyped]
 
+SHEET_NAME = "podział limitów"
+OUTPUT_PATH = Path(__file__).parent.parent / "data" / "expenses_template.jsonl"
+
+Row = tuple[Any, ...]
+
 
 def safe_int(value: Any) -> int | None:
     """Safely convert value to int, return None if not possible."""
@@ -32,8 +46,121 @@ def safe_str(value: Any) -> str | None:
     return str_value if str_value else None
 
 
-def convert_excel_to_json(excel_path: Path) -> int:
-    """Convert Excel file to JSON format."""
+def convert_row(row: Row) -> dict[str, Any] | None:
+    """Expense fields from a sheet row, None if required fields are invalid."""
+
+    def cell(index: int) -> Any:
+        return row[index] if len(row) > index else None
+
+    # Extract required fields (using 0-based indexing)
+    chapter = safe_int(cell(7))  # Column H
+    task_name = safe_str(cell(11))  # Column L
+    financial_needs = safe_int(cell(14))  # Column O
+
+    if not chapter or not task_name or not financial_needs or financial_needs <= 0:
+        return None
+
+    return {
+        "chapter": chapter,
+        "task_name": task_name,
+        "financial_needs": financial_needs,
+        # Additional fields from Excel
+        "czesc": safe_int(cell(0)),
+        "departament": safe_str(cell(1)),
+        "rodzaj_projektu": safe_str(cell(2)),
+        "opis_projektu": safe_str(cell(3)),
+        "data_zlozenia": safe_str(cell(4)),
+        "program_operacyjny": safe_str(cell(5)),
+        "termin_realizacji": safe_str(cell(6)),
+        "zrodlo_fin": safe_int(cell(8)),
+        "bz": safe_str(cell(9)),
+        "beneficjent": safe_str(cell(10)),
+        "szczegolowe_uzasadnienie": safe_str(cell(12)),
+        "budget_2025": safe_int(cell(13)),
+        "budget_2026": safe_int(cell(14)),
+        "budget_2027": safe_int(cell(15)),
+        "budget_2028": safe_int(cell(16)),
+        "budget_2029": safe_int(cell(17)),
+        "etap_dzialan": safe_str(cell(18)),
+        "umowy": safe_str(cell(19)),
+        "nr_umowy": safe_str(cell(20)),
+        "z_kim_zawarta": safe_str(cell(21)),
+        "uwagi": safe_str(cell(22)),
+    }
+
+
+def convert_chunk(rows: Sequence[Row]) -> tuple[str, int]:
+    """JSON lines of the valid rows of a chunk, and how many were rejected."""
+    lines: list[str] = []
+    rejected = 0
+    for row in rows:
+        expense = convert_row(row)
+        if expense is None:
+            rejected += 1
+        else:
+            lines.append(json.dumps(expense, ensure_ascii=False) + "\n")
+    return "".join(lines), rejected
+
+
+def read_chunks(rows: Iterable[Row], chunk_size: int) -> Iterator[list[Row]]:
+    """Non-empty rows in lists of up to chunk_size."""
+    chunk: list[Row] = []
+    for row in rows:
+        # Skip empty rows
+        if not any(row):
+            continue
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def convert_chunks(
+    chunks: Iterable[list[Row]], workers: int
+) -> Iterator[tuple[int, str, int]]:
+    """
+    Rows read, JSON lines and rejected rows of every chunk, in sheet order.
+    With more than one worker chunks are converted in a process pool, with
+    only a few chunks per worker in flight.
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield (len(chunk), *convert_chunk(chunk))
+        return
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending: deque[tuple[int, Future[tuple[str, int]]]] = deque()
+        for chunk in chunks:
+            pending.append((len(chunk), pool.submit(convert_chunk, chunk)))
+            if len(pending) >= 2 * workers:
+                size, future = pending.popleft()
+                yield (size, *future.result())
+        while pending:
+            size, future = pending.popleft()
+            yield (size, *future.result())
+
+
+@dataclass
+class ConversionStats:
+    rows: int = 0
+    converted: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def convert_excel_to_jsonl(
+    excel_path: Path,
+    output_path: Path = OUTPUT_PATH,
+    workers: int = 1,
+    chunk_size: int = 1000,
+) -> ConversionStats:
+    """Convert Excel file to JSON Lines."""
     # Validate file exists
     if not excel_path.exists():
         print(f"Error: File not found: {excel_path}")
@@ -47,87 +174,74 @@ def convert_excel_to_json(excel_path: Path) -> int:
     print(f"Loading Excel file: {excel_path}")
 
     try:
-        workbook = openpyxl.load_workbook(excel_path)
+        # Read-only mode parses the sheet lazily while rows are iterated;
+        # data_only gives the cached values of formula cells
+        workbook = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
     except Exception as e:
         print(f"Error loading Excel file: {e}")
         sys.exit(1)
 
-    # Get the "podział limitów" sheet
-    if "podział limitów" not in workbook.sheetnames:
-        print(f"Error: Sheet 'podział limitów' not found in workbook")
-        print(f"Available sheets: {workbook.sheetnames}")
-        sys.exit(1)
-
-    sheet = workbook["podział limitów"]
-
-    expenses: list[dict[str, Any]] = []
-
-    for row in sheet.iter_rows(min_row=2, values_only=True):
-        # Skip empty rows
-        if not any(row):
-            continue
-
-        # Extract required fields (using 0-based indexing)
-        chapter = safe_int(row[7]) if len(row) > 7 else None  # Column H (index 7)
-        task_name = safe_str(row[11]) if len(row) > 11 else None  # Column L (index 11)
-        financial_needs = (
-            safe_int(row[14]) if len(row) > 14 else None
-        )  # Column O (index 14)
-
-        # Skip if required fields are missing
-        if not chapter or not task_name or not financial_needs or financial_needs <= 0:
-            continue
-
-        # Extract all additional fields
-        expense_data = {
-            "chapter": chapter,
-            "task_name": task_name,
-            "financial_needs": financial_needs,
-            # Additional fields from Excel
-            "czesc": safe_int(row[0]) if len(row) > 0 else None,
-            "departament": safe_str(row[1]) if len(row) > 1 else None,
-            "rodzaj_projektu": safe_str(row[2]) if len(row) > 2 else None,
-            "opis_projektu": safe_str(row[3]) if len(row) > 3 else None,
-            "data_zlozenia": safe_str(row[4]) if len(row) > 4 else None,
-            "program_operacyjny": safe_str(row[5]) if len(row) > 5 else None,
-            "termin_realizacji": safe_str(row[6]) if len(row) > 6 else None,
-            "zrodlo_fin": safe_int(row[8]) if len(row) > 8 else None,
-            "bz": safe_str(row[9]) if len(row) > 9 else None,
-            "beneficjent": safe_str(row[10]) if len(row) > 10 else None,
-            "szczegolowe_uzasadnienie": safe_str(row[12]) if len(row) > 12 else None,
-            "budget_2025": safe_int(row[13]) if len(row) > 13 else None,
-            "budget_2026": safe_int(row[14]) if len(row) > 14 else None,
-            "budget_2027": safe_int(row[15]) if len(row) > 15 else None,
-            "budget_2028": safe_int(row[16]) if len(row) > 16 else None,
-            "budget_2029": safe_int(row[17]) if len(row) > 17 else None,
-            "etap_dzialan": safe_str(row[18]) if len(row) > 18 else None,
-            "umowy": safe_str(row[19]) if len(row) > 19 else None,
-            "nr_umowy": safe_str(row[20]) if len(row) > 20 else None,
-            "z_kim_zawarta": safe_str(row[21]) if len(row) > 21 else None,
-            "uwagi": safe_str(row[22]) if len(row) > 22 else None,
-        }
-
-        expenses.append(expense_data)
-
-    # Determine output path
-    output_path = Path(__file__).parent.parent / "data" / "expenses_template.json"
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
-    # Save to JSON
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(expenses, f, ensure_ascii=False, indent=2)
-
-    print(f"Successfully converted {len(expenses)} expenses")
+    try:
+        # Get the "podział limitów" sheet
+        if SHEET_NAME not in workbook.sheetnames:
+            print(f"Error: Sheet '{SHEET_NAME}' not found in workbook")
+            print(f"Available sheets: {workbook.sheetnames}")
+            sys.exit(1)
+
+        sheet = workbook[SHEET_NAME]
+        stats = ConversionStats()
+        start = time.perf_counter()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # Written next to the output and moved over it when complete
+        partial_path = output_path.with_name(output_path.name + ".partial")
+        try:
+            with open(partial_path, "w", encoding="utf-8") as f:
+                chunks = read_chunks(
+                    sheet.iter_rows(min_row=2, values_only=True), chunk_size
+                )
+                for rows, lines, rejected in convert_chunks(chunks, workers):
+                    f.write(lines)
+                    stats.rows += rows
+                    stats.rejected += rejected
+                    stats.converted += rows - rejected
+            os.replace(partial_path, output_path)
+        except BaseException:
+            # Leave no half-written output behind
+            partial_path.unlink(missing_ok=True)
+            raise
+        stats.seconds = time.perf_counter() - start
+    finally:
+        workbook.close()
+
+    print(
+        f"Successfully converted {stats.converted} expenses "
+        f"from {stats.rows} rows in {stats.seconds:.1f}s "
+        f"({stats.rows_per_second:,.0f} rows/s)"
+    )
+    print(f"Rejected {stats.rejected} rows with missing or invalid required fields")
     print(f"Saved to: {output_path}")
 
-    return len(expenses)
+    return stats
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python convert_expenses.py <path_to_excel_file.xlsx>")
-        print("Example: python convert_expenses.py docs/expenses.xlsx")
-        sys.exit(1)
-
-    excel_file = Path(sys.argv[1])
-    convert_excel_to_json(excel_file)
+    parser = argparse.ArgumentParser(
+        description="Convert Excel expense data to JSON Lines."
+    )
+    parser.add_argument("excel_file", type=Path, help="e.g. docs/expenses.xlsx")
+    parser.add_argument("-o", "--output", type=Path, default=OUTPUT_PATH)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="processes converting rows; 0 for one per CPU",
+    )
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    convert_excel_to_jsonl(
+        args.excel_file,
+        args.output,
+        workers=args.workers or os.cpu_count() or 1,
+        chunk_size=args.chunk_size,
+    )
@@ -0,0 +1,80 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from flaskr.planning.expenses.template_pool import ExpenseTemplatePool
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from flaskr.scripts import convert_expenses  # noqa: E402
+from flaskr.scripts.convert_expenses import (  # noqa: E402
+    SHEET_NAME,
+    convert_excel_to_jsonl,
+)
+
+
+def row(chapter: Any, task_name: Any, needs: Any, **columns: Any) -> list[Any]:
+    cells: list[Any] = [None] * 23
+    cells[7], cells[11], cells[14] = chapter, task_name, needs
+    for index, value in columns.items():
+        cells[int(index[1:])] = value
+    return cells
+
+
+@pytest.fixture
+def workbook(tmp_path: Path) -> Path:
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.title = SHEET_NAME
+    sheet.append([f"column {i}" for i in range(23)])
+    sheet.append(row(75001.0, " Zakup sprzętu ", 1000, c1="DI", c13=500, c16=200))
+    sheet.append([None] * 23)
+    # No financial needs
+    sheet.append(row(75001, "Odrzucone", None))
+    sheet.append(row("75002", "Szkolenia", "20", c22="uwagi"))
+    path = tmp_path / "expenses.xlsx"
+    book.save(path)
+    return path
+
+
+def test_converts_valid_rows_for_the_template_pool(
+    workbook: Path, tmp_path: Path
+) -> None:
+    output = tmp_path / "expenses.jsonl"
+
+    stats = convert_excel_to_jsonl(workbook, output, chunk_size=2)
+
+    assert (stats.rows, stats.converted, stats.rejected) == (3, 2, 1)
+    pool = ExpenseTemplatePool.load(output)
+    assert len(pool) == 2
+    expenses = sorted(pool.sample("office", 2), key=lambda e: e.task_name)
+    assert [(e.chapter, e.task_name, e.financial_needs) for e in expenses] == [
+        (75002, "Szkolenia", 20),
+        (75001, "Zakup sprzętu", 1000),
+    ]
+    first = expenses[1]
+    assert (first.departament, first.budget_2025, first.budget_2026) == (
+        "DI",
+        500,
+        1000,
+    )
+    assert first.budget_2028 == 200
+    assert expenses[0].uwagi == "uwagi"
+    assert not list(tmp_path.glob("*.partial"))
+
+
+def test_failed_conversion_leaves_no_output(
+    workbook: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    output = tmp_path / "expenses.jsonl"
+
+    def fail(chunks: Any, workers: int) -> Any:
+        yield 1, "{}\n", 0
+        raise OSError("disk full")
+
+    monkeypatch.setattr(convert_expenses, "convert_chunks", fail)
+
+    with pytest.raises(OSError, match="disk full"):
+        convert_excel_to_jsonl(workbook, output)
+    assert list(tmp_path.iterdir()) == [workbook]
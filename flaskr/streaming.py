@@ -0,0 +1,34 @@
+from typing import Any
+
+from flask import (
+    Response,
+    current_app,
+    get_flashed_messages,
+    render_template,
+    stream_with_context,
+)
+
+__all__ = ["render_page"]
+
+# Template output pieces collected into each chunk sent to the client
+STREAM_BUFFER = 100
+
+
+def render_page(template_name: str, **context: Any) -> Response:
+    """
+    Render a page as a stream, so its first bytes go out before the rest
+    is rendered and large lists are never held in memory as a whole.
+    Templates should iterate lazily over what they list. Set
+    `STREAM_TEMPLATES` to false to render the whole page up front instead.
+    """
+    if not bool(current_app.config.get("STREAM_TEMPLATES", True)):  # type: ignore[misc]
+        return Response(render_template(template_name, **context))
+
+    # Headers, including the session cookie, are sent before the template
+    # runs, so flashed messages must be taken out of the session now
+    get_flashed_messages()
+    template = current_app.jinja_env.get_or_select_template(template_name)
+    current_app.update_template_context(context)
+    stream = template.stream(context)
+    stream.enable_buffering(STREAM_BUFFER)
+    return Response(stream_with_context(stream))
@@ -0,0 +1,61 @@
+from typing import Iterator
+
+from flask import Flask, Response, flash
+from jinja2 import DictLoader
+
+from .streaming import render_page
+
+TEMPLATE = """{% for m in get_flashed_messages() %}[{{ m }}]{% endfor %}
+{% for item in items %}<li>{{ item }}</li>{% endfor %}"""
+
+
+def make_app(produced: list[int]) -> Flask:
+    app = Flask(__name__)
+    app.secret_key = "test"
+    app.jinja_env.loader = DictLoader({"list.html": TEMPLATE})
+
+    def items() -> Iterator[int]:
+        for i in range(1000):
+            produced.append(i)
+            yield i
+
+    @app.route("/")
+    def index() -> Response:
+        return render_page("list.html", items=items())
+
+    @app.route("/flash")
+    def flash_message() -> str:
+        flash("hello")
+        return "flashed"
+
+    return app
+
+
+def test_renders_while_the_body_is_read() -> None:
+    produced: list[int] = []
+    client = make_app(produced).test_client()
+
+    response = client.get("/", buffered=False)
+    assert response.status_code == 200
+    # Only the first chunk is rendered before the response is returned
+    assert 0 < len(produced) < 1000
+    assert "<li>999</li>" in response.get_data(as_text=True)
+    assert len(produced) == 1000
+
+
+def test_flashes_are_shown_once() -> None:
+    client = make_app([]).test_client()
+    client.get("/flash")
+
+    assert "[hello]" in client.get("/").text
+    assert "[hello]" not in client.get("/").text
+
+
+def test_can_render_up_front() -> None:
+    produced: list[int] = []
+    app = make_app(produced)
+    app.config["STREAM_TEMPLATES"] = False
+
+    response = app.test_client().get("/", buffered=False)
+    assert len(produced) == 1000
+    assert "<li>999</li>" in response.get_data(as_text=True)
@@ -1,4 +1,34 @@
 window.addEventListener('load', function () {
+    // Replaces the contents of an office details container with a fragment
+    // from the server, or appends the rows of a further page to its table
+    function loadExpenses(container, url, append) {
+        container.setAttribute('aria-busy', 'true');
+        fetch(url, { credentials: 'same-origin' })
+            .then((response) => {
+                if (!response.ok) {
+                    throw new Error(response.status);
+                }
+                return response.text();
+            })
+            .then((html) => {
+                if (!append) {
+                    container.innerHTML = html;
+                    return;
+                }
+                let page = document.createElement('template');
+                page.innerHTML = html;
+                let tbody = container.querySelector('tbody');
+                page.content.querySelectorAll('tbody > tr').forEach((row) => tbody.appendChild(row));
+                container.querySelectorAll('.load-more-expenses').forEach((button) => button.remove());
+                page.content.querySelectorAll('.load-more-expenses').forEach((button) => container.appendChild(button));
+            })
+            .catch(() => {
+                container.innerHTML = '<p>Nie udało się pobrać wydatków.</p>';
+                delete container.dataset.loaded;
+            })
+            .finally(() => container.setAttribute('aria-busy', 'false'));
+    }
+
     function toggle(event) {
         let rowId = 'details-' + event.target.getAttribute('office-name');
         let detailsRow = document.getElementById(rowId);
@@ -8,6 +38,11 @@ window.addEventListener('load', function () {
         }
 
         if (detailsRow.style.display === 'none') {
+            let container = detailsRow.querySelector('.office-expenses');
+            if (container && !container.dataset.loaded) {
+                container.dataset.loaded = 'true';
+                loadExpenses(container, container.dataset.url, false);
+            }
             detailsRow.style.display = 'table-row';
             event.target.innerHTML = 'Ukryj szczegóły';
         } else {
@@ -17,6 +52,15 @@ window.addEventListener('load', function () {
 
     }
     document.querySelectorAll('.show-office-details').forEach((btn) => btn.addEventListener('click', toggle));
+    document.addEventListener('click', function (event) {
+        let target = event.target.closest('.sort-office-expenses, .load-more-expenses');
+        if (!target) {
+            return;
+        }
+        event.preventDefault();
+        let container = target.closest('.office-expenses');
+        loadExpenses(container, target.dataset.url, target.classList.contains('load-more-expenses'));
+    });
     // Validation Logic
     (function () {
         'use strict'